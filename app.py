@@ -1,13 +1,31 @@
 # saju_chatbot/app.py
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
 from chatbot.graph import SajuChatbotGraph
 from chatbot.state import AgentState
-from database.mysql_manager import MySQLManager
-from typing import List
+from chatbot.streaming import format_sse, is_graph_end, translate_event
+from chatbot.responses import FastJSONResponse, add_compression, history_payload
+from chatbot.admission import AdmissionController, AdmissionRejected, parse_model_limits
+from chatbot.token_meter import token_meter
+from core.chart_codec import encode_chart, hydrate_chart
+from core.chart_service import ChartService
+from config import SAJU_BATCH_CHUNK_SIZE, SAJU_BATCH_MAX_ITEMS, SAJU_CHART_MAX_AGE
+from config import RESPONSE_COMPRESSION, RESPONSE_COMPRESSION_MIN_SIZE
+from config import OPENAI_MODEL, LLM_MODEL_CONCURRENCY
+from database.async_mysql_manager import AsyncMySQLManager
+from database.write_behind import WriteBehindQueue
+from database.session_cache import SessionCache, create_redis_client
+from metrics import metrics
+from datetime import datetime
+from typing import List, Literal
 from uuid import uuid4
+import asyncio
+import contextvars
+import json
 import uvicorn
 import logging
 
@@ -19,13 +37,34 @@ logging.basicConfig(
 app = FastAPI(
     title="사주팔자 챗봇 API",
     description="LangChain, LangGraph, OpenAI를 활용한 사주팔자 챗봇",
+    default_response_class=FastJSONResponse,
 )
+if RESPONSE_COMPRESSION:
+    logging.info(f"Response compression enabled: {add_compression(app, RESPONSE_COMPRESSION_MIN_SIZE)}")
 
 # 챗봇 그래프 초기화
 saju_graph_app = SajuChatbotGraph().get_graph_app()
 
-# MySQL Manager 초기화 (애플리케이션 시작 시 한 번)
-mysql_manager = MySQLManager()
+# MySQL Manager 초기화 (애플리케이션 시작 시 한 번, 이벤트 루프를 막지 않는 비동기 풀 사용)
+mysql_manager = AsyncMySQLManager()
+
+# 세션/대화 기록은 write-behind 큐로 모아서 배치 저장 (응답이 DB commit을 기다리지 않도록)
+session_writer = WriteBehindQueue(mysql_manager)
+
+# 세션 캐시 (프로세스 내 TTL+LRU, SESSION_CACHE_REDIS_URL 설정 시 Redis 공유 캐시 추가)
+session_cache = SessionCache(redis_client=create_redis_client())
+
+# LLM 없는 사주 계산/분석 (입력·사주 단위 메모이제이션)
+chart_service = ChartService()
+
+# LLM을 호출하는 그래프 실행의 동시 실행 제한 (몰리는 요청은 사용자별로 번갈아 대기, 초과 시 바로 거절)
+llm_admission = AdmissionController(model_limits=parse_model_limits(LLM_MODEL_CONCURRENCY))
+
+
+def admission_error(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+    )
 
 
 class ChatRequest(BaseModel):
@@ -33,6 +72,52 @@ class ChatRequest(BaseModel):
     session_id: str | None = None  # 세션 ID가 없으면 새로 생성
     message: str
     history: List[dict] = []  # 대화 기록 (optional)
+    history_mode: Literal["full", "compact", "none"] = "full"  # 응답의 full_history 형식
+
+
+class BirthInput(BaseModel):
+    birth_datetime: datetime
+    is_lunar: bool = False
+    is_leap_month: bool = False
+    id: str | None = None  # 호출 측 식별자 (결과에 그대로 포함)
+
+
+async def load_user_session(session_id: str):
+    """세션 캐시를 먼저 확인하고, 캐시에 없을 때만 MySQL을 조회합니다."""
+    found, record = await session_cache.get(session_id)
+    if not found:
+        record = await mysql_manager.get_user_session(session_id)
+        await session_cache.set(session_id, record)
+    return record
+
+
+async def store_user_session(
+    session_id: str, user_id: str, birth_datetime, is_lunar, is_leap_month, saju_chart=None
+):
+    """세션을 캐시에 바로 반영(write-through)하고, DB 저장은 write-behind 큐에 맡깁니다."""
+    await session_cache.set(
+        session_id,
+        {
+            "session_id": session_id,
+            "user_id": user_id,
+            "birth_datetime": birth_datetime,
+            "is_lunar": is_lunar,
+            "is_leap_month": is_leap_month,
+            "saju_chart": saju_chart,
+        },
+    )
+    session_writer.save_user_session(
+        session_id, user_id, birth_datetime, is_lunar, is_leap_month, saju_chart
+    )
+
+
+def encode_state_chart(state: dict):
+    """상태의 사주 계산 결과를 저장용 차트 코드로 압축합니다. 형식이 맞지 않으면 None."""
+    try:
+        return encode_chart(state["saju_calculated_info"])
+    except (KeyError, TypeError, ValueError) as e:
+        logging.warning(f"Saju chart could not be encoded for storage: {e}")
+        return None
 
 
 @app.get("/health")
@@ -43,20 +128,19 @@ async def health_check():
     return {"status": "healthy", "message": "사주팔자 챗봇 서버가 정상 작동 중입니다."}
 
 
-@app.post("/chat/")
-async def chat_with_saju_bot(request: ChatRequest):
+@app.get("/metrics")
+async def get_metrics():
     """
-    사주팔자 챗봇과 대화합니다.
+    토큰 사용량 등 프로세스 내 메트릭을 조회합니다.
     """
-    session_id = request.session_id if request.session_id else str(uuid4())
-    logging.info(
-        f"Received chat request from user_id: {request.user_id}, session_id: {session_id}"
-    )
+    return metrics.snapshot()
+
 
-    # 대화 기록 구성 (LangGraph의 messages 필드에 맞게)
+def build_messages(history: List[dict], message: str) -> list:
+    """요청의 대화 기록과 현재 메시지를 LangGraph messages 형식으로 변환합니다."""
     messages = []
     # 이전 대화 기록이 있다면 추가
-    for msg in request.history:
+    for msg in history:
         if msg.get("role") == "user":
             messages.append(HumanMessage(content=msg.get("content", "")))
         elif msg.get("role") == "assistant":
@@ -71,32 +155,43 @@ async def chat_with_saju_bot(request: ChatRequest):
             else:  # 일반 AIMessage
                 messages.append(AIMessage(content=msg.get("content", "")))
         elif msg.get("role") == "tool":  # ToolMessage
+            content = msg.get("content", "")
+            if not isinstance(content, str):  # 응답에서 객체로 풀어 보낸 도구 결과
+                content = json.dumps(content, ensure_ascii=False)
             messages.append(
                 ToolMessage(
-                    content=msg.get("content", ""),
+                    content=content,
                     tool_call_id=msg.get("tool_call_id", ""),
                 )
             )
 
     # 현재 사용자 메시지 추가
-    messages.append(HumanMessage(content=request.message))
+    messages.append(HumanMessage(content=message))
+    return messages
 
-    # LangGraph 시작 상태 설정
-    # 사용자의 생년월일시 정보가 이미 세션에 저장되어 있다면 여기서 로드하여 초기 상태에 넣어줄 수 있음
+
+async def build_initial_state(request: ChatRequest, session_id: str) -> dict:
+    """
+    LangGraph 시작 상태를 만듭니다.
+    세션에 저장된 생년월일시와 차트가 있으면 불러와 도구 호출 없이 바로 상담할 수 있게 합니다.
+    """
     initial_state_data= {
-        "messages": messages,
+        "messages": build_messages(request.history, request.message),
         "session_id": session_id,
         "user_birth_datetime": None,
         "user_birth_is_lunar": None,
         "user_birth_is_leap_month": None,
         "saju_calculated_info": None,
         "saju_analyzed_info": None,
+        "saju_knowledge": None,
         "current_intent": None,
         "error_message": None,
+        "llm_context": None,
+        "conversation_summary": None,
     }
 
-    # MySQL에서 세션 데이터 로드 (필요시)
-    session_from_db = mysql_manager.get_user_session(session_id)
+    # 세션 데이터 로드 (캐시 우선, 없으면 MySQL)
+    session_from_db = await load_user_session(session_id)
     if session_from_db and session_from_db.get("birth_datetime"):
         initial_state_data["user_birth_datetime"] = session_from_db["birth_datetime"]
         initial_state_data["user_birth_is_lunar"] = session_from_db["is_lunar"]
@@ -106,84 +201,163 @@ async def chat_with_saju_bot(request: ChatRequest):
         logging.info(
             f"Loaded existing session data for {session_id}: {session_from_db['birth_datetime']}"
         )
+        # 저장된 차트가 있으면 계산/분석 결과까지 복원하여 도구 호출 없이 바로 상담
+        hydrated = hydrate_chart(session_from_db.get("saju_chart"))
+        if hydrated:
+            initial_state_data["saju_calculated_info"], initial_state_data["saju_analyzed_info"] = hydrated
+    return initial_state_data
+
+
+def final_response_from_state(last_state: dict | None) -> str:
+    """최종 상태에서 사용자에게 보낼 답변을 꺼냅니다."""
+    if last_state and last_state.get("messages"):
+        # 마지막 AIMessage 또는 ToolMessage를 찾아 사용자에게 응답
+        for msg in reversed(last_state["messages"]):
+            if isinstance(msg, AIMessage):
+                return msg.content
+            elif isinstance(msg, ToolMessage):
+                # ToolMessage가 있다면, 그 결과로 다시 LLM이 응답해야 함
+                # 여기서는 간단히 Tool 결과 자체를 보여주지만, 실제로는 LLM이 이를 해석해서 최종 답변해야 함
+                return f"Tool Result: {msg.content}"
+    return ""
+
+
+def session_saved_by_tool(initial_state_data: dict, last_state: dict | None) -> bool:
+    """이번 턴에 save_user_session_data 도구가 호출되었는지 (요청 history의 이전 도구 결과는 제외)"""
+    if not last_state or not last_state.get("messages"):
+        return False
+    new_messages = last_state["messages"][len(initial_state_data["messages"]):]
+    # 도구 결과에 name이 없을 수도 있으므로 앞선 AIMessage의 tool_calls와 id로도 확인
+    save_call_ids = {
+        tool_call["id"]
+        for msg in new_messages
+        if isinstance(msg, AIMessage)
+        for tool_call in msg.tool_calls
+        if tool_call["name"] == "save_user_session_data"
+    }
+    return any(
+        isinstance(msg, ToolMessage)
+        and (msg.name == "save_user_session_data" or msg.tool_call_id in save_call_ids)
+        for msg in new_messages
+    )
+
+
+async def persist_turn(
+    request: ChatRequest,
+    session_id: str,
+    initial_state_data: dict,
+    last_state: dict | None,
+    final_response_message: str,
+):
+    """이번 턴의 세션 정보와 대화 기록을 저장합니다. (캐시 write-through + write-behind 큐)"""
+    # save_user_session_data 도구는 MySQL에 바로 저장하므로 캐시된 세션을 지워 다음 턴에 다시 읽게 함
+    if session_saved_by_tool(initial_state_data, last_state):
+        await session_cache.invalidate(session_id)
+
+    # 최종 상태에서 사주 정보가 업데이트되었다면 저장
+    # 저장된 차트에서 복원한 그대로라면 다시 저장하지 않음
+    if last_state and last_state.get("saju_calculated_info") and (
+        last_state["saju_calculated_info"] != initial_state_data["saju_calculated_info"]
+    ):
+        birth_dt = last_state["user_birth_datetime"]
+        is_lunar = last_state["user_birth_is_lunar"]
+        is_leap_month = last_state["user_birth_is_leap_month"]
+        await store_user_session(
+            session_id,
+            request.user_id,
+            birth_dt,
+            is_lunar,
+            is_leap_month,
+            encode_state_chart(last_state),
+        )
+        logging.info(f"Saju info queued for saving for session {session_id}.")
+
+    # 이번 턴의 대화 기록 저장 (write-behind 큐에 적재)
+    session_writer.append_conversation(
+        session_id, request.user_id, "user", request.message
+    )
+    session_writer.append_conversation(
+        session_id, request.user_id, "assistant", final_response_message
+    )
+
+
+def token_usage_payload(session_id: str, request_usage: dict) -> dict:
+    return {
+        "request": request_usage,
+        "session": token_meter.session_usage(session_id),
+        "session_budget": token_meter.session_budget,
+        "over_budget": token_meter.over_budget(session_id),
+    }
+
+
+async def run_graph_holding_permit(permit, initial_state_data: dict) -> dict:
+    """
+    그래프를 스레드 풀에서 실행하고, 스레드의 실행이 실제로 끝났을 때 슬롯을 반납합니다.
+    요청이 취소되어도(클라이언트 연결 끊김 등) 스레드의 그래프 실행은 멈추지 않으므로 끝날 때까지 슬롯을 잡아 둡니다.
+    """
+
+    def graph_finished(future):
+        if not future.cancelled():
+            future.exception()  # 취소된 요청의 실패는 기다리는 쪽이 없으므로 여기서 확인 처리
+        permit.release()
 
     try:
-        # LangGraph 실행 (스트림을 사용하여 단계별로 처리)
-        final_response_message = ""
-        last_state = None
+        # 토큰 미터 범위(contextvars)를 스레드에서도 사용하도록 현재 컨텍스트에서 실행
+        future = asyncio.get_running_loop().run_in_executor(
+            None, contextvars.copy_context().run, saju_graph_app.invoke, initial_state_data
+        )
+    except BaseException:
+        permit.release()
+        raise
+    future.add_done_callback(graph_finished)
+    return await asyncio.shield(future)
 
-        # for state in saju_graph_app.stream(initial_state_data):
-        #     if "__end__" not in state:
-        #         last_state = state
-        #     else:
-        #         last_state = state["__end__"] # 최종 상태
 
-        # 스트림 대신 한 번에 실행 (간단한 API 응답을 위해)
-        final_state = saju_graph_app.invoke(initial_state_data)
-        last_state = final_state
+@app.post("/chat/")
+async def chat_with_saju_bot(request: ChatRequest):
+    """
+    사주팔자 챗봇과 대화합니다.
+    """
+    session_id = request.session_id if request.session_id else str(uuid4())
+    logging.info(
+        f"Received chat request from user_id: {request.user_id}, session_id: {session_id}"
+    )
 
+    # LangGraph 시작 상태 설정
+    initial_state_data = await build_initial_state(request, session_id)
 
-        if last_state and last_state.get("messages"):
-            # 마지막 AIMessage 또는 ToolMessage를 찾아 사용자에게 응답
-            for msg in reversed(last_state["messages"]):
-                if isinstance(msg, AIMessage):
-                    final_response_message = msg.content
-                    break
-                elif isinstance(msg, ToolMessage):
-                    # ToolMessage가 있다면, 그 결과로 다시 LLM이 응답해야 함
-                    # 여기서는 간단히 Tool 결과 자체를 보여주지만, 실제로는 LLM이 이를 해석해서 최종 답변해야 함
-                    final_response_message = f"Tool Result: {msg.content}"
-                    break
-
-            # 최종 상태에서 사주 정보가 업데이트되었다면 MySQL에 저장
-            if last_state.get("saju_calculated_info"):
-                birth_dt = last_state["user_birth_datetime"]
-                is_lunar = last_state["user_birth_is_lunar"]
-                is_leap_month = last_state["user_birth_is_leap_month"]
-                mysql_manager.save_user_session(
-                    session_id, request.user_id, birth_dt, is_lunar, is_leap_month
-                )
-                logging.info(f"Saju info saved for session {session_id}.")
+    try:
+        permit = await llm_admission.acquire(OPENAI_MODEL, request.user_id)
+    except AdmissionRejected as e:
+        raise admission_error(e)
+
+    try:
+        # 스트림 대신 한 번에 실행 (간단한 API 응답을 위해, 단계별 진행은 /chat/stream 사용)
+        # 토큰 미터 범위 안에서 실행하여 그래프 내 LLM 호출을 이 세션/사용자에 귀속
+        # 그래프는 동기 실행이므로 스레드 풀에서 실행해 이벤트 루프(대기열, 다른 요청)를 막지 않음
+        with token_meter.scope(session_id, request.user_id) as request_usage:
+            final_state = await run_graph_holding_permit(permit, initial_state_data)
+        last_state = final_state
 
+        final_response_message = final_response_from_state(last_state)
         if not final_response_message:
             final_response_message = "죄송합니다. 현재 요청을 처리할 수 없습니다."
             logging.warning(f"No final response message for session {session_id}.")
 
-        # 응답 형태 변환 (history에 포함될 메시지 형식)
-        response_messages_for_history = []
-        for msg in last_state.get("messages", []):
-            if isinstance(msg, HumanMessage):
-                response_messages_for_history.append(
-                    {"role": "user", "content": msg.content}
-                )
-            elif isinstance(msg, AIMessage):
-                # tool_calls가 있다면 함께 반환
-                if msg.tool_calls:
-                    response_messages_for_history.append(
-                        {
-                            "role": "assistant",
-                            "content": msg.content,
-                            "tool_calls": [tc for tc in msg.tool_calls],
-                        }
-                    )
-                else:
-                    response_messages_for_history.append(
-                        {"role": "assistant", "content": msg.content}
-                    )
-            elif isinstance(msg, ToolMessage):
-                response_messages_for_history.append(
-                    {
-                        "role": "tool",
-                        "content": msg.content,
-                        "tool_call_id": msg.tool_call_id,
-                    }
-                )
+        await persist_turn(
+            request, session_id, initial_state_data, last_state, final_response_message
+        )
 
-        return {
+        payload = {
             "session_id": session_id,
             "response": final_response_message,
-            "full_history": response_messages_for_history,  # 전체 대화 기록 반환 (UI에서 관리용)
+            "token_usage": token_usage_payload(session_id, request_usage),
         }
+        if request.history_mode != "none":
+            # 대화 기록 반환 (UI에서 관리용, 도구 결과는 JSON 객체로)
+            payload["full_history"] = history_payload(last_state.get("messages", []), request.history_mode)
+        # jsonable_encoder를 거치지 않고 orjson으로 바로 인코딩
+        return FastJSONResponse(payload)
 
     except Exception as e:
         logging.error(
@@ -193,18 +367,251 @@ async def chat_with_saju_bot(request: ChatRequest):
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
 
 
+class PermitStreamingResponse(StreamingResponse):
+    """응답 전송이 끝나거나 실패하면 LLM 슬롯을 반납하는 StreamingResponse. (스트림이 시작되지 못한 경우 포함)"""
+
+    def __init__(self, content, permit, **kwargs):
+        super().__init__(content, **kwargs)
+        self.permit = permit
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.permit.release()
+
+
+@app.post("/chat/stream")
+async def chat_with_saju_bot_stream(request: ChatRequest):
+    """
+    사주팔자 챗봇과 대화하며 진행 상황을 SSE(text/event-stream)로 보냅니다.
+    이벤트: session → node_started/node_finished, tool_started/tool_finished, chart, token → done (오류 시 error)
+    사주 계산이 끝나면 chart 이벤트로 차트를 먼저 보내므로 클라이언트는 해석이 스트리밍되는 동안 차트를 그릴 수 있습니다.
+    """
+    session_id = request.session_id if request.session_id else str(uuid4())
+    logging.info(
+        f"Received streaming chat request from user_id: {request.user_id}, session_id: {session_id}"
+    )
+    initial_state_data = await build_initial_state(request, session_id)
+    # 슬롯은 스트림을 시작하기 전에 얻어 두어 포화 시 SSE 대신 429/503으로 바로 응답
+    try:
+        permit = await llm_admission.acquire(OPENAI_MODEL, request.user_id)
+    except AdmissionRejected as e:
+        raise admission_error(e)
+
+    async def event_stream():
+        yield format_sse("session", {"session_id": session_id})
+        last_state = None
+        try:
+            try:
+                with token_meter.scope(session_id, request.user_id) as request_usage:
+                    async for event in saju_graph_app.astream_events(initial_state_data, version="v2"):
+                        if is_graph_end(event):
+                            last_state = (event.get("data") or {}).get("output")
+                        translated = translate_event(event)
+                        if translated:
+                            yield format_sse(*translated)
+            finally:
+                permit.release()
+
+            final_response_message = final_response_from_state(last_state)
+            if not final_response_message:
+                final_response_message = "죄송합니다. 현재 요청을 처리할 수 없습니다."
+                logging.warning(f"No final response message for session {session_id}.")
+            await persist_turn(
+                request, session_id, initial_state_data, last_state, final_response_message
+            )
+            yield format_sse(
+                "done",
+                {
+                    "session_id": session_id,
+                    "response": final_response_message,
+                    "token_usage": token_usage_payload(session_id, request_usage),
+                },
+            )
+        except Exception as e:
+            logging.error(
+                f"Error processing streaming chat request for session {session_id}: {e}",
+                exc_info=True,
+            )
+            yield format_sse("error", {"message": f"Internal Server Error: {e}"})
+
+    return PermitStreamingResponse(
+        event_stream(),
+        permit=permit,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def batch_item(index: int, raw) -> dict:
+    """배치 입력 하나를 계산용 항목으로 검증합니다. 잘못된 입력은 error 항목이 됩니다."""
+    if isinstance(raw, Exception):
+        return {"index": index, "id": None, "error": f"잘못된 JSON입니다: {raw}"}
+    try:
+        birth = BirthInput.model_validate(raw)
+    except ValidationError as e:
+        item_id = raw.get("id") if isinstance(raw, dict) else None
+        return {"index": index, "id": item_id, "error": f"잘못된 입력입니다: {e.errors()[0]['msg']}"}
+    return {"index": index, **birth.model_dump()}
+
+
+class RequestBodyStreamingResponse(StreamingResponse):
+    """
+    요청 본문을 읽으면서 응답을 내보내는 StreamingResponse.
+    기본 StreamingResponse는 연결 끊김을 감지하려고 receive를 함께 읽어 request.stream()과 본문 메시지를 나눠 갖게 되므로,
+    감지 없이 응답만 스트리밍합니다. (끊김은 본문 읽기/전송 실패로 드러남)
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+
+async def iter_ndjson(request: Request):
+    """요청 본문을 줄 단위로 읽으며 JSON 객체를 하나씩 내보냅니다. (본문 전체를 메모리에 올리지 않음)"""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield e
+    if buffer.strip():
+        try:
+            yield json.loads(buffer)
+        except json.JSONDecodeError as e:
+            yield e
+
+
+async def iter_json_items(items: list):
+    for item in items:
+        yield item
+
+
+async def compute_chunk(chunk: list[dict]) -> list[str]:
+    """유효한 입력을 스레드 풀에서 한 번에 계산하고, 입력 순서대로 NDJSON 줄을 만듭니다."""
+    valid = [item for item in chunk if "error" not in item]
+    computed = iter(await run_in_threadpool(chart_service.compute_many, valid) if valid else [])
+    return [
+        json.dumps(item if "error" in item else next(computed), ensure_ascii=False, default=str) + "\n"
+        for item in chunk
+    ]
+
+
+@app.post("/saju/batch")
+async def saju_batch(request: Request):
+    """
+    여러 생년월일시의 사주팔자와 분석 결과를 LLM 없이 계산합니다.
+    입력: JSON 배열(또는 {"items": [...]}) 또는 NDJSON(Content-Type: application/x-ndjson, 한 줄에 하나)
+      각 항목: {"birth_datetime": "1990-05-15T14:00", "is_lunar": false, "is_leap_month": false, "id": "선택"}
+    출력: NDJSON 스트림, 입력 순서대로 한 줄에 하나 ({"index", "id", "birth_datetime", "saju_info", "analyzed_info"} 또는 {"index", "id", "error"})
+    NDJSON 입력은 읽는 대로 SAJU_BATCH_CHUNK_SIZE개씩 계산해 바로 내보내므로 입력 크기와 관계없이 메모리 사용이 일정합니다.
+    """
+    content_type = request.headers.get("content-type", "")
+    response_class = StreamingResponse
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        raw_items = iter_ndjson(request)
+        response_class = RequestBodyStreamingResponse
+    else:
+        try:
+            body = json.loads(await request.body())
+        except json.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"잘못된 JSON입니다: {e}")
+        items = body.get("items") if isinstance(body, dict) else body
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="JSON 배열 또는 {\"items\": [...]} 형식이어야 합니다.")
+        if len(items) > SAJU_BATCH_MAX_ITEMS:
+            raise HTTPException(
+                status_code=413, detail=f"한 요청에 최대 {SAJU_BATCH_MAX_ITEMS}개까지 계산할 수 있습니다."
+            )
+        raw_items = iter_json_items(items)
+
+    async def rows():
+        chunk = []
+        index = 0
+        async for raw in raw_items:
+            if index >= SAJU_BATCH_MAX_ITEMS:
+                yield json.dumps(
+                    {"index": index, "error": f"한 요청에 최대 {SAJU_BATCH_MAX_ITEMS}개까지 계산할 수 있습니다."},
+                    ensure_ascii=False,
+                ) + "\n"
+                break
+            chunk.append(batch_item(index, raw))
+            index += 1
+            if len(chunk) >= SAJU_BATCH_CHUNK_SIZE:
+                for line in await compute_chunk(chunk):
+                    yield line
+                chunk = []
+        if chunk:
+            for line in await compute_chunk(chunk):
+                yield line
+        metrics.inc("saju_batch.items", index)
+
+    return response_class(rows(), media_type="application/x-ndjson")
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match 헤더(쉼표로 구분된 목록, 약한 비교, "*")가 ETag와 일치하는지 확인합니다."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+@app.get("/saju/chart")
+async def saju_chart(
+    request: Request, birth_datetime: datetime, is_lunar: bool = False, is_leap_month: bool = False
+):
+    """
+    생년월일시 하나의 사주팔자와 분석 결과를 LLM 없이 계산합니다.
+    결과는 입력과 규칙 버전만으로 정해지므로 강한 ETag와 긴 Cache-Control을 붙입니다.
+    CDN/리버스 프록시가 대부분의 요청을 처리하고, 재검증 요청(If-None-Match)은 계산 없이 304로 응답합니다.
+    """
+    etag = chart_service.etag(birth_datetime, is_lunar, is_leap_month)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={SAJU_CHART_MAX_AGE}"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        metrics.inc("saju_chart.not_modified")
+        return Response(status_code=304, headers=headers)
+
+    try:
+        result = await run_in_threadpool(chart_service.compute, birth_datetime, is_lunar, is_leap_month)
+    except Exception as e:
+        logging.error(f"Saju chart computation failed: {e}", exc_info=True)
+        raise HTTPException(status_code=422, detail=f"사주 계산 중 오류가 발생했습니다: {e}")
+    metrics.inc("saju_chart.computed")
+    body = {
+        "birth_datetime": birth_datetime.replace(tzinfo=None).isoformat(),
+        "is_lunar": is_lunar,
+        "is_leap_month": is_leap_month,
+        "rules_version": chart_service.rules_version,
+        **result,
+    }
+    return JSONResponse(body, headers=headers)
+
+
+@app.on_event("startup")
+async def startup_event():
+    """애플리케이션 시작 시 MySQL 연결 풀 생성 및 write-behind flush 태스크 시작"""
+    await mysql_manager.connect()
+    session_writer.start()
+
+
 @app.on_event("shutdown")
 async def shutdown_event():
-    """애플리케이션 종료 시 MySQL 연결 닫기"""
-    mysql_manager.close()
+    """애플리케이션 종료 시 남은 기록을 저장하고 MySQL 연결 닫기"""
+    await session_writer.stop()
+    await mysql_manager.close()
     logging.info("Shutting down and closing MySQL connection.")
 
 
 if __name__ == "__main__":
-    # ChromaDB 초기화 (데이터 로딩) - 한 번만 실행되도록 설정
-    from database.chroma_manager import ChromaManager
-
-    chroma_manager_init = ChromaManager()
+    # ChromaDB 지식 베이스는 chatbot.tools 임포트 시 ChromaManager가 증분 적재 (별도 초기화 불필요)
 
     # .env 파일에 OPENAI_API_KEY, MYSQL_HOST, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DB 설정 필요
     # 예시:
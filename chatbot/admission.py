@@ -0,0 +1,236 @@
+# saju_chatbot/chatbot/admission.py
+# LLM 호출 요청의 동시 실행 제한(모델별 슬롯)과 사용자별 공정 대기열
+
+from config import (
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_QUEUE,
+    LLM_MAX_PENDING_PER_USER,
+    LLM_QUEUE_TIMEOUT_SECONDS,
+)
+from metrics import metrics
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+import asyncio
+import math
+import time
+
+
+class AdmissionRejected(Exception):
+    """
+    요청을 받지 않을 때 발생합니다.
+    status_code: 429 (사용자별 한도 초과) 또는 503 (대기열이 가득 참/대기 시간 초과)
+    retry_after: 다시 시도할 때까지 권장 대기 시간(초)
+    """
+
+    def __init__(self, status_code: int, retry_after: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def parse_model_limits(text: str | None) -> dict[str, int]:
+    """'gpt-4o=4,gpt-4o-mini=16' 형식의 모델별 동시 실행 수"""
+    limits = {}
+    for part in (text or "").split(","):
+        if "=" in part:
+            model, limit = part.split("=", 1)
+            limits[model.strip()] = int(limit)
+    return limits
+
+
+class Permit:
+    """획득한 슬롯. release는 여러 번 호출해도 한 번만 반납합니다."""
+
+    def __init__(self, slots: "ModelSlots", user_id: str):
+        self.slots = slots
+        self.user_id = user_id
+        self.started = time.perf_counter()
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.slots.release(self)
+
+
+class ModelSlots:
+    """
+    모델 하나의 동시 실행 슬롯.
+    슬롯이 모두 사용 중이면 사용자별 대기열에 넣고, 슬롯이 비면 대기 중인 사용자를 돌아가며(round-robin) 하나씩 들여보냅니다.
+    한 사용자가 요청을 많이 보내도 다른 사용자의 요청은 그 뒤에 밀리지 않고 번갈아 처리됩니다.
+    이벤트 루프 하나에서만 사용합니다.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        max_concurrent: int,
+        max_queue: int,
+        max_pending_per_user: int,
+        queue_timeout: float,
+    ):
+        self.model = model
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_pending_per_user = max_pending_per_user
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.queued = 0
+        self._waiters: OrderedDict[str, deque] = OrderedDict()  # 사용자 → 대기 중인 Future (대기 순서대로)
+        self._pending: dict[str, int] = {}  # 사용자 → 실행 중 + 대기 중인 요청 수
+        self._hold_seconds = 1.0  # 슬롯 점유 시간 지수 이동 평균 (Retry-After 추정용)
+        self.admitted = 0
+        self.rejected_user_limit = 0
+        self.rejected_queue_full = 0
+        self.timed_out = 0
+
+    async def acquire(self, user_id: str) -> Permit:
+        if self._pending.get(user_id, 0) >= self.max_pending_per_user:
+            self.rejected_user_limit += 1
+            metrics.inc("admission.rejected_user_limit")
+            raise AdmissionRejected(
+                429,
+                self._retry_after(1),
+                f"사용자당 동시 요청은 최대 {self.max_pending_per_user}개입니다. 잠시 후 다시 시도해주세요.",
+            )
+        if self.active < self.max_concurrent and not self.queued:
+            self._pending[user_id] = self._pending.get(user_id, 0) + 1
+            metrics.observe("admission.wait_seconds", 0.0)
+            return self._admit(user_id)
+        if self.queued >= self.max_queue:
+            self.rejected_queue_full += 1
+            metrics.inc("admission.rejected_queue_full")
+            raise AdmissionRejected(
+                503, self._retry_after(self.queued + 1), "요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요."
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(user_id, deque()).append(future)
+        self._pending[user_id] = self._pending.get(user_id, 0) + 1
+        self.queued += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done():  # 시간 초과와 동시에 슬롯을 받음
+                return future.result()
+            self._abandon(user_id, future)
+            self.timed_out += 1
+            metrics.inc("admission.timeouts")
+            raise AdmissionRejected(
+                503,
+                self._retry_after(self.queued + 1),
+                f"{self.queue_timeout:g}초 동안 처리 순서가 오지 않았습니다. 잠시 후 다시 시도해주세요.",
+            )
+        except asyncio.CancelledError:
+            if future.done():  # 슬롯을 넘겨받은 직후 취소되면 다음 요청에 넘김
+                future.result().release()
+            else:
+                self._abandon(user_id, future)
+            raise
+        finally:
+            metrics.observe("admission.wait_seconds", time.perf_counter() - start)
+
+    def release(self, permit: Permit):
+        held = time.perf_counter() - permit.started
+        self._hold_seconds = 0.8 * self._hold_seconds + 0.2 * held
+        self.active -= 1
+        self._pending[permit.user_id] -= 1
+        if not self._pending[permit.user_id]:
+            del self._pending[permit.user_id]
+        self._dispatch()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+            "queued": self.queued,
+            "users_waiting": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected_user_limit": self.rejected_user_limit,
+            "rejected_queue_full": self.rejected_queue_full,
+            "timed_out": self.timed_out,
+            "avg_hold_seconds": self._hold_seconds,
+        }
+
+    def _admit(self, user_id: str) -> Permit:
+        self.active += 1
+        self.admitted += 1
+        return Permit(self, user_id)
+
+    def _dispatch(self):
+        """빈 슬롯을 대기열 맨 앞 사용자의 가장 오래된 요청에 넘기고, 그 사용자는 대기 순서 맨 뒤로 보냅니다."""
+        while self.active < self.max_concurrent and self._waiters:
+            user_id, waiters = next(iter(self._waiters.items()))
+            future = waiters.popleft()
+            if waiters:
+                self._waiters.move_to_end(user_id)
+            else:
+                del self._waiters[user_id]
+            self.queued -= 1
+            future.set_result(self._admit(user_id))
+
+    def _abandon(self, user_id: str, future):
+        """대기를 포기한 요청을 대기열에서 뺍니다."""
+        future.cancel()
+        waiters = self._waiters.get(user_id)
+        if waiters and future in waiters:
+            waiters.remove(future)
+            if not waiters:
+                del self._waiters[user_id]
+            self.queued -= 1
+        self._pending[user_id] -= 1
+        if not self._pending[user_id]:
+            del self._pending[user_id]
+
+    def _retry_after(self, position: int) -> int:
+        """앞선 요청들이 빠지는 데 걸릴 시간 추정 (초, 최소 1)"""
+        return max(1, math.ceil(self._hold_seconds * position / self.max_concurrent))
+
+
+class AdmissionController:
+    """
+    모델별 슬롯을 관리합니다. 모델별 동시 실행 수는 model_limits, 없으면 max_concurrent를 사용합니다.
+    사용 예:
+        async with admission.slot(OPENAI_MODEL, user_id):
+            ...  # LLM을 호출하는 그래프 실행
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = LLM_MAX_CONCURRENCY,
+        max_queue: int = LLM_MAX_QUEUE,
+        max_pending_per_user: int = LLM_MAX_PENDING_PER_USER,
+        queue_timeout: float = LLM_QUEUE_TIMEOUT_SECONDS,
+        model_limits: dict[str, int] | None = None,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_pending_per_user = max_pending_per_user
+        self.queue_timeout = queue_timeout
+        self.model_limits = model_limits or {}
+        self._models: dict[str, ModelSlots] = {}
+
+    def slots(self, model: str) -> ModelSlots:
+        if model not in self._models:
+            self._models[model] = ModelSlots(
+                model,
+                self.model_limits.get(model, self.max_concurrent),
+                self.max_queue,
+                self.max_pending_per_user,
+                self.queue_timeout,
+            )
+            metrics.register_collector(f"admission.{model}", self._models[model].stats)
+        return self._models[model]
+
+    async def acquire(self, model: str, user_id: str) -> Permit:
+        """슬롯을 얻을 때까지 기다립니다. 받을 수 없으면 AdmissionRejected. 반환된 Permit은 반드시 release 해야 합니다."""
+        return await self.slots(model).acquire(user_id)
+
+    @asynccontextmanager
+    async def slot(self, model: str, user_id: str):
+        permit = await self.acquire(model, user_id)
+        try:
+            yield permit
+        finally:
+            permit.release()
@@ -0,0 +1,313 @@
+# saju_chatbot/chatbot/context.py
+
+from collections import OrderedDict
+from hashlib import sha256
+import json
+import threading
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from config import CONTEXT_MAX_TURNS, CONTEXT_TOKEN_BUDGET, CONTEXT_SUMMARY_CACHE_SIZE
+
+SUMMARY_PREFIX = "이전 대화 요약: "
+TOOL_PREVIEW_CHARS = 200  # 오래된 도구 결과를 축약할 때 남길 최대 글자 수
+MESSAGE_OVERHEAD_TOKENS = 4  # 메시지 하나당 role/구분자 오버헤드 (OpenAI 기준 근사치)
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    """tiktoken 인코더를 한 번만 로드합니다. 사용할 수 없으면 None을 반환합니다."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:  # 미설치 또는 오프라인 환경
+            print(f"tiktoken unavailable, falling back to length heuristic: {e}")
+            _encoding = None
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """텍스트의 토큰 수를 계산합니다. tiktoken이 없으면 글자 수 기반으로 근사합니다."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # 한국어는 대략 1.5글자당 1토큰 정도로 잡는다 (보수적인 근사치)
+    return max(1, len(text) * 2 // 3)
+
+
+def message_tokens(message: BaseMessage) -> int:
+    """메시지 하나가 프롬프트에서 차지하는 토큰 수를 근사합니다."""
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    tokens = MESSAGE_OVERHEAD_TOKENS + count_tokens(content)
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        tokens += count_tokens(json.dumps(tool_calls, ensure_ascii=False, default=str))
+    return tokens
+
+
+def split_turns(messages: list) -> tuple[list, list[list]]:
+    """
+    메시지 목록을 (선두 시스템 메시지, 턴 목록)으로 나눕니다.
+    턴은 HumanMessage에서 시작하며, 그에 따른 AI/도구 메시지를 함께 묶습니다.
+    턴 단위로 자르기 때문에 tool_calls와 ToolMessage 쌍이 분리되지 않습니다.
+    """
+    head = []
+    turns = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            turns.append([message])
+        elif turns:
+            turns[-1].append(message)
+        else:
+            head.append(message)
+    return head, turns
+
+
+def compact_tool_content(content) -> str:
+    """
+    도구 결과를 짧은 참조 문자열로 축약합니다.
+    사주 계산 결과라면 네 기둥과 일간만 남깁니다.
+    """
+    text = content if isinstance(content, str) else str(content)
+    try:
+        payload = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        payload = None
+
+    if isinstance(payload, dict) and "saju_info" in payload:
+        saju_info = payload.get("saju_info") or {}
+        analyzed_info = payload.get("analyzed_info") or {}
+        return chart_reference(saju_info, analyzed_info)
+
+    if len(text) > TOOL_PREVIEW_CHARS:
+        return text[:TOOL_PREVIEW_CHARS] + "…(생략)"
+    return text
+
+
+def chart_reference(saju_info: dict, analyzed_info: dict | None = None) -> str:
+    """사주 계산 결과를 한 줄짜리 차트 참조로 표현합니다."""
+    pillars = " · ".join(
+        f"{label} {saju_info.get(key, '?')}"
+        for label, key in (
+            ("년주", "year_ganji"),
+            ("월주", "month_ganji"),
+            ("일주", "day_ganji"),
+            ("시주", "time_ganji"),
+        )
+    )
+    reference = f"[사주 차트] {pillars}"
+    day_gan = (analyzed_info or {}).get("day_gan")
+    if day_gan:
+        reference += f" (일간 {day_gan})"
+    return reference
+
+
+def chart_system_message(
+    saju_info: dict, analyzed_info: dict | None = None, knowledge: str | None = None
+) -> SystemMessage:
+    """
+    세션에 이미 계산된 사주 차트를 LLM에 알려주는 시스템 메시지입니다.
+    저장된 차트로 복원한 세션이 계산 도구를 다시 호출하지 않도록 합니다.
+    knowledge(차트 관련 규칙 지식)가 있으면 함께 넣어 같은 내용을 검색 도구로 다시 찾지 않게 합니다.
+    """
+    content = (
+        chart_reference(saju_info, analyzed_info)
+        + "\n이 사용자의 사주는 이미 계산되어 있습니다. 다시 계산하지 말고 이 차트를 바탕으로 답변하세요."
+    )
+    if knowledge:
+        content += (
+            "\n\n[이 사주와 관련된 지식]\n"
+            + knowledge
+            + "\n위 지식으로 답할 수 있는 질문에는 지식 검색 도구를 호출하지 마세요."
+        )
+    return SystemMessage(content=content)
+
+
+def tool_results_in_current_turn(messages: list) -> bool:
+    """마지막 사용자 메시지 이후에 도구 결과가 있는지 확인합니다."""
+    for message in reversed(messages):
+        if isinstance(message, ToolMessage):
+            return True
+        if isinstance(message, HumanMessage):
+            return False
+    return False
+
+
+def render_transcript(messages: list) -> str:
+    """요약기에 넘길 수 있도록 메시지 목록을 역할별 텍스트로 변환합니다."""
+    lines = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            lines.append(f"사용자: {message.content}")
+        elif isinstance(message, AIMessage):
+            if message.content:
+                lines.append(f"챗봇: {message.content}")
+            for tool_call in message.tool_calls or []:
+                lines.append(f"챗봇(도구 호출): {tool_call.get('name')}")
+        elif isinstance(message, ToolMessage):
+            lines.append(f"도구 결과: {compact_tool_content(message.content)}")
+    return "\n".join(lines)
+
+
+def extractive_summary(previous_summary: str | None, messages: list) -> str:
+    """
+    LLM 없이 만드는 요약입니다. 각 메시지의 앞부분만 남깁니다.
+    LLM 요약기가 없거나 실패했을 때의 대체 경로로 사용합니다.
+    """
+    parts = [previous_summary] if previous_summary else []
+    for line in render_transcript(messages).splitlines():
+        parts.append(line if len(line) <= 80 else line[:80] + "…")
+    return "\n".join(parts)
+
+
+def _messages_digest(messages: list) -> str:
+    digest = sha256()
+    for message in messages:
+        digest.update(message.type.encode("utf-8"))
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        digest.update(content.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class ConversationContextManager:
+    """
+    LLM에 보낼 대화 컨텍스트를 관리합니다.
+    - 최근 max_turns 턴은 원문 그대로 유지
+    - 그보다 오래된 턴은 세션별로 캐시되는 누적 요약(rolling summary)으로 대체
+    - 현재 턴이 아닌 도구 결과는 짧은 차트 참조로 축약
+    - 전체가 token_budget을 넘으면 오래된 턴부터 요약으로 넘김
+    """
+
+    def __init__(
+        self,
+        summarizer=None,
+        max_turns: int = CONTEXT_MAX_TURNS,
+        token_budget: int = CONTEXT_TOKEN_BUDGET,
+        cache_size: int = CONTEXT_SUMMARY_CACHE_SIZE,
+    ):
+        self.summarizer = summarizer or extractive_summary
+        self.max_turns = max(1, max_turns)
+        self.token_budget = token_budget
+        self.cache_size = cache_size
+        # session_id -> (요약된 메시지 수, 요약된 메시지 digest, 요약문)
+        self._summary_cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def build_context(
+        self,
+        messages: list,
+        session_id: str | None = None,
+        max_turns: int | None = None,
+        token_budget: int | None = None,
+    ) -> dict:
+        """
+        LLM 입력용 메시지 목록을 구성합니다.
+        반환값: {"messages": [...], "summary": str | None, "summarized_count": int, "tokens": int}
+        """
+        max_turns = max(1, max_turns or self.max_turns)
+        token_budget = token_budget or self.token_budget
+
+        head, turns = split_turns(messages)
+        keep_from = max(0, len(turns) - max_turns)
+
+        # 현재 턴이 아닌 도구 결과는 축약한 형태로 유지
+        kept_turns = [self._compact_turn(turn) for turn in turns[keep_from:-1]]
+        kept_turns.append(list(turns[-1]) if turns else [])
+
+        fixed_tokens = sum(message_tokens(m) for m in head)
+        turn_tokens = [sum(message_tokens(m) for m in turn) for turn in kept_turns]
+
+        # 요약문 자리를 대략 확보한 뒤 예산을 넘으면 가장 오래된 턴부터 요약 대상으로 이동
+        summary_reserve = token_budget // 10 if keep_from > 0 else 0
+        while (
+            len(kept_turns) > 1
+            and fixed_tokens + summary_reserve + sum(turn_tokens) > token_budget
+        ):
+            kept_turns.pop(0)
+            turn_tokens.pop(0)
+            keep_from += 1
+            summary_reserve = token_budget // 10
+
+        aged_messages = [m for turn in turns[:keep_from] for m in turn]
+        summary = self._rolling_summary(session_id, aged_messages) if aged_messages else None
+
+        context_messages = list(head)
+        if summary:
+            context_messages.append(SystemMessage(content=SUMMARY_PREFIX + summary))
+        for turn in kept_turns:
+            context_messages.extend(turn)
+
+        return {
+            "messages": context_messages,
+            "summary": summary,
+            "summarized_count": len(aged_messages),
+            "tokens": sum(message_tokens(m) for m in context_messages),
+        }
+
+    def _compact_turn(self, turn: list) -> list:
+        compacted = []
+        for message in turn:
+            if isinstance(message, ToolMessage):
+                compacted.append(
+                    ToolMessage(
+                        content=compact_tool_content(message.content),
+                        tool_call_id=message.tool_call_id,
+                    )
+                )
+            else:
+                compacted.append(message)
+        return compacted
+
+    def _rolling_summary(self, session_id: str | None, aged_messages: list) -> str:
+        """
+        요약 대상 메시지의 누적 요약을 반환합니다.
+        캐시된 요약이 현재 메시지의 앞부분과 일치하면 새로 밀려난 메시지만 덧붙여 요약합니다.
+        """
+        cache_key = session_id or _messages_digest(aged_messages[:1])
+        with self._lock:
+            cached = self._summary_cache.get(cache_key)
+            if cached:
+                self._summary_cache.move_to_end(cache_key)
+
+        previous_summary = None
+        new_messages = aged_messages
+        if cached:
+            covered_count, covered_digest, cached_summary = cached
+            if covered_count <= len(aged_messages) and covered_digest == _messages_digest(
+                aged_messages[:covered_count]
+            ):
+                if covered_count == len(aged_messages):
+                    return cached_summary
+                previous_summary = cached_summary
+                new_messages = aged_messages[covered_count:]
+
+        try:
+            summary = self.summarizer(previous_summary, new_messages)
+        except Exception as e:
+            print(f"Error summarizing conversation, using extractive summary: {e}")
+            summary = extractive_summary(previous_summary, new_messages)
+
+        with self._lock:
+            self._summary_cache[cache_key] = (
+                len(aged_messages),
+                _messages_digest(aged_messages),
+                summary,
+            )
+            self._summary_cache.move_to_end(cache_key)
+            while len(self._summary_cache) > self.cache_size:
+                self._summary_cache.popitem(last=False)
+        return summary
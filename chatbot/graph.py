@@ -9,6 +9,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from chatbot.state import AgentState
 from chatbot.nodes import (
+    manage_context,
     call_llm,
     route_decision,
     call_tool,
@@ -22,6 +23,9 @@ class SajuChatbotGraph:
         self.workflow = StateGraph(AgentState)
 
         # 1. 노드 정의
+        self.workflow.add_node(
+            "manage_context", manage_context
+        )  # 대화 기록을 토큰 예산에 맞게 정리
         self.workflow.add_node("call_llm", call_llm)  # LLM 호출
         self.workflow.add_node("call_tool", call_tool)  # LLM이 결정한 도구 호출
         self.workflow.add_node(
@@ -32,8 +36,9 @@ class SajuChatbotGraph:
         )  # 사용자에게 최종 응답
 
         # 2. 엣지(Edge) 정의
-        # 시작 지점
-        self.workflow.set_entry_point("call_llm")
+        # 시작 지점: 컨텍스트 정리 후 LLM 호출
+        self.workflow.set_entry_point("manage_context")
+        self.workflow.add_edge("manage_context", "call_llm")
 
         # LLM 호출 후, 어떤 길로 갈지 결정
         self.workflow.add_conditional_edges(
@@ -50,8 +55,8 @@ class SajuChatbotGraph:
             "call_tool", "update_saju_info"
         )  # 도구 호출 결과를 바탕으로 사주 정보 업데이트
         self.workflow.add_edge(
-            "update_saju_info", "call_llm"
-        )  # 업데이트 후 다시 LLM 호출하여 최종 응답 생성 유도
+            "update_saju_info", "manage_context"
+        )  # 업데이트 후 컨텍스트를 다시 정리하고 LLM 호출하여 최종 응답 생성 유도
 
         # 사용자에게 응답 후 종료
         self.workflow.add_edge("respond_to_user", END)
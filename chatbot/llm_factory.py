@@ -0,0 +1,327 @@
+# saju_chatbot/chatbot/llm_factory.py
+# 공유 LLM 클라이언트: HTTP 연결 풀(keep-alive), 타임아웃, 지터 재시도, p95 기반 헤지 요청
+
+from langchain_openai import ChatOpenAI
+from config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    OPENAI_MODEL,
+    OPENAI_TEMPERATURE,
+    OPENAI_MAX_TOKENS,
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_MAX_KEEPALIVE,
+    LLM_HTTP_KEEPALIVE_EXPIRY,
+    LLM_CONNECT_TIMEOUT,
+    LLM_REQUEST_TIMEOUT,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE_DELAY,
+    LLM_RETRY_MAX_DELAY,
+    LLM_HEDGE_ENABLED,
+    LLM_HEDGE_QUANTILE,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_HEDGE_MIN_DELAY,
+)
+from metrics import TimingStats, metrics
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import asyncio
+import random
+import threading
+import time
+import httpx
+
+# 일시적인 오류로 보고 재시도하는 응답 코드 (요청 시간 초과, 충돌/잠금, 속도 제한, 서버 오류)
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+# 요청이 서버에 닿기 전에 실패한 전송 오류만 재시도합니다.
+# ReadTimeout 등은 서버가 이미 처리 중일 수 있어 POST를 다시 보내면 중복 실행(토큰 중복 과금)이 됩니다.
+RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+# 여러 번 보내도 결과가 같은 메서드. 그 외(POST)는 Idempotency-Key 헤더가 있을 때만 헤지합니다.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+class RetryPolicy:
+    """
+    재시도/헤지 정책과 응답 지연 통계를 한곳에 둡니다. (동기/비동기 transport가 공유)
+    - 재시도: 연결 오류(RETRY_ERRORS)와 RETRY_STATUSES 응답을 max_retries번까지 다시 보냅니다.
+      대기 시간은 full jitter(0 ~ base·2^n, 최대 max_delay)이며, Retry-After가 있으면 그 값을 따릅니다.
+    - 헤지: 응답이 최근 응답 시간의 hedge_quantile(p95)보다 늦으면 같은 요청을 하나 더 보내 먼저 온 응답을 씁니다.
+      샘플이 hedge_min_samples개 모이기 전이나, 멱등이 아닌 요청(idempotent 참고)에는 헤지하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = LLM_MAX_RETRIES,
+        base_delay: float = LLM_RETRY_BASE_DELAY,
+        max_delay: float = LLM_RETRY_MAX_DELAY,
+        hedge: bool = LLM_HEDGE_ENABLED,
+        hedge_quantile: float = LLM_HEDGE_QUANTILE,
+        hedge_min_samples: int = LLM_HEDGE_MIN_SAMPLES,
+        hedge_min_delay: float = LLM_HEDGE_MIN_DELAY,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.latency = TimingStats()
+        self.retries = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def retryable(self, attempt: int, response: httpx.Response | None = None) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        return response is None or response.status_code in RETRY_STATUSES
+
+    @staticmethod
+    def idempotent(request: httpx.Request) -> bool:
+        """같은 요청을 두 번 보내도 되는지. POST는 Idempotency-Key 헤더로 표시된 경우만 참입니다."""
+        return request.method in IDEMPOTENT_METHODS or IDEMPOTENCY_HEADER in request.headers
+
+    def backoff(self, attempt: int, response: httpx.Response | None = None) -> float:
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(self.max_delay, max(0.0, float(retry_after)))
+            except ValueError:
+                pass  # HTTP 날짜 형식은 지터 대기로 대체
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2**attempt)))
+
+    def hedge_delay(self, request: httpx.Request | None = None) -> float | None:
+        """헤지 요청을 보낼 때까지 기다릴 시간. 헤지하지 않으면 None."""
+        if not self.hedge or self.latency.count < self.hedge_min_samples:
+            return None
+        if request is not None and not self.idempotent(request):
+            return None
+        return max(self.hedge_min_delay, self.latency.percentile(self.hedge_quantile))
+
+    def record(self, seconds: float, response: httpx.Response):
+        if response.status_code < 500:
+            self.latency.observe(seconds)
+        metrics.observe("llm.http_seconds", seconds)
+
+    def stats(self) -> dict:
+        return {
+            "retries": self.retries,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedge_delay": self.hedge_delay(),
+            "latency": self.latency.snapshot(),
+        }
+
+
+class ResilientTransport(httpx.BaseTransport):
+    """재시도와 헤지를 적용하는 동기 transport. 실제 전송은 연결 풀을 가진 transport가 담당합니다."""
+
+    def __init__(self, transport: httpx.BaseTransport, policy: RetryPolicy):
+        self.transport = transport
+        self.policy = policy
+        self._hedge_pool = ThreadPoolExecutor(max_workers=LLM_HTTP_MAX_CONNECTIONS, thread_name_prefix="llm-hedge")
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()  # 재전송할 수 있도록 본문을 메모리에 올림
+        attempt = 0
+        while True:
+            try:
+                response = self._send(request)
+            except RETRY_ERRORS:
+                if not self.policy.retryable(attempt):
+                    raise
+                delay = self.policy.backoff(attempt)
+            else:
+                if not self.policy.retryable(attempt, response):
+                    return response
+                delay = self.policy.backoff(attempt, response)
+                response.close()
+            attempt += 1
+            self.policy.retries += 1
+            metrics.inc("llm.retries")
+            time.sleep(delay)
+
+    def close(self):
+        self._hedge_pool.shutdown(wait=False)
+        self.transport.close()
+
+    def _timed(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        response = self.transport.handle_request(request)
+        self.policy.record(time.perf_counter() - start, response)
+        return response
+
+    def _send(self, request: httpx.Request) -> httpx.Response:
+        delay = self.policy.hedge_delay(request)
+        if delay is None:
+            return self._timed(request)
+        first = self._hedge_pool.submit(self._timed, request)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        self.policy.hedged += 1
+        metrics.inc("llm.hedged_requests")
+        hedge = self._hedge_pool.submit(self._timed, request)
+        pending, error = {first, hedge}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                if future is hedge:
+                    self.policy.hedge_wins += 1
+                # 늦게 끝나는 요청의 응답은 받는 즉시 닫아 연결을 풀에 돌려줌
+                for other in pending | (done - {future}):
+                    other.add_done_callback(_close_result)
+                return future.result()
+        raise error
+
+
+class ResilientAsyncTransport(httpx.AsyncBaseTransport):
+    """ResilientTransport의 비동기 버전. 헤지에서 진 요청은 취소합니다."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, policy: RetryPolicy):
+        self.transport = transport
+        self.policy = policy
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        attempt = 0
+        while True:
+            try:
+                response = await self._send(request)
+            except RETRY_ERRORS:
+                if not self.policy.retryable(attempt):
+                    raise
+                delay = self.policy.backoff(attempt)
+            else:
+                if not self.policy.retryable(attempt, response):
+                    return response
+                delay = self.policy.backoff(attempt, response)
+                await response.aclose()
+            attempt += 1
+            self.policy.retries += 1
+            metrics.inc("llm.retries")
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+    async def _timed(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+        self.policy.record(time.perf_counter() - start, response)
+        return response
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        delay = self.policy.hedge_delay(request)
+        if delay is None:
+            return await self._timed(request)
+        first = asyncio.ensure_future(self._timed(request))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+
+        self.policy.hedged += 1
+        metrics.inc("llm.hedged_requests")
+        hedge = asyncio.ensure_future(self._timed(request))
+        pending, error = {first, hedge}, None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                    continue
+                if task is hedge:
+                    self.policy.hedge_wins += 1
+                for other in pending:
+                    other.cancel()
+                for other in done - {task}:
+                    if other.exception() is None:
+                        await other.result().aclose()
+                return task.result()
+        raise error
+
+
+def _close_result(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def http_timeout() -> httpx.Timeout:
+    return httpx.Timeout(LLM_REQUEST_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+
+
+def create_http_clients(policy: RetryPolicy | None = None) -> tuple[httpx.Client, httpx.AsyncClient]:
+    """연결 풀과 재시도/헤지 정책을 공유하는 동기/비동기 HTTP 클라이언트"""
+    policy = policy or RetryPolicy()
+    limits = http_limits()
+    sync_client = httpx.Client(
+        transport=ResilientTransport(httpx.HTTPTransport(limits=limits), policy),
+        timeout=http_timeout(),
+    )
+    async_client = httpx.AsyncClient(
+        transport=ResilientAsyncTransport(httpx.AsyncHTTPTransport(limits=limits), policy),
+        timeout=http_timeout(),
+    )
+    return sync_client, async_client
+
+
+def create_chat_model(
+    http_clients: tuple[httpx.Client, httpx.AsyncClient] | None = None, **overrides
+) -> ChatOpenAI:
+    """
+    ChatOpenAI를 만듭니다. 재시도는 transport가 담당하므로 SDK 재시도(max_retries)는 끕니다.
+    overrides로 model, temperature, base_url 등을 바꿀 수 있습니다.
+    """
+    sync_client, async_client = http_clients or shared_http_clients()
+    options = {
+        "model": OPENAI_MODEL,
+        "temperature": OPENAI_TEMPERATURE,
+        "max_tokens": OPENAI_MAX_TOKENS,
+        "api_key": OPENAI_API_KEY,
+        "base_url": OPENAI_BASE_URL,
+        "timeout": http_timeout(),
+        "max_retries": 0,
+        "http_client": sync_client,
+        "http_async_client": async_client,
+    }
+    options.update(overrides)
+    return ChatOpenAI(**options)
+
+
+_lock = threading.Lock()
+_http_clients = None
+_chat_model = None
+
+
+def shared_http_clients() -> tuple[httpx.Client, httpx.AsyncClient]:
+    """프로세스 전체가 공유하는 HTTP 클라이언트 (keep-alive 연결을 모든 LLM 호출이 재사용)"""
+    global _http_clients
+    with _lock:
+        if _http_clients is None:
+            policy = RetryPolicy()
+            _http_clients = create_http_clients(policy)
+            metrics.register_collector("llm_http", policy.stats)
+        return _http_clients
+
+
+def get_chat_model() -> ChatOpenAI:
+    """그래프 노드와 도구가 함께 쓰는 기본 ChatOpenAI"""
+    global _chat_model
+    clients = shared_http_clients()
+    with _lock:
+        if _chat_model is None:
+            _chat_model = create_chat_model(clients)
+        return _chat_model
@@ -1,32 +1,101 @@
 # saju_chatbot/chatbot/nodes.py
 
-from langchain_openai import ChatOpenAI
+from chatbot.llm_factory import get_chat_model
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
 from chatbot.state import AgentState
+from chatbot.context import (
+    ConversationContextManager,
+    chart_system_message,
+    render_transcript,
+    tool_results_in_current_turn,
+)
+from chatbot.token_meter import token_meter
+from core.saju_knowledge import build_chart_knowledge
 from chatbot.tools import (
     tools,
     saju_analyzer,
     saju_calculator,
     saju_interpreter,
 )  # 전역 인스턴스 가져오기
-from config import OPENAI_API_KEY, OPENAI_MODEL, OPENAI_TEMPERATURE, OPENAI_MAX_TOKENS
+from config import (
+    CONTEXT_MAX_TURNS_OVER_BUDGET,
+    CONTEXT_TOKEN_BUDGET,
+)
 from datetime import datetime
 import json
 
-# LLM 초기화 (Node 내부에서 호출하기 위함)
-llm = ChatOpenAI(
-    model=OPENAI_MODEL,
-    temperature=OPENAI_TEMPERATURE,
-    max_tokens=OPENAI_MAX_TOKENS,
-    api_key=OPENAI_API_KEY
-)
+# LLM 초기화 (Node 내부에서 호출하기 위함, 도구와 같은 인스턴스/연결 풀 공유)
+llm = get_chat_model()
+
+
+def summarize_with_llm(previous_summary: str | None, messages: list) -> str:
+    """오래된 대화 턴을 LLM으로 요약합니다. 이전 요약이 있으면 이어서 갱신합니다."""
+    prompt = (
+        "다음은 사주 상담 챗봇과 사용자의 이전 대화입니다. "
+        "사용자의 생년월일시, 계산된 사주 정보, 사용자가 궁금해한 주제와 챗봇이 이미 답한 핵심 내용을 "
+        "빠짐없이 간결한 한국어로 요약해주세요.\n\n"
+    )
+    if previous_summary:
+        prompt += f"--- 기존 요약 ---\n{previous_summary}\n\n"
+    prompt += f"--- 추가된 대화 ---\n{render_transcript(messages)}"
+    response = llm.invoke(prompt)
+    token_meter.record(response, node="summarize_context", prompt=prompt)
+    return response.content
+
+
+# 대화 컨텍스트 관리자 (세션별 누적 요약을 프로세스 내에 캐시)
+context_manager = ConversationContextManager(summarizer=summarize_with_llm)
+
+
+def manage_context(state: AgentState):
+    """
+    LLM 호출 전에 대화 기록을 정리합니다.
+    최근 턴은 그대로 두고, 오래된 턴은 요약으로, 지난 도구 결과는 차트 참조로 바꿔 토큰 예산을 지킵니다.
+    """
+    session_id = state.get("session_id")
+    if token_meter.over_budget(session_id):
+        # 세션 토큰 예산 초과: 더 짧은 컨텍스트로 전환
+        context = context_manager.build_context(
+            state["messages"],
+            session_id=session_id,
+            max_turns=CONTEXT_MAX_TURNS_OVER_BUDGET,
+            token_budget=CONTEXT_TOKEN_BUDGET // 2,
+        )
+    else:
+        context = context_manager.build_context(state["messages"], session_id=session_id)
+    if context["summarized_count"]:
+        print(
+            f"Context window: summarized {context['summarized_count']} messages, "
+            f"~{context['tokens']} tokens sent to LLM"
+        )
+    llm_context = context["messages"]
+    knowledge = state.get("saju_knowledge")
+    if state.get("saju_calculated_info"):
+        # 저장된 차트에서 복원한 세션은 분석 단계를 거치지 않았으므로 여기서 지식을 구성 (규칙 조회만, 임베딩 없음)
+        knowledge = knowledge or build_chart_knowledge(state.get("saju_analyzed_info"))
+        # 계산된(또는 저장된 차트에서 복원된) 사주와 관련 지식은 요약/축약과 관계없이 항상 LLM에 제공
+        llm_context = [
+            chart_system_message(
+                state["saju_calculated_info"], state.get("saju_analyzed_info"), knowledge
+            )
+        ] + llm_context
+    return {
+        "llm_context": llm_context,
+        "conversation_summary": context["summary"],
+        "saju_knowledge": knowledge,
+    }
+
+
+def _llm_messages(state: AgentState) -> list:
+    """LLM에 보낼 메시지를 반환합니다. 정리된 컨텍스트가 없으면 전체 기록을 사용합니다."""
+    return state.get("llm_context") or state["messages"]
 
 
 def call_llm(state: AgentState):
     """
     LLM을 호출하여 사용자의 의도를 파악하고, 필요한 경우 도구를 사용하도록 유도합니다.
     """
-    messages = state["messages"]
+    messages = _llm_messages(state)
 
     # 디버깅을 위한 메시지 타입 확인
     print(f"Messages count: {len(messages)}")
@@ -38,6 +107,7 @@ def call_llm(state: AgentState):
     try:
         llm_with_tools = llm.bind_tools(tools)
         response = llm_with_tools.invoke(messages)
+        token_meter.record(response, node="call_llm", prompt=messages)
         return {"messages": [response]}
     except Exception as e:
         print(f"Error in call_llm: {e}")
@@ -89,13 +159,14 @@ def call_tool(state: AgentState):
 
                 print(f"Tool result: {content}")
                 tool_results.append(
-                    ToolMessage(content=content, tool_call_id=tool_call["id"])
+                    ToolMessage(content=content, tool_call_id=tool_call["id"], name=tool_name)
                 )
             else:
                 tool_results.append(
                     ToolMessage(
                         content=f"Error: Tool '{tool_name}' not found.",
                         tool_call_id=tool_call["id"],
+                        name=tool_name,
                     )
                 )
         except Exception as e:
@@ -123,7 +194,12 @@ def respond_to_user(state: AgentState):
     final_response_message = latest_message
 
     # 사주 계산/분석/해석 결과가 있다면 이를 활용하여 LLM이 답변하도록 다시 LLM 호출
-    if state.get("saju_calculated_info") and state.get("saju_analyzed_info"):
+    # (저장된 차트로 복원한 세션처럼 이번 턴에 도구 결과가 없으면 call_llm의 답변을 그대로 사용)
+    if (
+        state.get("saju_calculated_info")
+        and state.get("saju_analyzed_info")
+        and tool_results_in_current_turn(state["messages"])
+    ):
         analyzed_info = state["saju_analyzed_info"]
         user_input_message = ""
         # 사용자 질문이 있었는지 확인하고 넘겨줌
@@ -155,7 +231,11 @@ def respond_to_user(state: AgentState):
 
             # 현재 상태의 모든 메시지를 다시 LLM에게 전달하여 최종 사용자 응답 생성
             llm_with_tools = llm.bind_tools(tools)
-            final_llm_response = llm_with_tools.invoke(state["messages"])
+            llm_messages = _llm_messages(state)
+            final_llm_response = llm_with_tools.invoke(llm_messages)
+            token_meter.record(
+                final_llm_response, node="respond_to_user", prompt=llm_messages
+            )
             return {"messages": [final_llm_response]}
 
         except Exception as e:
@@ -187,6 +267,8 @@ def update_saju_info(state: AgentState):
                 return {
                     "saju_calculated_info": tool_result["saju_info"],
                     "saju_analyzed_info": tool_result["analyzed_info"],
+                    # 다음 턴들이 검색 도구 없이 답할 수 있도록 차트 관련 지식을 미리 구성
+                    "saju_knowledge": build_chart_knowledge(tool_result["analyzed_info"]),
                 }
             elif "error" in tool_result:
                 return {"error_message": tool_result["message"]}
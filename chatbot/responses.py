@@ -0,0 +1,117 @@
+# saju_chatbot/chatbot/responses.py
+# API 응답 인코딩: orjson JSON 응답, 대화 기록(full_history) 형식, 응답 압축
+
+from fastapi.responses import JSONResponse
+from starlette.middleware.gzip import GZipMiddleware
+from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json으로 인코딩
+    orjson = None
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # brotli-asgi가 없으면 gzip만 사용
+    BrotliMiddleware = None
+
+# full: 도구 호출/결과를 포함한 전체 기록, compact: 사용자/챗봇 대화만, none: 기록을 보내지 않음
+HISTORY_MODES = ("full", "compact", "none")
+# 압축하지 않는 경로
+# - 만들어지는 대로 바로 전달되어야 하는 스트리밍 응답
+#   (압축 미들웨어는 minimum_size만큼 모일 때까지 보내지 않고, 이후에도 블록 단위로 모아서 보냄)
+# - 강한 ETag로 공유 캐시에 저장되는 응답 (인코딩마다 본문이 달라지면 같은 강한 ETag를 쓸 수 없음)
+UNCOMPRESSED_PATHS = ("/chat/stream", "/saju/batch", "/saju/chart")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    orjson으로 인코딩하는 JSON 응답. 엔드포인트에서 직접 반환하면 jsonable_encoder도 거치지 않습니다.
+    한글을 \\uXXXX로 이스케이프하지 않고 UTF-8 그대로 쓰므로 응답 크기도 줄어듭니다.
+    orjson이 지원하지 않는 객체는 str로 변환합니다.
+    """
+
+    def render(self, content) -> bytes:
+        if orjson is None:
+            return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def tool_content(content):
+    """도구 결과가 JSON 문자열이면 객체로 풀어 응답 JSON 안에 이스케이프된 문자열로 중첩되지 않게 합니다."""
+    if isinstance(content, str) and content[:1] in ("{", "["):
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            pass
+    return content
+
+
+def history_payload(messages: list, mode: str = "full") -> list[dict] | None:
+    """
+    응답 형태 변환 (history에 포함될 메시지 형식)
+    compact는 도구 호출 메시지와 도구 결과를 빼고 사용자 질문/챗봇 답변만 남깁니다.
+    (사주 차트는 세션에 저장되므로 다음 요청의 history로 보내지 않아도 됩니다.)
+    """
+    if mode == "none":
+        return None
+    response_messages_for_history = []
+    for msg in messages:
+        if isinstance(msg, HumanMessage):
+            response_messages_for_history.append(
+                {"role": "user", "content": msg.content}
+            )
+        elif isinstance(msg, AIMessage):
+            # tool_calls가 있다면 함께 반환
+            if msg.tool_calls:
+                if mode == "compact":
+                    continue
+                response_messages_for_history.append(
+                    {
+                        "role": "assistant",
+                        "content": msg.content,
+                        "tool_calls": [tc for tc in msg.tool_calls],
+                    }
+                )
+            else:
+                response_messages_for_history.append(
+                    {"role": "assistant", "content": msg.content}
+                )
+        elif isinstance(msg, ToolMessage) and mode != "compact":
+            response_messages_for_history.append(
+                {
+                    "role": "tool",
+                    "content": tool_content(msg.content),
+                    "tool_call_id": msg.tool_call_id,
+                }
+            )
+    return response_messages_for_history
+
+
+class SkipCompressionMiddleware:
+    """UNCOMPRESSED_PATHS 요청은 압축 미들웨어를 거치지 않고 바로 앱에 보내는 ASGI 미들웨어"""
+
+    def __init__(self, app, compression_class, excluded_paths=UNCOMPRESSED_PATHS, **options):
+        self.app = app
+        self.compressed_app = compression_class(app, **options)
+        self.excluded_paths = frozenset(excluded_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+        else:
+            await self.compressed_app(scope, receive, send)
+
+
+def add_compression(app, minimum_size: int) -> str:
+    """
+    minimum_size 바이트 이상의 응답을 압축하는 미들웨어를 추가하고 사용하는 방식을 반환합니다.
+    brotli-asgi가 있으면 br(지원하지 않는 클라이언트는 gzip), 없으면 gzip을 사용합니다.
+    UNCOMPRESSED_PATHS의 스트리밍 응답은 어느 쪽이든 압축하지 않습니다.
+    """
+    if BrotliMiddleware is None:
+        app.add_middleware(SkipCompressionMiddleware, compression_class=GZipMiddleware, minimum_size=minimum_size)
+        return "gzip"
+    app.add_middleware(SkipCompressionMiddleware, compression_class=BrotliMiddleware, minimum_size=minimum_size)
+    return "br"
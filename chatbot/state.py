@@ -26,6 +26,9 @@ class AgentState(TypedDict):
     # 사주 분석 결과
     saju_analyzed_info: Annotated[dict | None, "사주 오행, 십성, 신살 등 분석 결과"]
 
+    # 분석된 차트에 해당하는 규칙 지식 (분석 시 한 번 구성, 이후 턴의 컨텍스트에 포함)
+    saju_knowledge: Annotated[str | None, "차트 관련 사주 지식"]
+
     # 사용자의 현재 의도 (예: 사주 풀이, 오늘 운세, 궁합 등)
     current_intent: Annotated[str | None, "사용자 의도"]
 
@@ -34,3 +37,9 @@ class AgentState(TypedDict):
 
     # 세션 ID (MySQL 등에서 사용자 세션 관리용)
     session_id: Annotated[str, "사용자 세션 ID"]
+
+    # LLM에 실제로 전달할 메시지 (최근 턴 + 이전 대화 요약, manage_context 노드가 갱신)
+    llm_context: Annotated[list | None, "토큰 예산에 맞춘 LLM 입력 메시지"]
+
+    # 오래된 턴을 대체하는 누적 요약
+    conversation_summary: Annotated[str | None, "이전 대화 요약"]
@@ -0,0 +1,63 @@
+# saju_chatbot/chatbot/streaming.py
+# LangGraph astream_events(v2) 이벤트를 클라이언트용 SSE(Server-Sent Events) 이벤트로 변환
+
+import json
+
+# 진행 상황을 알릴 그래프 노드
+STREAMED_NODES = ("manage_context", "call_llm", "call_tool", "update_saju_info", "respond_to_user")
+# 사용자에게 보일 답변 토큰을 만드는 노드 (manage_context의 요약, 도구 내부 해석 LLM 호출은 제외)
+TOKEN_NODES = ("call_llm", "respond_to_user")
+CHART_TOOL = "calculate_and_analyze_saju"
+
+
+def format_sse(event: str, data: dict) -> str:
+    """SSE 메시지 한 개 (event 이름 + JSON data)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def parse_chart(output) -> dict | None:
+    """사주 계산 도구 결과에서 차트(saju_info, analyzed_info)를 꺼냅니다. 오류 결과면 None."""
+    content = getattr(output, "content", output)
+    if isinstance(content, str):
+        try:
+            content = json.loads(content)
+        except json.JSONDecodeError:
+            return None
+    if isinstance(content, dict) and "saju_info" in content and "analyzed_info" in content:
+        return {"saju_info": content["saju_info"], "analyzed_info": content["analyzed_info"]}
+    return None
+
+
+def translate_event(event: dict) -> tuple[str, dict] | None:
+    """
+    astream_events 이벤트 하나를 (SSE 이벤트 이름, 데이터)로 변환합니다. 알릴 필요가 없으면 None.
+    - node_started / node_finished: 그래프 노드 진행
+    - tool_started / tool_finished: 도구 실행
+    - chart: 사주 계산 도구 완료 (클라이언트가 해석 전에 차트를 먼저 그릴 수 있음)
+    - token: 답변 토큰 조각
+    """
+    kind = event.get("event")
+    name = event.get("name")
+    node = (event.get("metadata") or {}).get("langgraph_node")
+
+    if kind in ("on_chain_start", "on_chain_end") and name in STREAMED_NODES and node == name:
+        return ("node_started" if kind == "on_chain_start" else "node_finished"), {"node": name}
+    if kind == "on_tool_start":
+        return "tool_started", {"tool": name}
+    if kind == "on_tool_end":
+        if name == CHART_TOOL:
+            chart = parse_chart((event.get("data") or {}).get("output"))
+            if chart:
+                return "chart", chart
+        return "tool_finished", {"tool": name}
+    if kind == "on_chat_model_stream" and node in TOKEN_NODES:
+        chunk = (event.get("data") or {}).get("chunk")
+        content = getattr(chunk, "content", None)
+        if isinstance(content, str) and content:
+            return "token", {"node": node, "delta": content}
+    return None
+
+
+def is_graph_end(event: dict) -> bool:
+    """그래프 전체 실행이 끝난 이벤트인지 확인합니다. (data.output이 최종 상태)"""
+    return event.get("event") == "on_chain_end" and not event.get("parent_ids")
@@ -0,0 +1,165 @@
+# saju_chatbot/chatbot/token_meter.py
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+
+from chatbot.context import count_tokens, message_tokens
+from config import TOKEN_BUDGET_PER_SESSION, TOKEN_METER_MAX_SESSIONS
+from metrics import metrics
+
+# 현재 요청의 (session_id, user_id, 요청별 사용량)을 노드/도구까지 전달하기 위한 컨텍스트 변수
+_current_scope = ContextVar("token_meter_scope", default=None)
+
+
+def _empty_usage() -> dict:
+    return {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0, "llm_calls": 0}
+
+
+def _add_usage(target: dict, input_tokens: int, output_tokens: int):
+    target["input_tokens"] += input_tokens
+    target["output_tokens"] += output_tokens
+    target["total_tokens"] += input_tokens + output_tokens
+    target["llm_calls"] += 1
+
+
+def _estimate_prompt_tokens(prompt) -> int:
+    if prompt is None:
+        return 0
+    if isinstance(prompt, str):
+        return count_tokens(prompt)
+    return sum(message_tokens(m) if hasattr(m, "content") else count_tokens(str(m)) for m in prompt)
+
+
+class TokenMeter:
+    """
+    LLM 호출마다 토큰 사용량을 기록하고 세션/사용자/노드별로 집계합니다.
+    응답의 usage_metadata를 우선 사용하고, 없으면 tiktoken(또는 근사치)으로 추정합니다.
+    세션 누적 사용량이 예산을 넘으면 over_budget()이 True가 되어 저렴한 경로로 전환할 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        session_budget: int = TOKEN_BUDGET_PER_SESSION,
+        max_sessions: int = TOKEN_METER_MAX_SESSIONS,
+    ):
+        self.session_budget = session_budget
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()  # session_id -> {"user_id", "usage", "by_node"}
+        self._users = OrderedDict()  # user_id -> usage
+
+    @contextmanager
+    def scope(self, session_id: str, user_id: str | None = None):
+        """
+        요청 하나의 범위를 지정합니다. 범위 안의 LLM 호출은 이 세션/사용자에 귀속됩니다.
+        요청 단위 사용량 dict를 yield 합니다.
+        """
+        request_usage = _empty_usage()
+        token = _current_scope.set(
+            {"session_id": session_id, "user_id": user_id, "usage": request_usage}
+        )
+        try:
+            yield request_usage
+        finally:
+            _current_scope.reset(token)
+
+    def record(self, response, node: str, prompt=None) -> dict:
+        """
+        LLM 응답 하나의 토큰 사용량을 기록합니다.
+        response: AIMessage 등 usage_metadata를 가질 수 있는 응답 객체
+        node: 호출한 그래프 노드/컴포넌트 이름 (예: call_llm, respond_to_user, interpret_saju)
+        prompt: usage_metadata가 없을 때 입력 토큰 추정에 사용할 프롬프트
+        """
+        usage_metadata = getattr(response, "usage_metadata", None) or {}
+        input_tokens = usage_metadata.get("input_tokens")
+        output_tokens = usage_metadata.get("output_tokens")
+        estimated = input_tokens is None or output_tokens is None
+        if input_tokens is None:
+            input_tokens = _estimate_prompt_tokens(prompt)
+        if output_tokens is None:
+            content = getattr(response, "content", "")
+            output_tokens = count_tokens(content if isinstance(content, str) else str(content))
+
+        scope = _current_scope.get()
+        session_id = scope["session_id"] if scope else None
+        user_id = scope["user_id"] if scope else None
+
+        with self._lock:
+            if scope:
+                _add_usage(scope["usage"], input_tokens, output_tokens)
+            if session_id:
+                session = self._sessions.get(session_id)
+                if session is None:
+                    session = {"user_id": user_id, "usage": _empty_usage(), "by_node": {}}
+                    self._sessions[session_id] = session
+                self._sessions.move_to_end(session_id)
+                _add_usage(session["usage"], input_tokens, output_tokens)
+                node_usage = session["by_node"].setdefault(node, _empty_usage())
+                _add_usage(node_usage, input_tokens, output_tokens)
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            if user_id:
+                user_usage = self._users.get(user_id)
+                if user_usage is None:
+                    user_usage = self._users[user_id] = _empty_usage()
+                self._users.move_to_end(user_id)
+                _add_usage(user_usage, input_tokens, output_tokens)
+                while len(self._users) > self.max_sessions:
+                    self._users.popitem(last=False)
+
+        metrics.inc("llm.calls")
+        metrics.inc("llm.tokens.input", input_tokens)
+        metrics.inc("llm.tokens.output", output_tokens)
+        metrics.inc(f"llm.tokens.node.{node}", input_tokens + output_tokens)
+        if estimated:
+            metrics.inc("llm.tokens.estimated_calls")
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens}
+
+    def session_usage(self, session_id: str) -> dict:
+        """세션의 누적 사용량을 반환합니다. (노드별 내역 포함)"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return {**_empty_usage(), "by_node": {}}
+            return {
+                **session["usage"],
+                "by_node": {k: dict(v) for k, v in session["by_node"].items()},
+            }
+
+    def user_usage(self, user_id: str) -> dict:
+        with self._lock:
+            return dict(self._users.get(user_id) or _empty_usage())
+
+    def over_budget(self, session_id: str | None = None) -> bool:
+        """세션 누적 사용량이 예산을 넘었는지 확인합니다. session_id가 없으면 현재 요청의 세션을 사용합니다."""
+        if not self.session_budget:
+            return False
+        if session_id is None:
+            scope = _current_scope.get()
+            session_id = scope["session_id"] if scope else None
+        if not session_id:
+            return False
+        with self._lock:
+            session = self._sessions.get(session_id)
+            return bool(session) and session["usage"]["total_tokens"] >= self.session_budget
+
+    def summary(self) -> dict:
+        """메트릭 엔드포인트용 요약 정보"""
+        with self._lock:
+            return {
+                "tracked_sessions": len(self._sessions),
+                "tracked_users": len(self._users),
+                "session_budget": self.session_budget,
+                "sessions_over_budget": sum(
+                    1
+                    for s in self._sessions.values()
+                    if self.session_budget and s["usage"]["total_tokens"] >= self.session_budget
+                ),
+            }
+
+
+# 전역 토큰 미터 인스턴스
+token_meter = TokenMeter()
+metrics.register_collector("token_meter", token_meter.summary)
@@ -5,10 +5,13 @@ from datetime import datetime
 from core.saju_calculator import SajuCalculator
 from core.saju_analyzer import SajuAnalyzer
 from core.saju_interpreter import SajuInterpreter
+from core.term_lookup import TermLookup, render_entries
+from core.single_flight import SingleFlight
 from database.mysql_manager import MySQLManager
 from database.chroma_manager import ChromaManager
-from langchain_openai import ChatOpenAI
-from config import OPENAI_API_KEY, OPENAI_MODEL, OPENAI_TEMPERATURE, OPENAI_MAX_TOKENS  # OpenAI 설정 로드
+from chatbot.token_meter import token_meter
+from metrics import metrics
+from chatbot.llm_factory import get_chat_model
 
 import json
 from typing import Any
@@ -54,15 +57,15 @@ saju_calculator = SajuCalculator()
 saju_analyzer = SajuAnalyzer()
 mysql_manager = MySQLManager()
 chroma_manager = ChromaManager()
-# LLM 초기화 (tool 내부에서 직접 접근하기 위함)
-llm_for_tools = ChatOpenAI(
-    model=OPENAI_MODEL,
-    temperature=OPENAI_TEMPERATURE,
-    max_tokens=OPENAI_MAX_TOKENS,
-    api_key=OPENAI_API_KEY
-)
+# LLM 초기화 (tool 내부에서 직접 접근하기 위함, 연결 풀/재시도 설정은 llm_factory에서 공유)
+llm_for_tools = get_chat_model()
 saju_interpreter = SajuInterpreter()
 saju_interpreter.set_llm(llm_for_tools)  # Interpreter에 LLM 주입
+saju_interpreter.set_token_meter(token_meter)  # 해석 LLM 호출의 토큰 사용량 기록
+term_lookup = TermLookup()  # 용어명/별칭(한글, 한자) Aho-Corasick 조회기
+# 트래픽이 몰릴 때 같은 사주 계산/해석이 동시에 여러 번 실행되지 않도록 진행 중인 호출을 합침
+chart_flight = SingleFlight("calculate_and_analyze_saju")
+interpretation_flight = SingleFlight("interpret_saju")
 
 
 @tool
@@ -79,6 +82,18 @@ def calculate_and_analyze_saju(
     입력: birth_year (년), birth_month (월), birth_day (일), birth_hour (시), is_lunar (음력 여부, 기본값 False), is_leap_month (윤달 여부, 기본값 False)
     출력: 사주팔자 계산 결과 및 분석 결과 (딕셔너리 형태)
     """
+    key = (birth_year, birth_month, birth_day, birth_hour, bool(is_lunar), bool(is_leap_month))
+    return chart_flight.do(key, _calculate_and_analyze, *key)
+
+
+def _calculate_and_analyze(
+    birth_year: int,
+    birth_month: int,
+    birth_day: int,
+    birth_hour: int,
+    is_lunar: bool,
+    is_leap_month: bool,
+) -> str:
     try:
         # 시간은 입력 시에 0-23시 기준으로 통일
         birth_datetime = datetime(birth_year, birth_month, birth_day, birth_hour, 0)
@@ -122,8 +137,20 @@ def get_saju_interpretation(
             return "사주 해석을 위해서는 먼저 생년월일시 정보가 필요합니다. 태어난 연도, 월, 일, 시간을 알려주세요."
 
         # Interpreter는 이미 LLM을 가지고 있으므로 바로 호출
-        interpretation = saju_interpreter.interpret_saju(
-            analyzed_saju_info, user_question
+        # 세션 토큰 예산을 넘었다면 LLM 없이 규칙 기반 해석으로 대체
+        # 같은 분석 결과/질문의 해석이 진행 중이면 LLM을 다시 호출하지 않고 그 결과를 함께 받음
+        template_only = token_meter.over_budget()
+        key = (
+            json.dumps(analyzed_saju_info, ensure_ascii=False, sort_keys=True, default=str),
+            user_question,
+            template_only,
+        )
+        interpretation = interpretation_flight.do(
+            key,
+            saju_interpreter.interpret_saju,
+            analyzed_saju_info,
+            user_question,
+            template_only=template_only,
         )
         return interpretation
     except Exception as e:
@@ -133,11 +160,17 @@ def get_saju_interpretation(
 @tool
 def retrieve_saju_knowledge(query: str) -> str:
     """
-    사주 관련 질문에 대해 ChromaDB에서 관련 지식을 검색하여 제공합니다.
+    사주 관련 질문에 대해 관련 지식을 검색하여 제공합니다.
+    질문에 알려진 용어(역마살, 十神, 갑목 등)가 있으면 해당 항목을 바로 반환하고, 없으면 벡터 검색을 사용합니다.
     입력: query (검색할 질문 또는 키워드)
     출력: 검색된 관련 지식 문서 내용 (문자열)
     """
     try:
+        entries = term_lookup.lookup(query)
+        if entries:
+            metrics.inc("retrieval.term_lookup_hits")
+            return render_entries(entries)
+
         docs = chroma_manager.retrieve_knowledge(query, k=5)  # 상위 5개 문서 검색
         if not docs:
             return "죄송합니다, 해당 질문에 대한 사주 지식을 찾을 수 없습니다."
@@ -149,6 +182,25 @@ def retrieve_saju_knowledge(query: str) -> str:
         return f"사주 지식 검색 중 오류가 발생했습니다: {e}"
 
 
+@tool
+def retrieve_chart_knowledge(analyzed_saju_info: dict = None, query: str = None) -> str:
+    """
+    분석된 사주의 일간, 신살, 가장 강한 오행에 해당하는 지식만 골라 제공합니다.
+    전체 지식에서 검색하는 retrieve_saju_knowledge보다 정확하고 빠르므로, 사용자의 사주에 대한 설명에는 이 도구를 사용합니다.
+    입력: analyzed_saju_info (사주 분석 결과 딕셔너리), query (해당 범위 안에서 찾을 질문, 선택 사항)
+    출력: 관련 지식 문서 내용 (문자열)
+    """
+    try:
+        if not analyzed_saju_info:
+            return "사주 지식을 찾으려면 먼저 생년월일시로 사주를 계산해야 합니다."
+        docs = chroma_manager.retrieve_chart_knowledge(analyzed_saju_info, query)
+        if not docs:
+            return "죄송합니다, 해당 사주에 대한 지식을 찾을 수 없습니다."
+        return "\n\n".join([doc.page_content for doc in docs])
+    except Exception as e:
+        return f"사주 지식 검색 중 오류가 발생했습니다: {e}"
+
+
 @tool
 def save_user_session_data(
     session_id: str,
@@ -222,6 +274,7 @@ tools = [
     calculate_and_analyze_saju,
     get_saju_interpretation,
     retrieve_saju_knowledge,
+    retrieve_chart_knowledge,
     save_user_session_data,
     get_user_session_data,
 ]
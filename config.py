@@ -21,7 +21,93 @@ CHROMA_PERSIST_DIRECTORY = "./chroma_db"
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 OPENAI_TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0.3"))
 OPENAI_MAX_TOKENS = int(os.getenv("OPENAI_MAX_TOKENS", "2000"))
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None  # OpenAI 호환 서버 주소 (기본: api.openai.com)
 
 # Embedding Model 설정 (HuggingFace)
 EMBEDDING_MODEL_NAME = "jhgan/ko-sroberta-multitask"  # 한국어 임베딩 모델로 변경 고려
 EMBEDDING_MODEL_DEVICE = "cpu"
+
+# 대화 컨텍스트 관리 설정 (긴 세션의 프롬프트 토큰 제한)
+CONTEXT_MAX_TURNS = int(os.getenv("CONTEXT_MAX_TURNS", "6"))  # 원문 그대로 유지할 최근 턴 수
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000"))  # LLM 입력 토큰 예산
+CONTEXT_SUMMARY_CACHE_SIZE = int(os.getenv("CONTEXT_SUMMARY_CACHE_SIZE", "1024"))  # 요약 캐시 세션 수
+
+# 토큰 사용량 관리 설정
+TOKEN_BUDGET_PER_SESSION = int(os.getenv("TOKEN_BUDGET_PER_SESSION", "100000"))  # 0이면 제한 없음
+TOKEN_METER_MAX_SESSIONS = int(os.getenv("TOKEN_METER_MAX_SESSIONS", "10000"))  # 메모리에 보관할 세션 수
+CONTEXT_MAX_TURNS_OVER_BUDGET = int(os.getenv("CONTEXT_MAX_TURNS_OVER_BUDGET", "2"))  # 예산 초과 세션의 유지 턴 수
+
+# MySQL 연결 풀 설정
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "10"))  # 풀 크기 (mysql-connector 최대 32)
+MYSQL_POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", "5"))  # 연결 대기 최대 시간 (초)
+MYSQL_RECONNECT_ATTEMPTS = int(os.getenv("MYSQL_RECONNECT_ATTEMPTS", "3"))  # 끊긴 연결 재연결 시도 횟수
+MYSQL_RECONNECT_DELAY = int(os.getenv("MYSQL_RECONNECT_DELAY", "1"))  # 재연결 시도 간격 (초)
+
+# 세션/대화 기록 write-behind 저장 설정
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "100"))  # 이 개수가 쌓이면 즉시 flush
+WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", "1.0"))  # 최대 flush 주기 (초)
+
+# 세션 캐시 설정 (MySQL get_user_session 앞단)
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "10000"))  # 프로세스 내 캐시 최대 세션 수
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "300"))  # 프로세스 내 캐시 유지 시간 (초)
+SESSION_CACHE_REDIS_URL = os.getenv("SESSION_CACHE_REDIS_URL")  # 설정 시 워커 간 공유 캐시(Redis) 사용
+SESSION_CACHE_REDIS_TTL = int(os.getenv("SESSION_CACHE_REDIS_TTL", "3600"))  # 공유 캐시 유지 시간 (초)
+SESSION_CACHE_SHARED_LOCAL_TTL = float(os.getenv("SESSION_CACHE_SHARED_LOCAL_TTL", "2"))  # 공유 캐시 사용 시 프로세스 내 캐시 유지 시간 (초)
+
+# 대화 기록 파티션/보존 설정
+CONVERSATION_RETENTION_MONTHS = int(os.getenv("CONVERSATION_RETENTION_MONTHS", "12"))  # 보존 기간 (월)
+CONVERSATION_PARTITIONS_AHEAD = int(os.getenv("CONVERSATION_PARTITIONS_AHEAD", "3"))  # 미리 만들어 둘 월 파티션 수
+MIGRATION_LOCK_TIMEOUT = int(os.getenv("MIGRATION_LOCK_TIMEOUT", "120"))  # 다른 워커의 마이그레이션을 기다리는 최대 시간 (초)
+
+# 임베딩 디스크 캐시 설정 (모델명 + 정규화 텍스트 해시 → 벡터)
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "./embedding_cache")  # 빈 값이면 캐시 사용 안 함
+EMBEDDING_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float16")  # float16 또는 float32
+EMBEDDING_CACHE_MAX_ROWS = int(os.getenv("EMBEDDING_CACHE_MAX_ROWS", "200000"))  # 캐시할 최대 벡터 수
+
+# 지식 검색 결과 캐시 설정 (정규화된 질의 → 문서 ID)
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "2048"))  # 0이면 캐시 사용 안 함
+
+# 지식 검색 백엔드 설정
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "chroma")  # chroma(디스크 영속, 변경분만 재임베딩) 또는 numpy(메모리 내 정확 검색)
+
+# 임베딩 모델 실행 방식 설정
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "huggingface")  # huggingface(PyTorch) 또는 onnx(ONNX Runtime)
+EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", "./models/ko-sroberta-multitask-onnx")  # python -m database.onnx_embeddings --export 결과
+EMBEDDING_ONNX_QUANTIZED = os.getenv("EMBEDDING_ONNX_QUANTIZED", "true").lower() == "true"  # int8 동적 양자화 모델 사용
+EMBEDDING_ONNX_THREADS = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))  # 0이면 ONNX Runtime 기본값
+
+# 질의 임베딩 배치 설정 (동시 요청을 모아 한 번에 인코딩)
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))  # 한 배치의 최대 질의 수
+EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))  # 배치를 모으는 최대 대기 시간, 0이면 사용 안 함
+
+# LLM 없는 사주 계산 API 설정 (/saju/batch, /saju/chart)
+CHART_CACHE_SIZE = int(os.getenv("CHART_CACHE_SIZE", "65536"))  # 계산/분석 결과 메모이제이션 항목 수
+SAJU_BATCH_MAX_ITEMS = int(os.getenv("SAJU_BATCH_MAX_ITEMS", "100000"))  # 요청 하나의 최대 입력 수
+SAJU_BATCH_CHUNK_SIZE = int(os.getenv("SAJU_BATCH_CHUNK_SIZE", "256"))  # 스레드 풀에서 한 번에 계산할 입력 수
+# /saju/chart 응답 캐시 유지 시간(초). 규칙이 바뀌면 ETag가 달라지지만 캐시는 이 시간 뒤에 재검증합니다.
+SAJU_CHART_MAX_AGE = int(os.getenv("SAJU_CHART_MAX_AGE", "2592000"))  # 30일
+
+# API 응답 압축 설정 (brotli-asgi가 설치되어 있으면 br, 없으면 gzip)
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "true").lower() == "true"
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))  # 이보다 작은 응답은 압축하지 않음(바이트)
+
+# LLM 요청 동시 실행 제한 (모델별 슬롯 + 사용자별 공정 대기열, 초과 시 429/503 + Retry-After)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # 모델당 동시에 실행할 그래프 요청 수
+LLM_MODEL_CONCURRENCY = os.getenv("LLM_MODEL_CONCURRENCY", "")  # 모델별 값 (예: "gpt-4o=4,gpt-4o-mini=16")
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "64"))  # 대기열 최대 길이, 넘으면 503
+LLM_MAX_PENDING_PER_USER = int(os.getenv("LLM_MAX_PENDING_PER_USER", "3"))  # 사용자당 실행 중+대기 요청 수, 넘으면 429
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "20"))  # 대기열 최대 대기 시간, 넘으면 503
+
+# LLM HTTP 클라이언트 설정 (공유 연결 풀, 타임아웃, 지터 재시도, 헤지 요청)
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "50"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))  # 유지할 유휴 연결 수
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))  # 유휴 연결 유지 시간(초)
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))  # 읽기/쓰기/풀 대기 타임아웃(초)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))  # 연결 실패(ConnectError/ConnectTimeout), 408/409/429/5xx 재시도 횟수
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))  # 재시도 대기 = 0~base·2^n 임의 값
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"  # 느린 멱등 요청(Idempotency-Key가 있는 POST 등)에 같은 요청을 하나 더 보냄 (토큰 비용 증가)
+LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))  # 이 백분위 응답 시간이 지나면 헤지
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))  # 헤지 지연 계산에 필요한 최소 응답 수
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.5"))  # 헤지 지연 하한(초)
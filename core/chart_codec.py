@@ -0,0 +1,82 @@
+# saju_chatbot/core/chart_codec.py
+# 계산된 사주 차트를 user_sessions에 저장할 수 있는 정수 하나로 압축/복원
+
+from core.saju_analyzer import SajuAnalyzer
+
+# 계산/분석 규칙이 바뀌면 올립니다. 버전이 다른 저장 차트는 무시하고 도구로 다시 계산합니다.
+ANALYSIS_VERSION = 1
+
+GAN = ["甲", "乙", "丙", "丁", "戊", "己", "庚", "辛", "壬", "癸"]
+JI = ["子", "丑", "寅", "卯", "辰", "巳", "午", "未", "申", "酉", "戌", "亥"]
+
+PILLAR_KEYS = ("year_ganji", "month_ganji", "day_ganji", "time_ganji")
+_PILLAR_BITS = 6  # 육십갑자 인덱스 0~59
+_PILLAR_MASK = (1 << _PILLAR_BITS) - 1
+_VERSION_SHIFT = _PILLAR_BITS * len(PILLAR_KEYS)
+
+_analyzer = None
+
+
+def ganji_index(ganji: str) -> int:
+    """간지 문자열(예: '甲子')의 육십갑자 인덱스(0~59)를 반환합니다."""
+    if len(ganji) != 2 or ganji[0] not in GAN or ganji[1] not in JI:
+        raise ValueError(f"올바르지 않은 간지입니다: {ganji!r}")
+    gan, ji = GAN.index(ganji[0]), JI.index(ganji[1])
+    if gan % 2 != ji % 2:  # 양간-양지, 음간-음지만 존재
+        raise ValueError(f"존재하지 않는 간지 조합입니다: {ganji!r}")
+    return (6 * gan - 5 * ji) % 60
+
+
+def ganji_from_index(index: int) -> str:
+    return GAN[index % 10] + JI[index % 12]
+
+
+def encode_chart(saju_info: dict, version: int = ANALYSIS_VERSION) -> int:
+    """
+    네 기둥의 육십갑자 인덱스(각 6비트)와 분석 버전(상위 8비트)을 INT UNSIGNED 하나로 압축합니다.
+    """
+    code = version
+    for key in PILLAR_KEYS:
+        code = (code << _PILLAR_BITS) | ganji_index(saju_info[key])
+    return code
+
+
+def decode_chart(code: int | None, version: int = ANALYSIS_VERSION) -> dict | None:
+    """
+    encode_chart의 역변환입니다. 값이 없거나 분석 버전이 다르면 None을 반환합니다.
+    반환 형식은 SajuCalculator.calculate_saju 결과와 같습니다.
+    """
+    if code is None or code >> _VERSION_SHIFT != version:
+        return None
+    saju_info = {}
+    for position, key in enumerate(reversed(PILLAR_KEYS)):
+        index = (code >> (_PILLAR_BITS * position)) & _PILLAR_MASK
+        if index >= 60:
+            return None
+        saju_info[key] = ganji_from_index(index)
+    saju_info = {key: saju_info[key] for key in PILLAR_KEYS}
+    saju_info["gan_list"] = list(GAN)
+    saju_info["ji_list"] = list(JI)
+    return saju_info
+
+
+def _get_analyzer() -> SajuAnalyzer:
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = SajuAnalyzer()
+    return _analyzer
+
+
+def hydrate_chart(code: int | None) -> tuple[dict, dict] | None:
+    """
+    저장된 차트 코드로 (saju_calculated_info, saju_analyzed_info)를 복원합니다.
+    분석은 규칙 기반이라 LLM이나 도구 호출 없이 바로 다시 계산합니다.
+    """
+    saju_info = decode_chart(code)
+    if saju_info is None:
+        return None
+    try:
+        return saju_info, _get_analyzer().analyze_saju(saju_info)
+    except Exception as e:
+        print(f"Failed to hydrate stored saju chart: {e}")
+        return None
@@ -0,0 +1,109 @@
+# saju_chatbot/core/chart_service.py
+# LLM 없이 사주 계산 + 분석 결과를 만드는 서비스 (입력/사주 단위 메모이제이션)
+
+from core.chart_codec import ANALYSIS_VERSION, PILLAR_KEYS
+from core.saju_analyzer import SajuAnalyzer
+from core.saju_calculator import SajuCalculator
+from config import CHART_CACHE_SIZE
+from metrics import metrics
+from datetime import datetime
+from functools import lru_cache
+import copy
+import hashlib
+import inspect
+import json
+import sys
+
+
+class ChartService:
+    """
+    생년월일시 → 사주팔자(네 기둥) + 분석 결과를 계산합니다.
+    - 계산은 (생년월일시, 음력, 윤달) 단위로 캐시합니다.
+    - 분석은 네 기둥에만 의존하므로 네 기둥 단위로 캐시합니다. 같은 날 같은 시진에 태어난 입력이나
+      같은 사주를 가진 입력이 많은 배치에서는 분석을 한 번만 수행합니다.
+    반환값은 캐시와 분리된 복사본이므로 호출 측에서 수정해도 됩니다.
+    """
+
+    def __init__(self, calculator=None, analyzer=None, cache_size: int = CHART_CACHE_SIZE):
+        self.calculator = calculator or SajuCalculator()
+        self.analyzer = analyzer or SajuAnalyzer()
+        self._calculate = lru_cache(maxsize=cache_size)(self._calculate_uncached)
+        self._analyze = lru_cache(maxsize=cache_size)(self._analyze_uncached)
+        self.rules_version = self._rules_version()
+        metrics.register_collector("chart_service", self.stats)
+
+    def compute(self, birth_datetime: datetime, is_lunar: bool = False, is_leap_month: bool = False) -> dict:
+        """{"saju_info": 네 기둥, "analyzed_info": 분석 결과}"""
+        saju_info = self._calculate(*self._key(birth_datetime, is_lunar, is_leap_month))
+        analyzed_info = self._analyze(tuple(saju_info[key] for key in PILLAR_KEYS))
+        return {
+            "saju_info": {key: saju_info[key] for key in PILLAR_KEYS},
+            "analyzed_info": copy.deepcopy(analyzed_info),
+        }
+
+    def compute_many(self, items: list[dict]) -> list[dict]:
+        """
+        여러 입력을 계산합니다. 입력 하나가 잘못되어도 나머지는 계속 처리하며,
+        각 결과는 {"index", "id", "birth_datetime", "saju_info", "analyzed_info"} 또는 {"index", "id", "error"}입니다.
+        items: {"index", "id", "birth_datetime"(datetime), "is_lunar", "is_leap_month"}
+        """
+        rows = []
+        for item in items:
+            row = {"index": item["index"], "id": item.get("id")}
+            try:
+                result = self.compute(item["birth_datetime"], item.get("is_lunar"), item.get("is_leap_month"))
+            except Exception as e:
+                row["error"] = f"사주 계산 중 오류가 발생했습니다: {e}"
+            else:
+                row["birth_datetime"] = item["birth_datetime"].isoformat()
+                row.update(result)
+            rows.append(row)
+        return rows
+
+    def etag(self, birth_datetime: datetime, is_lunar: bool = False, is_leap_month: bool = False) -> str:
+        """
+        결과의 강한 ETag. 결과는 입력과 규칙 버전만으로 정해지므로 계산 없이 만들 수 있고,
+        규칙(ANALYSIS_VERSION, 계산기/분석기 코드, 규칙 데이터)이 바뀌면 달라집니다.
+        """
+        birth, lunar, leap = self._key(birth_datetime, is_lunar, is_leap_month)
+        source = f"{self.rules_version}|{birth.isoformat()}|{int(lunar)}|{int(leap)}"
+        return '"' + hashlib.sha256(source.encode("utf-8")).hexdigest()[:32] + '"'
+
+    def stats(self) -> dict:
+        calculate = self._calculate.cache_info()
+        analyze = self._analyze.cache_info()
+        return {
+            "calculate_hits": calculate.hits,
+            "calculate_misses": calculate.misses,
+            "analyze_hits": analyze.hits,
+            "analyze_misses": analyze.misses,
+            "cached_charts": calculate.currsize,
+        }
+
+    @staticmethod
+    def _key(birth_datetime: datetime, is_lunar: bool, is_leap_month: bool) -> tuple:
+        # 입력은 현지 시각 기준이므로 시간대 정보는 버립니다.
+        return birth_datetime.replace(tzinfo=None), bool(is_lunar), bool(is_leap_month)
+
+    def _rules_version(self) -> str:
+        """
+        결과에 영향을 주는 모든 입력의 해시: ANALYSIS_VERSION, 계산기/분석기 모듈 소스(신살/오행 로직 포함),
+        그리고 각 객체가 들고 있는 규칙 데이터(saju_rules.json 전체, 오행/지장간 표 등)
+        """
+        digest = hashlib.sha256()
+        for component in (self.calculator, self.analyzer):
+            component_type = type(component)
+            try:
+                source = inspect.getsource(sys.modules[component_type.__module__])
+            except (KeyError, OSError, TypeError):
+                source = f"{component_type.__module__}.{component_type.__qualname__}"
+            digest.update(source.encode("utf-8"))
+            data = json.dumps(vars(component), ensure_ascii=False, sort_keys=True, default=str)
+            digest.update(data.encode("utf-8"))
+        return f"{ANALYSIS_VERSION}-{digest.hexdigest()[:12]}"
+
+    def _calculate_uncached(self, birth_datetime: datetime, is_lunar: bool, is_leap_month: bool) -> dict:
+        return self.calculator.calculate_saju(birth_datetime, is_lunar, is_leap_month)
+
+    def _analyze_uncached(self, pillars: tuple) -> dict:
+        return self.analyzer.analyze_saju(dict(zip(PILLAR_KEYS, pillars)))
@@ -8,6 +8,7 @@ class SajuInterpreter:
         self.rules = self._load_rules(saju_rules_path)
         self.terms = self._load_terms(saju_terms_path)
         self.llm = None # LangChain LLM (나중에 주입)
+        self.token_meter = None # 토큰 사용량 기록기 (나중에 주입, 선택 사항)
 
     def _load_rules(self, path):
         if not os.path.exists(path):
@@ -27,12 +28,17 @@ class SajuInterpreter:
         """외부에서 LangChain LLM을 주입합니다."""
         self.llm = llm
 
-    def interpret_saju(self, analyzed_saju: dict, user_question: str = None) -> str:
+    def set_token_meter(self, token_meter):
+        """외부에서 토큰 사용량 기록기를 주입합니다. (record(response, node, prompt) 인터페이스)"""
+        self.token_meter = token_meter
+
+    def interpret_saju(self, analyzed_saju: dict, user_question: str = None, template_only: bool = False) -> str:
         """
         분석된 사주 정보를 바탕으로 사용자에게 친화적인 해석을 제공합니다.
         LLM을 활용하여 보다 자연스럽고 풍부한 답변을 생성합니다.
+        template_only가 True이면 LLM을 호출하지 않고 규칙 기반 해석문만 반환합니다. (토큰 예산 초과 시)
         """
-        if not self.llm:
+        if not self.llm and not template_only:
             return "LLM이 설정되지 않았습니다. 챗봇 초기화 시 LLM을 설정해주세요."
 
         ohang_counts = analyzed_saju.get("ohang_counts", {})
@@ -81,7 +87,10 @@ class SajuInterpreter:
                       "사주 용어는 너무 어렵지 않게 설명해주시고, 긍정적인 방향으로 해석해주세요.\n\n"
         
         analysis_text = "\n".join(interpretation_parts)
-        
+
+        if template_only:
+            return analysis_text
+
         # 사용자 질문이 있다면 추가
         if user_question:
             base_prompt += f"고객의 추가 질문: '{user_question}'도 답변에 포함해주세요.\n\n"
@@ -91,6 +100,8 @@ class SajuInterpreter:
         try:
             # LLM을 호출하여 최종 답변 생성
             response = self.llm.invoke(prompt_with_analysis)
+            if self.token_meter:
+                self.token_meter.record(response, node="interpret_saju", prompt=prompt_with_analysis)
             return response.content
         except Exception as e:
             print(f"LLM 호출 중 오류 발생: {e}")
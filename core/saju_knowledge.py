@@ -0,0 +1,62 @@
+# saju_chatbot/core/saju_knowledge.py
+# 분석된 사주 차트에 해당하는 규칙 지식을 결정적으로 모음 (임베딩/검색 없음)
+
+from core.term_lookup import TermEntry, TermLookup
+
+OHANG_ORDER = ["木", "火", "土", "金", "水"]
+
+_lookup = None
+
+
+def _default_lookup() -> TermLookup:
+    global _lookup
+    if _lookup is None:
+        _lookup = TermLookup()
+    return _lookup
+
+
+def dominant_elements(ohang_counts: dict) -> list[str]:
+    """가장 많은 오행 (동률이면 모두, 木火土金水 순서)"""
+    if not ohang_counts:
+        return []
+    most = max(ohang_counts.values())
+    return [ohang for ohang in OHANG_ORDER if ohang_counts.get(ohang) == most]
+
+
+def _entry(lookup: TermLookup, term: str, category: str) -> TermEntry | None:
+    """용어의 항목 중 분류가 맞는 것 (예: 甲은 천간 항목이 아닌 일간 항목)"""
+    for entry in lookup.entries.get(term, []):
+        if entry.category == category:
+            return entry
+    return None
+
+
+def chart_knowledge_entries(analyzed_info: dict, lookup: TermLookup | None = None) -> list[TermEntry]:
+    """
+    차트에 해당하는 규칙 항목을 일간 → 신살 → 강한 오행 → 차트에 나온 십성 순서로 모읍니다.
+    LLM이 이 차트에 대해 다음 턴에 검색 도구로 찾을 내용을 미리 준비해 두는 용도입니다.
+    """
+    lookup = lookup or _default_lookup()
+    wanted = []
+    if analyzed_info.get("day_gan"):
+        wanted.append((analyzed_info["day_gan"], "일간"))
+    wanted.extend((sinsal, "신살") for sinsal in analyzed_info.get("sinsal_results") or [])
+    wanted.extend((ohang, "오행") for ohang in dominant_elements(analyzed_info.get("ohang_counts") or {}))
+    wanted.extend((sipsung, "십성") for sipsung in (analyzed_info.get("sipsung_results") or {}).values())
+
+    entries = []
+    for term, category in wanted:
+        entry = _entry(lookup, term, category)
+        if entry is not None and entry not in entries:
+            entries.append(entry)
+    return entries
+
+
+def build_chart_knowledge(analyzed_info: dict | None, lookup: TermLookup | None = None) -> str | None:
+    """차트 관련 지식을 LLM 컨텍스트에 넣을 텍스트로 만듭니다. 해당 항목이 없으면 None."""
+    if not analyzed_info:
+        return None
+    entries = chart_knowledge_entries(analyzed_info, lookup)
+    if not entries:
+        return None
+    return "\n".join(entry.render() for entry in entries)
@@ -0,0 +1,57 @@
+# saju_chatbot/core/single_flight.py
+# 같은 키로 동시에 진행 중인 작업을 한 번의 실행으로 합침 (request coalescing)
+
+from metrics import metrics
+from concurrent.futures import Future
+import threading
+
+
+class SingleFlight:
+    """
+    같은 키의 호출이 진행 중이면 새로 실행하지 않고 진행 중인 실행의 결과(또는 예외)를 함께 받습니다.
+    실행이 끝나면 키를 지우므로 결과를 캐시하지는 않습니다. (동시에 겹친 호출만 합침)
+    결과 객체는 모든 호출자가 공유하므로 문자열 같은 불변 값을 반환하는 작업에 사용합니다.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: dict = {}
+        self.executions = 0
+        self.coalesced = 0
+        metrics.register_collector(f"single_flight.{name}", self.stats)
+
+    def do(self, key, fn, *args, **kwargs):
+        """fn(*args, **kwargs)를 실행하거나, 같은 키로 진행 중인 실행의 결과를 기다립니다."""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    def stats(self) -> dict:
+        return {"executions": self.executions, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+    def _join(self, key) -> tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.executions += 1
+            return future, True
+
+    def _finish(self, key, future: Future, result=None, error: BaseException | None = None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
@@ -0,0 +1,262 @@
+# saju_chatbot/core/term_lookup.py
+# 사주 용어 사전과 Aho-Corasick 기반 용어 직접 조회 (벡터 검색 없이 항목 반환)
+
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+import json
+import os
+import re
+
+SAJU_TERMS_PATH = "data/saju_terms.json"
+SAJU_RULES_PATH = "data/saju_rules.json"
+
+# 데이터 파일에 없는 한자 표기 별칭 (표기 -> 정식 용어)
+TERM_ALIASES = {
+    "天干": "천간",
+    "地支": "지지",
+    "五行": "오행",
+    "十神": "십성",
+    "十星": "십성",
+    "神殺": "신살",
+    "神煞": "신살",
+    "比肩": "비견",
+    "劫財": "겁재",
+    "食神": "식신",
+    "傷官": "상관",
+    "偏財": "편재",
+    "正財": "정재",
+    "偏官": "편관",
+    "七殺": "편관",
+    "正官": "정관",
+    "偏印": "편인",
+    "正印": "정인",
+    "桃花殺": "도화살",
+    "驛馬殺": "역마살",
+    "華蓋殺": "화개살",
+    "孤辰殺": "고진살",
+    "寡宿殺": "과숙살",
+}
+
+MIN_HANGUL_ALIAS_LENGTH = 2  # '쥐', '양' 같은 한 글자 한글 별칭은 오탐이 많아 제외
+MAX_LOOKUP_ENTRIES = 5
+
+# 한글 표기 바로 뒤에 올 수 있는 조사의 첫 글자 ('역마살이', '상관은', '편재도' 등)
+PARTICLE_STARTS = frozenset("이가은는을를의에와과도만로으랑란인야요")
+
+# 설명 중 별칭으로 쓰는 것은 맨 앞의 간지 읽기(갑목, 신금 등)뿐입니다.
+# 괄호 속 음양/동물(양수, 원숭이)이나 오행 풀이(나무, 물)는 일상어와 겹쳐 제외합니다.
+_READING_ALIAS = re.compile(r"^([가-힣][목화토금수])(?:\s|\(|$)")
+_HANJA = re.compile(r"[一-鿿]")
+_HANGUL = re.compile(r"[가-힣]")
+
+
+def _load_json(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_term_dictionary(
+    terms_path: str = SAJU_TERMS_PATH, rules_path: str = SAJU_RULES_PATH
+) -> dict[str, set[str]]:
+    """
+    질의에 나타날 수 있는 표기 → 정식 용어 집합 사전을 만듭니다.
+    - saju_terms.json: 분류명, 용어(甲, 도화살 등), 설명 맨 앞의 간지 읽기(갑목, 자수 등)
+    - saju_rules.json: 십성/신살/오행/일간 항목 이름
+    - TERM_ALIASES: 한자 표기
+    같은 표기가 여러 용어를 가리킬 수 있습니다. (예: 신금 → 辛, 申)
+    """
+    dictionary = defaultdict(set)
+
+    def add(surface: str, canonical: str):
+        surface = surface.strip()
+        if not surface:
+            return
+        if not _HANJA.search(surface) and len(surface) < MIN_HANGUL_ALIAS_LENGTH:
+            return
+        dictionary[surface].add(canonical)
+
+    for category, terms in _load_json(terms_path).items():
+        add(category, category)
+        for term, description in terms.items():
+            add(term, term)
+            reading = _READING_ALIAS.match(str(description))
+            if reading:
+                add(reading.group(1), term)
+
+    for section, entries in _load_json(rules_path).items():
+        category = section.removesuffix("설명")
+        add(category, category)
+        for name in entries:
+            add(name, name)
+
+    for surface, canonical in TERM_ALIASES.items():
+        add(surface, canonical)
+    return dict(dictionary)
+
+
+class TermMatcher:
+    """
+    용어 사전의 모든 표기로 만든 Aho-Corasick 오토마톤입니다.
+    질의 길이에 비례하는 한 번의 순회로 모든 표기를 찾으므로 사전 크기와 관계없이 마이크로초 단위로 동작합니다.
+    """
+
+    def __init__(self, dictionary: dict[str, set[str]]):
+        self.dictionary = dictionary
+        self._goto = [{}]  # 상태 -> {글자: 다음 상태}
+        self._fail = [0]
+        self._outputs = [[]]  # 상태 -> 이 상태에서 끝나는 표기 목록
+        for surface in dictionary:
+            self._insert(surface)
+        self._build_failure_links()
+
+    def _insert(self, surface: str):
+        state = 0
+        for char in surface:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append(surface)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._outputs[next_state] = (
+                    self._outputs[next_state] + self._outputs[self._fail[next_state]]
+                )
+
+    def find_all(self, text: str) -> list[tuple[int, str]]:
+        """텍스트에 나오는 모든 (시작 위치, 표기)를 반환합니다. 겹치는 표기도 모두 포함합니다."""
+        matches = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for surface in self._outputs[state]:
+                matches.append((position - len(surface) + 1, surface))
+        return matches
+
+    @staticmethod
+    def _is_word(text: str, start: int, surface: str) -> bool:
+        """
+        한글 표기가 다른 낱말의 일부가 아닌지 확인합니다.
+        앞은 한글이 아니어야 하고, 뒤는 끝/한글 아닌 글자/조사여야 합니다. ('상관없어요', '정화조', '해수욕장' 제외)
+        한자 표기는 일상어와 겹치지 않으므로 검사하지 않습니다.
+        """
+        if not _HANGUL.search(surface):
+            return True
+        if start > 0 and _HANGUL.match(text[start - 1]):
+            return False
+        end = start + len(surface)
+        if end == len(text) or not _HANGUL.match(text[end]):
+            return True
+        return text[end] in PARTICLE_STARTS
+
+    def find_terms(self, text: str) -> list[str]:
+        """
+        왼쪽부터 가장 긴 표기 우선으로 겹치지 않게 골라 정식 용어 목록을 반환합니다. (중복 제거, 등장 순서)
+        '도화살'이 있으면 그 안의 '화살' 같은 짧은 표기는 무시하고, 다른 낱말 속 한글 표기도 무시합니다.
+        """
+        found = []
+        covered_until = 0
+        for start, surface in sorted(self.find_all(text), key=lambda m: (m[0], -len(m[1]))):
+            if start < covered_until or not self._is_word(text, start, surface):
+                continue
+            covered_until = start + len(surface)
+            for canonical in sorted(self.dictionary[surface]):
+                if canonical not in found:
+                    found.append(canonical)
+        return found
+
+
+@dataclass
+class TermEntry:
+    """용어 하나에 대한 구조화된 설명 항목"""
+
+    term: str
+    category: str
+    description: str
+    details: dict = field(default_factory=dict)  # 조건, 오행, 음양 등 부가 정보
+
+    def render(self) -> str:
+        lines = [f"[{self.category}] {self.term}: {self.description}"]
+        lines.extend(f"- {key}: {value}" for key, value in self.details.items())
+        return "\n".join(lines)
+
+
+def build_term_entries(
+    terms_path: str = SAJU_TERMS_PATH, rules_path: str = SAJU_RULES_PATH
+) -> dict[str, list[TermEntry]]:
+    """
+    정식 용어 → 설명 항목 목록을 만듭니다.
+    saju_rules.json의 항목(설명이 풍부함)을 saju_terms.json의 항목보다 앞에 둡니다.
+    분류명(신살, 십성 등)은 소속 용어 목록을 항목으로 가집니다.
+    """
+    entries = defaultdict(list)
+    members = defaultdict(list)
+
+    for section, items in _load_json(rules_path).items():
+        category = section.removesuffix("설명")
+        for name, value in items.items():
+            if isinstance(value, dict):
+                details = {key: detail for key, detail in value.items() if key != "설명"}
+                entries[name].append(TermEntry(name, category, value.get("설명", ""), details))
+            else:
+                entries[name].append(TermEntry(name, category, str(value)))
+            if name not in members[category]:
+                members[category].append(name)
+
+    for category, terms in _load_json(terms_path).items():
+        for term, description in terms.items():
+            entries[term].append(TermEntry(term, category, str(description)))
+            if term not in members[category]:
+                members[category].append(term)
+
+    for category, names in members.items():
+        entries[category].insert(0, TermEntry(category, "분류", ", ".join(names)))
+    return dict(entries)
+
+
+class TermLookup:
+    """
+    질의에 알려진 사주 용어가 있으면 해당 항목을 바로 반환하는 조회기입니다.
+    용어가 없으면 빈 목록을 반환하며, 호출 측은 그때만 벡터 검색을 사용합니다.
+    """
+
+    def __init__(self, terms_path: str = SAJU_TERMS_PATH, rules_path: str = SAJU_RULES_PATH):
+        self.dictionary = build_term_dictionary(terms_path, rules_path)
+        self.matcher = TermMatcher(self.dictionary)
+        self.entries = build_term_entries(terms_path, rules_path)
+
+    def find_terms(self, query: str) -> list[str]:
+        return self.matcher.find_terms(query)
+
+    def lookup(self, query: str, limit: int = MAX_LOOKUP_ENTRIES) -> list[TermEntry]:
+        """질의에 나온 용어의 항목을 용어 등장 순서대로 최대 limit개 반환합니다. (용어마다 대표 항목 하나)"""
+        results = []
+        for term in self.find_terms(query):
+            term_entries = self.entries.get(term)
+            if term_entries:
+                results.append(term_entries[0])
+            if len(results) >= limit:
+                break
+        return results
+
+
+def render_entries(entries: list[TermEntry]) -> str:
+    """조회 결과를 도구 응답 문자열로 합칩니다."""
+    return "\n\n".join(entry.render() for entry in entries)
@@ -0,0 +1,186 @@
+# saju_chatbot/database/async_mysql_manager.py
+
+import aiomysql
+from pymysql import Error
+from config import (
+    MYSQL_HOST,
+    MYSQL_USER,
+    MYSQL_PASSWORD,
+    MYSQL_DB,
+    MYSQL_POOL_SIZE,
+    MYSQL_POOL_TIMEOUT,
+)
+from database.schema import (
+    SELECT_USER_SESSION,
+    SELECT_CONVERSATION_HISTORY,
+    UPSERT_USER_SESSION,
+    build_session_batch_upsert,
+    build_conversation_batch_insert,
+    session_key,
+    session_record,
+)
+from database.migrations import MigrationLockTimeout, apply_migrations_async
+from metrics import metrics
+from contextlib import asynccontextmanager
+from datetime import datetime
+import asyncio
+import time
+
+
+class AsyncMySQLManager:
+    """
+    MySQLManager의 비동기 버전입니다. (aiomysql 연결 풀 사용)
+    FastAPI 요청 처리 중 DB 대기로 이벤트 루프가 막히지 않도록 app.py에서 사용합니다.
+    메서드 구성은 MySQLManager와 같고 모두 await 해야 합니다.
+    """
+
+    def __init__(self, pool_size: int = MYSQL_POOL_SIZE, pool_timeout: float = MYSQL_POOL_TIMEOUT):
+        self.pool = None
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+        self._connect_lock = asyncio.Lock()
+        metrics.register_collector("mysql_async_pool", self.pool_stats)
+
+    async def connect(self):
+        """연결 풀을 만들고 테이블을 확인합니다. 실패해도 예외를 내지 않고 다음 요청에서 재시도합니다."""
+        async with self._connect_lock:
+            if self.pool is not None:
+                return
+            try:
+                self.pool = await aiomysql.create_pool(
+                    host=MYSQL_HOST,
+                    user=MYSQL_USER,
+                    password=MYSQL_PASSWORD,
+                    db=MYSQL_DB,
+                    minsize=1,
+                    maxsize=self.pool_size,
+                    pool_recycle=3600,  # 서버 wait_timeout 전에 오래된 연결 교체
+                )
+                print(f"Async MySQL pool created (maxsize={self.pool_size}).")
+                await self._create_tables()
+            except Error as e:
+                print(f"Error while connecting to MySQL (async): {e}")
+                self.pool = None
+
+    @asynccontextmanager
+    async def connection(self):
+        """풀에서 연결을 빌려오고 블록이 끝나면 반납합니다. 끊긴 연결은 ping으로 재연결합니다."""
+        if self.pool is None:
+            await self.connect()
+            if self.pool is None:
+                raise Error("Async MySQL connection pool is not initialized.")
+
+        start = time.perf_counter()
+        try:
+            connection = await asyncio.wait_for(self.pool.acquire(), self.pool_timeout)
+        except asyncio.TimeoutError:
+            metrics.inc("mysql.async_pool.timeouts")
+            raise Error(
+                f"Timed out after {self.pool_timeout}s waiting for a MySQL connection."
+            )
+        finally:
+            metrics.observe("mysql.async_pool.wait_seconds", time.perf_counter() - start)
+
+        try:
+            await connection.ping(reconnect=True)
+            yield connection
+        finally:
+            self.pool.release(connection)
+
+    def pool_stats(self) -> dict:
+        """메트릭용 풀 상태 정보"""
+        if self.pool is None:
+            return {"size": self.pool_size, "initialized": False}
+        return {
+            "size": self.pool.maxsize,
+            "open": self.pool.size,
+            "idle": self.pool.freesize,
+            "initialized": True,
+        }
+
+    async def _create_tables(self):
+        """
+        스키마 마이그레이션을 적용하고 대화 기록의 미래 월 파티션을 보충합니다.
+        앱의 유일한 마이그레이션 실행 지점이며, 워커 여러 개가 동시에 시작해도 락을 얻은 하나만 적용합니다.
+        """
+        async with self.connection() as connection:
+            try:
+                await apply_migrations_async(connection)
+                print("Tables checked/created successfully.")
+            except (Error, MigrationLockTimeout) as e:
+                print(f"Error creating tables: {e}")
+
+    async def get_user_session(self, session_id: str):
+        """세션 ID로 사용자 세션 정보를 조회합니다."""
+        async with self.connection() as connection:
+            async with connection.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(SELECT_USER_SESSION, (session_key(session_id),))
+                return session_record(await cursor.fetchone(), session_id)
+
+    async def get_conversation_history(self, session_id: str, limit: int = 50):
+        """세션의 최근 대화 기록을 시간순으로 조회합니다."""
+        async with self.connection() as connection:
+            async with connection.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(SELECT_CONVERSATION_HISTORY, (session_key(session_id), limit))
+                rows = await cursor.fetchall()
+        return list(reversed(rows))
+
+    async def save_user_session(
+        self,
+        session_id: str,
+        user_id: str,
+        birth_datetime: datetime = None,
+        is_lunar: bool = None,
+        is_leap_month: bool = None,
+        saju_chart: int = None,
+    ):
+        """
+        사용자 세션 정보를 저장 또는 업데이트합니다.
+        saju_chart: core.chart_codec.encode_chart로 압축한 계산 결과 (선택)
+        """
+        try:
+            async with self.connection() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.execute(
+                        UPSERT_USER_SESSION,
+                        (session_key(session_id), user_id, birth_datetime, is_lunar, is_leap_month, saju_chart),
+                    )
+                await connection.commit()
+                print(f"Session {session_id} saved/updated successfully.")
+        except Error as e:
+            print(f"Error saving user session: {e}")
+
+    async def save_user_sessions_batch(self, rows: list[tuple]):
+        """
+        세션 행 여러 개를 multi-row INSERT ... ON DUPLICATE KEY UPDATE로 저장합니다.
+        rows: (session_id, user_id, birth_datetime, is_lunar, is_leap_month, saju_chart) 튜플 목록
+        실패 시 예외를 그대로 올려 호출자(write-behind 큐)가 재시도할 수 있게 합니다.
+        """
+        if not rows:
+            return
+        params = [value for row in rows for value in (session_key(row[0]), *row[1:])]
+        async with self.connection() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute(build_session_batch_upsert(len(rows)), params)
+            await connection.commit()
+
+    async def save_conversation_batch(self, rows: list[tuple]):
+        """
+        대화 기록 행 여러 개를 한 번의 INSERT로 저장합니다.
+        rows: (session_id, role, message, timestamp) 튜플 목록
+        """
+        if not rows:
+            return
+        params = [value for row in rows for value in (session_key(row[0]), *row[1:])]
+        async with self.connection() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute(build_conversation_batch_insert(len(rows)), params)
+            await connection.commit()
+
+    async def close(self):
+        """연결 풀을 닫습니다."""
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+            print("Async MySQL connection pool closed.")
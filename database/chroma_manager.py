@@ -1,126 +1,187 @@
 # saju_chatbot/database/chroma_manager.py
 
-from langchain_chroma import Chroma
 from langchain_core.documents import Document
 from langchain_huggingface import HuggingFaceEmbeddings
-from config import CHROMA_PERSIST_DIRECTORY, EMBEDDING_MODEL_NAME
-import os
+from config import (
+    CHROMA_PERSIST_DIRECTORY,
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_MODEL_DEVICE,
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_BACKEND,
+    EMBEDDING_ONNX_QUANTIZED,
+    RETRIEVAL_BACKEND,
+)
+from database.embedding_batcher import EmbeddingBatcher
+from database.embedding_cache import CachedEmbeddings
+from database.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from database.retrieval_backends import create_backend, normalize_filters
+from database.retrieval_cache import QueryResultCache
+from database.knowledge_corpus import (
+    chart_filters,
+    corpus_version,
+    document_id,
+    load_knowledge_documents,
+    load_manifest,
+    manifest_path,
+    plan_ingestion,
+    save_manifest,
+)
+from metrics import metrics
+
+HYBRID_CANDIDATES = 10  # RRF로 합치기 전 벡터/BM25 각각에서 가져올 후보 수
+
+
+def embedding_model_id() -> str:
+    """
+    벡터를 만든 모델을 구분하는 ID입니다. 임베딩 캐시 키와 적재 매니페스트에 사용하므로
+    실행 방식(ONNX, int8 양자화)이 바뀌면 다른 ID가 되어 벡터를 다시 만듭니다.
+    """
+    if EMBEDDING_BACKEND == "onnx":
+        return f"{EMBEDDING_MODEL_NAME}@onnx{'-int8' if EMBEDDING_ONNX_QUANTIZED else ''}"
+    return EMBEDDING_MODEL_NAME
+
+
+def create_embeddings():
+    """
+    임베딩 함수를 만듭니다. EMBEDDING_CACHE_DIR이 설정되어 있으면 디스크 캐시를 앞에 두고,
+    캐시에 없는 질의는 EmbeddingBatcher가 동시 요청과 묶어 모델에 전달합니다.
+    """
+
+    def load_model():
+        if EMBEDDING_BACKEND == "onnx":
+            from database.onnx_embeddings import OnnxEmbeddings
+
+            model = OnnxEmbeddings()
+        else:
+            model = HuggingFaceEmbeddings(
+                model_name=EMBEDDING_MODEL_NAME,
+                model_kwargs={"device": EMBEDDING_MODEL_DEVICE},
+            )
+        return EmbeddingBatcher(model)
+
+    if not EMBEDDING_CACHE_DIR:
+        return load_model()
+    return CachedEmbeddings(embedding_model_id(), factory=load_model)
 
 
 class ChromaManager:
-    def __init__(self):
-        # HuggingFace 임베딩 모델 로드
-        self.embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
-
-        # ChromaDB 클라이언트 초기화
-        # persist_directory를 지정하여 데이터가 파일 시스템에 저장되도록 함
-        self.vectorstore = Chroma(
-            collection_name="saju_knowledge",
-            embedding_function=self.embeddings,
-            persist_directory=CHROMA_PERSIST_DIRECTORY,
-        )
+    """
+    사주 지식 검색 관리자입니다.
+    벡터 저장/검색은 RETRIEVAL_BACKEND 설정에 따른 백엔드가 담당합니다.
+    - "chroma": ChromaDB (디스크 영속화, 매니페스트로 바뀐 문서만 재임베딩, 기본값)
+    - "numpy": 메모리 내 정확 검색 (수십~수만 건 규모, 시작할 때마다 전체 임베딩 - 임베딩 디스크 캐시 권장)
+    """
+
+    def __init__(self, backend: str = RETRIEVAL_BACKEND):
+        # 임베딩 모델 (HuggingFace 또는 ONNX, 디스크 캐시에 없는 텍스트를 처음 만날 때 로드)
+        self.embeddings = create_embeddings()
+        self.backend = create_backend(backend, self.embeddings)
+        self.manifest_path = manifest_path(CHROMA_PERSIST_DIRECTORY)
+        self.corpus_version = None  # 적재된 코퍼스 버전 (검색 결과 캐시 무효화 기준)
+        self.query_cache = QueryResultCache()
+        self.lexical_index = LexicalIndex()  # BM25 + 용어 사전 (메모리, 시작 시 구성)
         self._initialize_knowledge_base()
 
     def _initialize_knowledge_base(self):
         """
-        사주 관련 지식 문서들을 ChromaDB에 초기 로드합니다.
+        사주 관련 지식 문서들(data/saju_terms.json, data/saju_rules.json)을 검색 백엔드에 적재합니다.
         이는 챗봇이 사주 풀이를 할 때 참고할 배경 지식이 됩니다.
-        실제로는 `data/saju_rules.json` 등의 내용을 Document 형태로 변환하여 저장합니다.
+        문서 ID는 내용 해시이므로 새로 추가되거나 바뀐 문서만 임베딩하고, 사라진 문서는 삭제합니다.
+        영속 백엔드(Chroma)에서 코퍼스가 그대로라면 아무것도 임베딩하지 않습니다.
         """
-        # 데이터가 이미 있는지 확인 (간단한 방법)
-        # collection_count = self.vectorstore._client.get_or_create_collection("saju_knowledge").count()
-        # if collection_count > 0:
-        #     print("ChromaDB already contains data. Skipping initial load.")
-        #     return
-
-        print("Initializing ChromaDB knowledge base...")
-        docs_to_add = []
-
-        # 예시: 사주 용어 설명을 문서로 추가
-        # 실제로는 `data/saju_rules.json` 및 `data/saju_terms.json`을 파싱하여 추가
-        saju_terms_path = "data/saju_terms.json"
-        if os.path.exists(saju_terms_path):
-            import json
-
-            with open(saju_terms_path, "r", encoding="utf-8") as f:
-                saju_terms = json.load(f)
-
-            for category, terms in saju_terms.items():
-                for term, description in terms.items():
-                    content = f"{category} - {term}: {description}"
-                    docs_to_add.append(
-                        Document(
-                            page_content=content,
-                            metadata={"category": category, "term": term},
-                        )
-                    )
-
-        saju_rules_path = "data/saju_rules.json"
-        if os.path.exists(saju_rules_path):
-            import json
-
-            with open(saju_rules_path, "r", encoding="utf-8") as f:
-                saju_rules = json.load(f)
-
-            # 오행 설명 추가
-            for ohang, desc in saju_rules.get("오행설명", {}).items():
-                content = f"오행 {ohang}에 대한 설명: {desc}"
-                docs_to_add.append(
-                    Document(
-                        page_content=content,
-                        metadata={"type": "오행설명", "name": ohang},
-                    )
-                )
-
-            # 십성 설명 추가
-            for sipsung, details in saju_rules.get("십성", {}).items():
-                content = f"십성 {sipsung}은 {details.get('설명', '')}"
-                docs_to_add.append(
-                    Document(
-                        page_content=content,
-                        metadata={"type": "십성설명", "name": sipsung},
-                    )
-                )
-
-            # 신살 설명 추가
-            for sinsal, details in saju_rules.get("신살", {}).items():
-                content = f"신살 {sinsal}은 {details.get('설명', '')}"
-                docs_to_add.append(
-                    Document(
-                        page_content=content,
-                        metadata={"type": "신살설명", "name": sinsal},
-                    )
-                )
-
-            # 일간 설명 추가
-            for ilgan, desc in saju_rules.get("일간설명", {}).items():
-                content = f"일간 {ilgan}에 대한 설명: {desc}"
-                docs_to_add.append(
-                    Document(
-                        page_content=content,
-                        metadata={"type": "일간설명", "name": ilgan},
-                    )
-                )
-
-        if docs_to_add:
-            self.vectorstore.add_documents(docs_to_add)
-            print(f"Added {len(docs_to_add)} documents to ChromaDB.")
-        else:
-            print("No documents to add to ChromaDB.")
-
-    def retrieve_knowledge(self, query: str, k: int = 3) -> list[Document]:
+        documents = load_knowledge_documents()
+        self.lexical_index.add([document_id(doc) for doc in documents], documents)
+        stored_ids = self.backend.stored_ids()
+        manifest = load_manifest(self.manifest_path) if self.backend.persistent else {}
+        plan = plan_ingestion(documents, stored_ids, manifest, embedding_model_id())
+        self.corpus_version = plan.manifest["version"]
+
+        if plan.is_noop:
+            print(f"Knowledge base is up to date ({len(stored_ids)} documents).")
+            return
+
+        print("Updating knowledge base...")
+        if plan.to_delete:
+            self.backend.delete(plan.to_delete)
+            print(f"Deleted {len(plan.to_delete)} stale documents from the knowledge base.")
+        if plan.to_add:
+            self.backend.add(
+                [doc_id for doc_id, _ in plan.to_add], [doc for _, doc in plan.to_add]
+            )
+            print(f"Added {len(plan.to_add)} documents to the knowledge base.")
+        if self.backend.persistent:
+            save_manifest(self.manifest_path, plan.manifest)
+
+    def retrieve_knowledge(
+        self, query: str | None, k: int = 3, filters: dict | None = None
+    ) -> list[Document]:
         """
-        주어진 쿼리와 관련된 지식 문서들을 ChromaDB에서 검색합니다.
+        주어진 쿼리와 관련된 지식 문서들을 검색합니다.
+        같은(정규화된) 질의는 캐시된 문서 ID로 바로 조회합니다.
+        filters: {"type": "신살설명", "name": ["도화살", "역마살"]}처럼 메타데이터 조건 (필드 AND, 값 목록 IN)
+        조건을 만족하는 문서 안에서만 검색하며, query가 없으면 조건에 맞는 문서를 그대로 반환합니다.
         """
-        # LangChain의 검색 인터페이스 활용
-        retriever = self.vectorstore.as_retriever(search_kwargs={"k": k})
-        docs = retriever.invoke(query)
+        filters = normalize_filters(filters)
+        if not query:
+            return self.backend.get(self.lexical_index.filter_ids(filters)[:k]) if filters else []
+
+        # 1) 알려진 용어(十神, 도화살, 甲 등)가 있으면 해당 항목 문서를 바로 반환 (임베딩 없음)
+        exact_ids = self.lexical_index.exact_term_ids(query, filters)[:k]
+        if exact_ids:
+            docs = self.backend.get(exact_ids)
+            if docs:
+                metrics.inc("retrieval.exact_term_hits")
+                return docs
+
+        doc_ids = self.query_cache.get(query, k, self.corpus_version, filters)
+        if doc_ids is not None:
+            docs = self.backend.get(doc_ids)
+            if len(docs) == len(doc_ids):
+                return docs
+
+        # 2) 벡터 검색과 BM25 검색 결과를 RRF로 합침
+        candidates = max(k * 2, HYBRID_CANDIDATES)
+        vector_docs = self.backend.search(query, candidates, filters)
+        lexical_ids = [doc_id for doc_id, _ in self.lexical_index.search(query, candidates, filters)]
+        by_id = {doc.id or document_id(doc): doc for doc in vector_docs}
+        fused_ids = reciprocal_rank_fusion([list(by_id), lexical_ids])[:k]
+        missing = [doc_id for doc_id in fused_ids if doc_id not in by_id]
+        if missing:
+            by_id.update({doc.id: doc for doc in self.backend.get(missing)})
+        docs = [by_id[doc_id] for doc_id in fused_ids if doc_id in by_id]
+        self.query_cache.put(
+            query, k, self.corpus_version, [doc.id or document_id(doc) for doc in docs], filters
+        )
         return docs
 
+    def retrieve_chart_knowledge(
+        self, analyzed_info: dict, query: str | None = None, k: int | None = None
+    ) -> list[Document]:
+        """
+        분석된 사주의 일간/신살/강한 오행 문서만 대상으로 검색합니다.
+        query가 없으면 해당 문서를 모두(최대 k개) 임베딩 없이 반환합니다.
+        """
+        filters = chart_filters(analyzed_info)
+        if k is None:
+            k = len(filters["name"])
+        return self.retrieve_knowledge(query, k=k, filters=filters)
+
     def add_document(self, document: Document):
-        """단일 문서를 ChromaDB에 추가합니다."""
-        self.vectorstore.add_documents([document])
-        self.vectorstore.persist()
+        """단일 문서를 추가합니다. (내용 해시 ID로 upsert)"""
+        doc_id = document_id(document)
+        self.backend.add([doc_id], [document])
+        self.lexical_index.add([doc_id], [document])
+        document_ids = sorted(self.backend.stored_ids())
+        self.corpus_version = corpus_version(document_ids, embedding_model_id())
+        if self.backend.persistent:
+            save_manifest(
+                self.manifest_path,
+                {
+                    "embedding_model": embedding_model_id(),
+                    "version": self.corpus_version,
+                    "document_ids": document_ids,
+                },
+            )
 
 
 # 테스트 코드
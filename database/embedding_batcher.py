@@ -0,0 +1,117 @@
+# saju_chatbot/database/embedding_batcher.py
+# 동시에 들어온 질의 임베딩 요청을 짧게 모아 한 번의 배치 인코딩으로 처리
+
+from langchain_core.embeddings import Embeddings
+from config import EMBEDDING_BATCH_MAX_SIZE, EMBEDDING_BATCH_MAX_WAIT_MS
+from metrics import metrics
+from concurrent.futures import Future
+import queue
+import threading
+import time
+
+
+class EmbeddingBatcher(Embeddings):
+    """
+    질의 임베딩 요청을 max_wait_ms 동안(또는 max_batch_size개가 찰 때까지) 모아
+    embed_documents 한 번으로 인코딩하고 결과를 각 호출자에게 돌려줍니다.
+    트랜스포머는 문장 하나씩 여러 번보다 한 배치로 실행할 때 CPU 처리량이 몇 배 높으므로,
+    요청이 몰릴 때 요청당 최대 max_wait_ms의 지연을 대가로 처리량을 높입니다.
+    질의/문서 임베딩이 같은 대칭형 모델(ko-sroberta 등)을 전제로 합니다.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_batch_size: int = EMBEDDING_BATCH_MAX_SIZE,
+        max_wait_ms: float = EMBEDDING_BATCH_MAX_WAIT_MS,
+    ):
+        self.embeddings = embeddings
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self.requests = 0
+        self.batches = 0
+        self.largest_batch = 0
+        metrics.register_collector("embedding_batcher", self.stats)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        # 이미 배치인 요청(문서 적재)은 그대로 전달
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        if self.max_wait <= 0 or self.max_batch_size <= 1:
+            return self.embeddings.embed_query(text)
+        return self.submit(text).result()
+
+    def submit(self, text: str) -> Future:
+        """질의를 대기열에 넣고 결과 Future를 반환합니다."""
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((text, future))
+        return future
+
+    def close(self):
+        """작업 스레드를 멈춥니다. 대기열에 남은 요청은 처리한 뒤 종료합니다."""
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            self._queue.put(None)
+            worker.join()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "average_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+        }
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="embedding-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            stopping = False
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._dispatch(batch)
+            if stopping:
+                return
+
+    def _dispatch(self, batch: list[tuple[str, Future]]):
+        # 같은 배치 안의 중복 질의는 한 번만 인코딩
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        self.requests += len(batch)
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        metrics.observe("embedding_batch_size", len(batch))
+        try:
+            vectors = dict(zip(texts, self.embeddings.embed_documents(texts)))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for text, future in batch:
+            future.set_result(vectors[text])
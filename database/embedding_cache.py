@@ -0,0 +1,248 @@
+# saju_chatbot/database/embedding_cache.py
+
+from langchain_core.embeddings import Embeddings
+from config import EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_DTYPE, EMBEDDING_CACHE_MAX_ROWS
+from metrics import metrics
+from contextlib import contextmanager
+from hashlib import sha256
+import numpy as np
+import json
+import os
+import re
+import threading
+import unicodedata
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 스레드 잠금만 사용 (워커 하나로 실행)
+    fcntl = None
+
+INITIAL_CAPACITY = 1024
+VECTORS_FILENAME = "vectors.npy"
+INDEX_FILENAME = "index.jsonl"
+LOCK_FILENAME = "cache.lock"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 텍스트 정규화 (NFC, 공백 정리)"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def cache_key(model_name: str, text: str) -> str:
+    return sha256(f"{model_name}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    디스크에 저장되는 임베딩 캐시입니다. LangChain Embeddings 인터페이스를 그대로 제공합니다.
+    - 키: (모델명, 정규화 텍스트) 해시
+    - 저장: cache_dir/vectors.npy (memmap, float16/float32 행렬) + cache_dir/index.jsonl (키 → 행 번호, 추가 전용)
+    - 캐시에 없는 텍스트만 실제 모델로 임베딩하며, 모델은 처음 필요할 때 factory()로 로드합니다.
+    문서 재적재와 반복 질의 모두 트랜스포머 실행 없이 처리할 수 있습니다.
+    여러 워커 프로세스가 같은 cache_dir을 공유할 수 있습니다. 쓰기는 cache_dir/cache.lock 파일 잠금(fcntl) 안에서
+    다른 프로세스가 추가한 인덱스 줄과 교체(확장)된 행렬 파일을 먼저 반영한 뒤 다음 행 번호부터 씁니다.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        factory,
+        cache_dir: str = EMBEDDING_CACHE_DIR,
+        dtype: str = EMBEDDING_CACHE_DTYPE,
+        max_rows: int = EMBEDDING_CACHE_MAX_ROWS,
+    ):
+        self.model_name = model_name
+        self._factory = factory
+        self._model = None
+        self.cache_dir = os.path.join(cache_dir, _safe_dirname(model_name))
+        self.dtype = np.dtype(dtype)
+        self.max_rows = max_rows
+        self._lock = threading.RLock()
+        self._index = {}  # 키 -> 행 번호
+        self._rows = 0  # 사용 중인 행 수 (다음에 쓸 행 번호)
+        self._index_offset = 0  # index.jsonl에서 읽은 바이트 수 (완결된 줄까지)
+        self._vectors = None  # np.memmap (capacity, dim)
+        self._vectors_id = None  # 열어 둔 행렬 파일의 (장치, inode, 크기)
+        self.hits = 0
+        self.misses = 0
+        self._load()
+        metrics.register_collector("embedding_cache", self.stats)
+
+    @property
+    def model(self):
+        """실제 임베딩 모델 (지연 로드)"""
+        with self._lock:
+            if self._model is None:
+                print(f"Loading embedding model {self.model_name}...")
+                self._model = self._factory()
+            return self._model
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [vector.tolist() for vector in self.embed_many(texts)]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_many([text], query=True)[0].tolist()
+
+    def embed_many(self, texts: list[str], query: bool = False) -> list[np.ndarray]:
+        """텍스트 목록의 임베딩을 float32 배열로 반환합니다. 캐시에 없는 텍스트만 모델로 계산합니다."""
+        keys = [cache_key(self.model_name, text) for text in texts]
+        results = [None] * len(texts)
+        missing = {}  # 키 -> (정규화 텍스트, 결과 위치 목록)
+        with self._lock:
+            for position, key in enumerate(keys):
+                row = self._index.get(key)
+                if row is not None:
+                    results[position] = np.asarray(self._vectors[row], dtype=np.float32)
+                    self.hits += 1
+                else:
+                    missing.setdefault(key, (normalize_text(texts[position]), []))[1].append(position)
+                    self.misses += 1
+
+        if missing:
+            missing_keys = list(missing)
+            missing_texts = [missing[key][0] for key in missing_keys]
+            if query and len(missing_texts) == 1:
+                computed = [self.model.embed_query(missing_texts[0])]
+            else:
+                computed = self.model.embed_documents(missing_texts)
+            computed = np.asarray(computed, dtype=np.float32)
+            self._store(missing_keys, computed)
+            for key, vector in zip(missing_keys, computed):
+                for position in missing[key][1]:
+                    results[position] = vector
+        return results
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._index),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "model_loaded": self._model is not None,
+        }
+
+    def _load(self):
+        if not os.path.exists(os.path.join(self.cache_dir, VECTORS_FILENAME)):
+            return
+        try:
+            with self._file_lock():
+                self._refresh()
+            print(f"Embedding cache loaded: {len(self._index)} vectors from {self.cache_dir}")
+        except (OSError, ValueError) as e:
+            print(f"Embedding cache unreadable, starting empty: {e}")
+            self._vectors = None
+            self._vectors_id = None
+            self._index = {}
+            self._rows = 0
+            self._index_offset = 0
+
+    @contextmanager
+    def _file_lock(self):
+        """같은 cache_dir을 쓰는 다른 프로세스와의 배타 잠금"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, LOCK_FILENAME), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """
+        다른 프로세스의 변경을 반영합니다. (파일 잠금 안에서 호출)
+        행렬 파일이 교체(확장)되었으면 다시 열고, index.jsonl에서 아직 읽지 않은 줄을 인덱스에 추가합니다.
+        """
+        vectors_path = os.path.join(self.cache_dir, VECTORS_FILENAME)
+        try:
+            stat = os.stat(vectors_path)
+        except FileNotFoundError:
+            return
+        vectors_id = (stat.st_dev, stat.st_ino, stat.st_size)
+        if vectors_id != self._vectors_id:
+            self._vectors = None
+            self._vectors = np.load(vectors_path, mmap_mode="r+")
+            self._vectors_id = vectors_id
+
+        index_path = os.path.join(self.cache_dir, INDEX_FILENAME)
+        if not os.path.exists(index_path):
+            return
+        with open(index_path, "rb") as f:
+            f.seek(self._index_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 기록 도중 중단된 마지막 줄
+                self._index_offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry["row"] < len(self._vectors):
+                    self._index[entry["key"]] = entry["row"]
+                    self._rows = max(self._rows, entry["row"] + 1)
+
+    def _store(self, keys: list[str], vectors: np.ndarray):
+        """
+        새 벡터를 행렬 끝에 쓰고 flush한 뒤 인덱스에 추가합니다. (인덱스가 쓰지 않은 행을 가리키지 않도록)
+        행 번호는 파일 잠금을 잡고 다른 프로세스가 쓴 행까지 반영한 뒤에 정합니다.
+        """
+        with self._lock:
+            try:
+                with self._file_lock():
+                    self._refresh()
+                    new_entries = {}
+                    for key, vector in zip(keys, vectors):
+                        if key not in self._index:
+                            new_entries.setdefault(key, vector)
+                    room = self.max_rows - self._rows
+                    if room <= 0 or not new_entries:
+                        return
+                    new_entries = list(new_entries.items())[:room]
+                    self._ensure_capacity(self._rows + len(new_entries), vectors.shape[1])
+                    start = self._rows
+                    for offset, (_, vector) in enumerate(new_entries):
+                        self._vectors[start + offset] = vector
+                    self._vectors.flush()
+                    with open(os.path.join(self.cache_dir, INDEX_FILENAME), "ab") as f:
+                        if f.tell() != self._index_offset:
+                            f.write(b"\n")  # 중단된 줄과 새 줄이 합쳐지지 않도록
+                        for offset, (key, _) in enumerate(new_entries):
+                            f.write((json.dumps({"key": key, "row": start + offset}) + "\n").encode("utf-8"))
+                        self._index_offset = f.tell()
+                    for offset, (key, _) in enumerate(new_entries):
+                        self._index[key] = start + offset
+                    self._rows = start + len(new_entries)
+            except OSError as e:
+                print(f"Failed to write embedding cache: {e}")
+
+    def _ensure_capacity(self, rows: int, dim: int):
+        """필요하면 더 큰 행렬 파일을 만들어 교체합니다. (파일 잠금 안에서 호출)"""
+        if self._vectors is not None:
+            if self._vectors.shape[1] != dim:
+                raise OSError(f"embedding dimension changed ({self._vectors.shape[1]} -> {dim})")
+            if rows <= len(self._vectors):
+                return
+        capacity = max(INITIAL_CAPACITY, len(self._vectors) if self._vectors is not None else 0)
+        while capacity < rows:
+            capacity *= 2
+
+        vectors_path = os.path.join(self.cache_dir, VECTORS_FILENAME)
+        tmp_path = vectors_path + ".tmp.npy"
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=self.dtype, shape=(capacity, dim))
+        if self._vectors is not None:
+            grown[: self._rows] = self._vectors[: self._rows]
+        grown.flush()
+        del grown
+        self._vectors = None
+        os.replace(tmp_path, vectors_path)
+        self._vectors = np.load(vectors_path, mmap_mode="r+")
+        stat = os.stat(vectors_path)
+        self._vectors_id = (stat.st_dev, stat.st_ino, stat.st_size)
+
+
+def _safe_dirname(model_name: str) -> str:
+    return re.sub(r"[^0-9A-Za-z._-]+", "_", model_name)
@@ -0,0 +1,177 @@
+# saju_chatbot/database/knowledge_corpus.py
+# 사주 지식 문서(data/saju_terms.json, data/saju_rules.json) 로드와 증분 적재 계획
+
+from langchain_core.documents import Document
+from core.saju_knowledge import dominant_elements
+from config import CHROMA_PERSIST_DIRECTORY
+from dataclasses import dataclass, field
+from hashlib import sha256
+import json
+import os
+
+SAJU_TERMS_PATH = "data/saju_terms.json"
+SAJU_RULES_PATH = "data/saju_rules.json"
+MANIFEST_FILENAME = "knowledge_manifest.json"
+
+
+def _load_json(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_knowledge_documents(
+    terms_path: str = SAJU_TERMS_PATH, rules_path: str = SAJU_RULES_PATH
+) -> list[Document]:
+    """사주 용어/규칙 JSON을 검색용 Document 목록으로 변환합니다."""
+    documents = []
+
+    for category, terms in _load_json(terms_path).items():
+        for term, description in terms.items():
+            documents.append(
+                Document(
+                    page_content=f"{category} - {term}: {description}",
+                    metadata={"category": category, "term": term},
+                )
+            )
+
+    saju_rules = _load_json(rules_path)
+    # 오행 설명 추가
+    for ohang, desc in saju_rules.get("오행설명", {}).items():
+        documents.append(
+            Document(
+                page_content=f"오행 {ohang}에 대한 설명: {desc}",
+                metadata={"type": "오행설명", "name": ohang},
+            )
+        )
+    # 십성 설명 추가
+    for sipsung, details in saju_rules.get("십성", {}).items():
+        documents.append(
+            Document(
+                page_content=f"십성 {sipsung}은 {details.get('설명', '')}",
+                metadata={"type": "십성설명", "name": sipsung},
+            )
+        )
+    # 신살 설명 추가
+    for sinsal, details in saju_rules.get("신살", {}).items():
+        documents.append(
+            Document(
+                page_content=f"신살 {sinsal}은 {details.get('설명', '')}",
+                metadata={"type": "신살설명", "name": sinsal},
+            )
+        )
+    # 일간 설명 추가
+    for ilgan, desc in saju_rules.get("일간설명", {}).items():
+        documents.append(
+            Document(
+                page_content=f"일간 {ilgan}에 대한 설명: {desc}",
+                metadata={"type": "일간설명", "name": ilgan},
+            )
+        )
+    return documents
+
+
+def document_id(document: Document) -> str:
+    """문서 내용과 메타데이터의 해시로 결정적인 문서 ID를 만듭니다."""
+    digest = sha256(document.page_content.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(json.dumps(document.metadata, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def corpus_version(document_ids, embedding_model: str) -> str:
+    """적재된 문서 집합과 임베딩 모델을 나타내는 버전 문자열 (검색 캐시 무효화 기준)"""
+    digest = sha256(embedding_model.encode("utf-8"))
+    for doc_id in sorted(document_ids):
+        digest.update(doc_id.encode("ascii"))
+    return digest.hexdigest()[:16]
+
+
+def manifest_path(persist_directory: str = CHROMA_PERSIST_DIRECTORY) -> str:
+    return os.path.join(persist_directory, MANIFEST_FILENAME)
+
+
+def load_manifest(path: str) -> dict:
+    """적재 매니페스트를 읽습니다. 없거나 손상되었으면 빈 매니페스트를 반환합니다."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(path: str, manifest: dict):
+    """임시 파일에 쓴 뒤 교체하여 중간에 중단되어도 매니페스트가 깨지지 않게 합니다."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+@dataclass
+class IngestionPlan:
+    """벡터 저장소에 반영할 변경 사항"""
+
+    to_add: list[tuple[str, Document]] = field(default_factory=list)  # (문서 ID, 문서)
+    to_delete: list[str] = field(default_factory=list)
+    manifest: dict = field(default_factory=dict)  # 반영 후 저장할 매니페스트
+
+    @property
+    def is_noop(self) -> bool:
+        return not self.to_add and not self.to_delete
+
+
+def plan_ingestion(
+    documents: list[Document],
+    stored_ids,
+    manifest: dict,
+    embedding_model: str,
+) -> IngestionPlan:
+    """
+    현재 코퍼스와 저장소 상태를 비교해 새로/바뀐 문서만 추가하고 사라진 문서는 삭제하도록 계획합니다.
+    stored_ids: 벡터 저장소에 실제로 있는 문서 ID (해시가 아닌 예전 무작위 ID 포함)
+    임베딩 모델이 바뀌었으면 모든 벡터를 다시 만듭니다.
+    """
+    desired = {}
+    for document in documents:
+        desired.setdefault(document_id(document), document)
+    stored_ids = set(stored_ids)
+
+    if manifest.get("embedding_model") != embedding_model:
+        to_delete = sorted(stored_ids)
+        to_add = list(desired.items())
+    else:
+        to_delete = sorted(stored_ids - desired.keys())
+        to_add = [(doc_id, doc) for doc_id, doc in desired.items() if doc_id not in stored_ids]
+
+    return IngestionPlan(
+        to_add=to_add,
+        to_delete=to_delete,
+        manifest={
+            "embedding_model": embedding_model,
+            "version": corpus_version(desired.keys(), embedding_model),
+            "document_ids": sorted(desired.keys()),
+        },
+    )
+
+
+def chart_filters(analyzed_info: dict) -> dict:
+    """
+    분석된 사주에서 관련 지식 문서만 고르는 메타데이터 필터를 만듭니다.
+    일간(일간설명), 있는 신살(신살설명), 가장 강한 오행(오행설명) 문서가 대상이며,
+    이름이 유형끼리 겹치지 않으므로 type IN (...) AND name IN (...) 한 번의 조건으로 표현됩니다.
+    """
+    types, names = [], []
+    if analyzed_info.get("day_gan"):
+        types.append("일간설명")
+        names.append(analyzed_info["day_gan"])
+    if analyzed_info.get("sinsal_results"):
+        types.append("신살설명")
+        names.extend(analyzed_info["sinsal_results"])
+    elements = dominant_elements(analyzed_info.get("ohang_counts") or {})
+    if elements:
+        types.append("오행설명")
+        names.extend(elements)
+    return {"type": types, "name": names}
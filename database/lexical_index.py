@@ -0,0 +1,149 @@
+# saju_chatbot/database/lexical_index.py
+# 사주 지식 문서용 어휘(BM25) 색인과 용어 → 문서 색인
+
+from langchain_core.documents import Document
+from core.term_lookup import TermMatcher, build_term_dictionary
+from database.retrieval_backends import matches_filters
+from collections import Counter, defaultdict
+import math
+import re
+import threading
+
+_TOKEN_RUN = re.compile(r"[가-힣]+|[一-鿿]+|[0-9A-Za-z]+")
+_HANJA = re.compile(r"[一-鿿]")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    한글은 글자 bigram, 한자는 글자 unigram + bigram, 영문/숫자는 단어 단위로 나눕니다.
+    형태소 분석기 없이도 '도화살이'와 '도화살은'이 같은 bigram(도화, 화살)을 공유합니다.
+    """
+    tokens = []
+    for match in _TOKEN_RUN.finditer(text):
+        run = match.group()
+        if "가" <= run[0] <= "힣":
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        elif _HANJA.match(run):
+            tokens.extend(run)
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run.lower())
+    return tokens
+
+
+def document_terms(document: Document) -> set[str]:
+    """문서가 직접 설명하는 용어 (메타데이터의 용어명/항목명/분류)"""
+    metadata = document.metadata or {}
+    keys = {metadata.get("term"), metadata.get("name"), metadata.get("category")}
+    if metadata.get("type"):
+        keys.add(str(metadata["type"]).removesuffix("설명"))
+    return {key for key in keys if key}
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[str]:
+    """여러 순위 목록을 RRF(Σ 1/(k + rank))로 합칩니다. 점수 척도가 다른 검색 결과를 섞을 때 사용합니다."""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores, key=lambda doc_id: -scores[doc_id])
+
+
+class LexicalIndex:
+    """
+    지식 문서의 BM25 역색인과 용어 → 문서 색인입니다.
+    - exact_term_ids(): 질의에 알려진 용어가 있으면 그 용어를 설명하는 문서 ID (임베딩 불필요)
+    - search(): BM25 점수 상위 문서 ID (벡터 검색 결과와 RRF로 합치는 데 사용)
+    """
+
+    def __init__(self, term_dictionary: dict[str, set[str]] | None = None, k1: float = 1.2, b: float = 0.75):
+        self.term_dictionary = term_dictionary if term_dictionary is not None else build_term_dictionary()
+        self.matcher = TermMatcher(self.term_dictionary)
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._documents = {}  # 문서 ID -> Document
+        self._postings = defaultdict(dict)  # 토큰 -> {문서 ID: 빈도}
+        self._lengths = {}  # 문서 ID -> 토큰 수
+        self._term_docs = defaultdict(list)  # 정식 용어 -> 문서 ID 목록
+
+    def add(self, doc_ids: list[str], documents: list[Document]):
+        with self._lock:
+            for doc_id, document in zip(doc_ids, documents):
+                if doc_id in self._documents:
+                    self._remove(doc_id)
+                self._documents[doc_id] = document
+                counts = Counter(tokenize(document.page_content))
+                for token, count in counts.items():
+                    self._postings[token][doc_id] = count
+                self._lengths[doc_id] = sum(counts.values())
+                for term in document_terms(document):
+                    self._term_docs[term].append(doc_id)
+                    # 규칙 설명 문서(type 메타데이터)가 용어 목록 문서보다 내용이 풍부하므로 앞에 둠
+                    self._term_docs[term].sort(key=lambda i: "type" not in self._documents[i].metadata)
+
+    def delete(self, doc_ids: list[str]):
+        with self._lock:
+            for doc_id in doc_ids:
+                if doc_id in self._documents:
+                    self._remove(doc_id)
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def find_terms(self, query: str) -> list[str]:
+        return self.matcher.find_terms(query)
+
+    def exact_term_ids(self, query: str, filters: dict | None = None) -> list[str]:
+        """질의에 나온 용어를 설명하는 문서 ID를 용어 등장 순서대로 반환합니다."""
+        doc_ids = []
+        with self._lock:
+            for term in self.find_terms(query):
+                for doc_id in self._term_docs.get(term, []):
+                    if doc_id not in doc_ids and matches_filters(self._documents[doc_id].metadata, filters):
+                        doc_ids.append(doc_id)
+        return doc_ids
+
+    def filter_ids(self, filters: dict | None) -> list[str]:
+        """메타데이터 필터를 만족하는 문서 ID (추가된 순서)"""
+        with self._lock:
+            return [
+                doc_id for doc_id, document in self._documents.items()
+                if matches_filters(document.metadata, filters)
+            ]
+
+    def search(self, query: str, k: int, filters: dict | None = None) -> list[tuple[str, float]]:
+        """BM25 점수 상위 k개 (문서 ID, 점수). filters가 있으면 조건을 만족하는 문서만 점수를 계산합니다."""
+        with self._lock:
+            total = len(self._documents)
+            if not total:
+                return []
+            average_length = sum(self._lengths.values()) / total
+            scores = defaultdict(float)
+            for token in set(tokenize(query)):
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    if filters and not matches_filters(self._documents[doc_id].metadata, filters):
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average_length)
+                    scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return sorted(scores.items(), key=lambda item: -item[1])[:k]
+
+    def _remove(self, doc_id: str):
+        document = self._documents.pop(doc_id)
+        for token in set(tokenize(document.page_content)):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[token]
+        self._lengths.pop(doc_id, None)
+        for term in document_terms(document):
+            if doc_id in self._term_docs.get(term, []):
+                self._term_docs[term].remove(doc_id)
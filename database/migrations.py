@@ -0,0 +1,347 @@
+# saju_chatbot/database/migrations.py
+# 버전 관리되는 스키마 마이그레이션과 conversation_history 월 파티션 관리
+
+from config import CONVERSATION_RETENTION_MONTHS, CONVERSATION_PARTITIONS_AHEAD, MIGRATION_LOCK_TIMEOUT
+from database.schema import CREATE_TABLES
+from datetime import date, datetime
+import argparse
+
+SCHEMA_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+SELECT_APPLIED_VERSIONS = "SELECT version FROM schema_migrations"
+INSERT_APPLIED_VERSION = "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)"
+
+# 여러 워커가 동시에 시작해도 마이그레이션은 한 연결만 실행하도록 하는 MySQL named lock
+MIGRATION_LOCK_NAME = "schema_migrations"
+ACQUIRE_MIGRATION_LOCK = "SELECT GET_LOCK(%s, %s)"
+RELEASE_MIGRATION_LOCK = "SELECT RELEASE_LOCK(%s)"
+
+SELECT_SCHEMA_COLUMNS = """
+SELECT TABLE_NAME, COLUMN_NAME
+FROM information_schema.COLUMNS
+WHERE TABLE_SCHEMA = DATABASE()
+"""
+
+SELECT_CONVERSATION_PARTITIONS = """
+SELECT PARTITION_NAME, PARTITION_DESCRIPTION
+FROM information_schema.PARTITIONS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'conversation_history'
+  AND PARTITION_NAME IS NOT NULL
+ORDER BY PARTITION_ORDINAL_POSITION
+"""
+
+# 기존 VARCHAR session_id를 BINARY(16) 키로 변환하는 SQL 식 (database.schema.session_key와 동일한 규칙)
+SESSION_KEY_SQL = (
+    "IF({column} REGEXP '^[0-9a-fA-F]{{8}}-[0-9a-fA-F]{{4}}-[0-9a-fA-F]{{4}}-[0-9a-fA-F]{{4}}-[0-9a-fA-F]{{12}}$', "
+    "UNHEX(REPLACE({column}, '-', '')), UNHEX(LEFT(SHA2({column}, 256), 32)))"
+)
+
+
+class MigrationLockTimeout(Exception):
+    """다른 프로세스가 마이그레이션 락을 잡고 있어 제한 시간 안에 얻지 못했을 때 발생합니다."""
+
+
+def month_start(value: date, offset: int = 0) -> date:
+    """value가 속한 달의 1일에서 offset개월 이동한 날짜를 반환합니다."""
+    month_index = value.year * 12 + (value.month - 1) + offset
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"p{month.year:04d}{month.month:02d}"
+
+
+def partition_definition(month: date) -> str:
+    """month 한 달 치 행을 담는 RANGE COLUMNS 파티션 정의"""
+    return (
+        f"PARTITION {partition_name(month)} "
+        f"VALUES LESS THAN ('{month_start(month, 1).isoformat()}')"
+    )
+
+
+def schema_columns(rows) -> dict[str, set[str]]:
+    """information_schema.COLUMNS 조회 결과를 {테이블: 컬럼 집합}으로 묶습니다."""
+    schema = {}
+    for table, column in rows:
+        schema.setdefault(table, set()).add(column)
+    return schema
+
+
+def _v1_legacy_tables(today: date, schema: dict[str, set[str]]) -> list[str]:
+    """초기 스키마 (기존 _create_tables와 동일). 이미 있는 설치본은 그대로 통과합니다."""
+    return list(CREATE_TABLES)
+
+
+def _v2_compact_keys_and_partitions(today: date, schema: dict[str, set[str]]) -> list[str]:
+    """
+    - user_sessions: BINARY(16) 세션 키, user_id UNIQUE 제거 (사용자당 여러 세션 허용) + (user_id, last_updated) 인덱스
+    - conversation_history: BIGINT PK, (session_id, timestamp) 인덱스, timestamp 기준 월별 RANGE 파티션
+      (파티션 테이블은 외래 키를 가질 수 없어 FK는 제거하고, PK에 파티션 컬럼을 포함)
+    기존 테이블은 *_legacy로 이름을 바꿔 남겨 둡니다.
+    MySQL DDL은 트랜잭션으로 묶이지 않으므로 중간에 실패해도 다시 실행할 수 있게 만듭니다.
+    *_new는 지우고 처음부터 복사하며, 교체가 끝난 테이블은 건너뛰고 남은 테이블만 이름을 바꿉니다.
+    """
+    first_month = month_start(today)
+    partitions = [f"PARTITION p_archive VALUES LESS THAN ('{first_month.isoformat()}')"]
+    partitions += [
+        partition_definition(month_start(first_month, offset))
+        for offset in range(CONVERSATION_PARTITIONS_AHEAD + 1)
+    ]
+    partitions.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+    partition_clause = ",\n            ".join(partitions)
+
+    create_statements = {
+        "user_sessions": """
+        CREATE TABLE user_sessions_new (
+            session_id BINARY(16) NOT NULL,
+            user_id VARCHAR(255) NOT NULL,
+            birth_datetime DATETIME NULL,
+            is_lunar BOOLEAN NULL,
+            is_leap_month BOOLEAN NULL,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            PRIMARY KEY (session_id),
+            KEY idx_user_sessions_user (user_id, last_updated)
+        ) ENGINE=InnoDB;
+        """,
+        "conversation_history": f"""
+        CREATE TABLE conversation_history_new (
+            id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+            session_id BINARY(16) NOT NULL,
+            role ENUM('user', 'assistant') NOT NULL,
+            message TEXT,
+            timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id, timestamp),
+            KEY idx_conversation_session_time (session_id, timestamp)
+        ) ENGINE=InnoDB
+        PARTITION BY RANGE COLUMNS(timestamp) (
+            {partition_clause}
+        );
+        """,
+    }
+    copy_statements = {
+        "user_sessions": f"""
+        INSERT IGNORE INTO user_sessions_new
+            (session_id, user_id, birth_datetime, is_lunar, is_leap_month, last_updated)
+        SELECT {SESSION_KEY_SQL.format(column="session_id")}, COALESCE(user_id, ''),
+               birth_datetime, is_lunar, is_leap_month, last_updated
+        FROM {{source}};
+        """,
+        "conversation_history": f"""
+        INSERT INTO conversation_history_new (session_id, role, message, timestamp)
+        SELECT {SESSION_KEY_SQL.format(column="session_id")}, role, message,
+               COALESCE(timestamp, CURRENT_TIMESTAMP)
+        FROM {{source}}
+        WHERE session_id IS NOT NULL AND role IS NOT NULL
+        ORDER BY id;
+        """,
+    }
+
+    statements, renames = [], []
+    for table in ("conversation_history", "user_sessions"):
+        if f"{table}_legacy" in schema and f"{table}_new" not in schema:
+            continue  # 이전 실행에서 교체까지 끝난 테이블
+        # 기존 테이블을 *_legacy로 옮긴 뒤 실패했다면 *_legacy에서 복사
+        source = table if table in schema else f"{table}_legacy"
+        statements += [
+            f"DROP TABLE IF EXISTS {table}_new;",
+            create_statements[table],
+            copy_statements[table].replace("{source}", source),
+        ]
+        if table in schema:
+            renames.append(f"{table} TO {table}_legacy")
+        renames.append(f"{table}_new TO {table}")
+    if renames:
+        statements.append(f"RENAME TABLE {', '.join(renames)};")
+    return statements
+
+
+def _v3_stored_chart(today: date, schema: dict[str, set[str]]) -> list[str]:
+    """계산된 사주 차트(네 기둥 인덱스 + 분석 버전, core.chart_codec)를 세션 행에 저장"""
+    if "saju_chart" in schema.get("user_sessions", set()):
+        return []  # 컬럼 추가 후 버전 기록 전에 실패한 경우
+    return [
+        "ALTER TABLE user_sessions ADD COLUMN saju_chart INT UNSIGNED NULL AFTER is_leap_month;",
+    ]
+
+
+# (버전, 이름, today와 현재 스키마를 받아 SQL 목록을 돌려주는 함수) - 버전 순서대로 한 번씩만 적용
+MIGRATIONS = [
+    (1, "legacy_tables", _v1_legacy_tables),
+    (2, "compact_keys_and_partitions", _v2_compact_keys_and_partitions),
+    (3, "stored_chart", _v3_stored_chart),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def pending_migrations(applied_versions: set[int]) -> list[tuple]:
+    return [migration for migration in MIGRATIONS if migration[0] not in applied_versions]
+
+
+def _partition_upper_bound(description) -> date | None:
+    """PARTITION_DESCRIPTION ('2026-11-01' 또는 MAXVALUE)을 날짜로 변환합니다."""
+    if description is None:
+        return None
+    text = str(description).strip().strip("'")
+    if text.upper() == "MAXVALUE":
+        return None
+    return datetime.strptime(text[:10], "%Y-%m-%d").date()
+
+
+def plan_future_partitions(existing: list[tuple], today: date, months_ahead: int = CONVERSATION_PARTITIONS_AHEAD) -> str | None:
+    """
+    현재 달부터 months_ahead개월 뒤까지 월 파티션이 있도록 pmax를 쪼개는 ALTER 문을 만듭니다.
+    existing: (PARTITION_NAME, PARTITION_DESCRIPTION) 목록. 필요 없으면 None.
+    """
+    names = {name for name, _ in existing}
+    if "pmax" not in names:
+        return None
+    bounds = [_partition_upper_bound(description) for _, description in existing]
+    last_bound = max((bound for bound in bounds if bound is not None), default=month_start(today))
+    target_bound = month_start(today, months_ahead + 1)
+
+    new_partitions = []
+    month = last_bound
+    while month < target_bound:
+        new_partitions.append(partition_definition(month))
+        month = month_start(month, 1)
+    if not new_partitions:
+        return None
+    definitions = ", ".join(new_partitions + ["PARTITION pmax VALUES LESS THAN (MAXVALUE)"])
+    return f"ALTER TABLE conversation_history REORGANIZE PARTITION pmax INTO ({definitions})"
+
+
+def plan_expired_partitions(existing: list[tuple], today: date, retention_months: int = CONVERSATION_RETENTION_MONTHS) -> str | None:
+    """
+    보존 기간보다 오래된 파티션을 DROP 하는 ALTER 문을 만듭니다. (행 단위 DELETE 없이 즉시 삭제)
+    상한이 (이번 달 - retention_months) 이하인 파티션만 대상으로 합니다.
+    """
+    cutoff = month_start(today, -retention_months)
+    expired = [
+        name
+        for name, description in existing
+        if (bound := _partition_upper_bound(description)) is not None and bound <= cutoff
+    ]
+    if not expired:
+        return None
+    return f"ALTER TABLE conversation_history DROP PARTITION {', '.join(expired)}"
+
+
+def apply_migrations(connection, today: date | None = None, lock_timeout: int = MIGRATION_LOCK_TIMEOUT) -> list[int]:
+    """
+    DB-API 연결(mysql.connector 등)에 아직 적용되지 않은 마이그레이션을 적용하고
+    미래 파티션을 보충합니다. 적용한 버전 목록을 반환합니다.
+    GET_LOCK으로 한 번에 한 프로세스만 실행하며, 적용된 버전은 락을 얻은 뒤에 읽습니다.
+    (먼저 실행한 워커가 끝냈다면 나머지 워커는 아무것도 하지 않음)
+    """
+    today = today or date.today()
+    cursor = connection.cursor()
+    try:
+        cursor.execute(ACQUIRE_MIGRATION_LOCK, (MIGRATION_LOCK_NAME, lock_timeout))
+        _check_lock(cursor.fetchall(), lock_timeout)
+        try:
+            cursor.execute(SCHEMA_MIGRATIONS_TABLE)
+            cursor.execute(SELECT_APPLIED_VERSIONS)
+            applied = {row[0] for row in cursor.fetchall()}
+            newly_applied = []
+            for version, name, build_statements in pending_migrations(applied):
+                cursor.execute(SELECT_SCHEMA_COLUMNS)
+                schema = schema_columns(cursor.fetchall())
+                for statement in build_statements(today, schema):
+                    cursor.execute(statement)
+                cursor.execute(INSERT_APPLIED_VERSION, (version, name))
+                connection.commit()
+                newly_applied.append(version)
+                print(f"Applied schema migration {version}: {name}")
+
+            cursor.execute(SELECT_CONVERSATION_PARTITIONS)
+            statement = plan_future_partitions(list(cursor.fetchall()), today)
+            if statement:
+                cursor.execute(statement)
+                connection.commit()
+            return newly_applied
+        finally:
+            cursor.execute(RELEASE_MIGRATION_LOCK, (MIGRATION_LOCK_NAME,))
+            cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+async def apply_migrations_async(connection, today: date | None = None, lock_timeout: int = MIGRATION_LOCK_TIMEOUT) -> list[int]:
+    """apply_migrations의 비동기 버전 (aiomysql 연결용)"""
+    today = today or date.today()
+    async with connection.cursor() as cursor:
+        await cursor.execute(ACQUIRE_MIGRATION_LOCK, (MIGRATION_LOCK_NAME, lock_timeout))
+        _check_lock(await cursor.fetchall(), lock_timeout)
+        try:
+            await cursor.execute(SCHEMA_MIGRATIONS_TABLE)
+            await cursor.execute(SELECT_APPLIED_VERSIONS)
+            applied = {row[0] for row in await cursor.fetchall()}
+            newly_applied = []
+            for version, name, build_statements in pending_migrations(applied):
+                await cursor.execute(SELECT_SCHEMA_COLUMNS)
+                schema = schema_columns(await cursor.fetchall())
+                for statement in build_statements(today, schema):
+                    await cursor.execute(statement)
+                await cursor.execute(INSERT_APPLIED_VERSION, (version, name))
+                await connection.commit()
+                newly_applied.append(version)
+                print(f"Applied schema migration {version}: {name}")
+
+            await cursor.execute(SELECT_CONVERSATION_PARTITIONS)
+            statement = plan_future_partitions(list(await cursor.fetchall()), today)
+            if statement:
+                await cursor.execute(statement)
+                await connection.commit()
+            return newly_applied
+        finally:
+            await cursor.execute(RELEASE_MIGRATION_LOCK, (MIGRATION_LOCK_NAME,))
+            await cursor.fetchall()
+
+
+def _check_lock(rows, lock_timeout: int):
+    """GET_LOCK 결과: 1이면 획득, 0이면 시간 초과, NULL이면 오류"""
+    if not rows or rows[0][0] != 1:
+        raise MigrationLockTimeout(
+            f"Could not acquire the '{MIGRATION_LOCK_NAME}' lock within {lock_timeout}s."
+        )
+
+
+def drop_expired_partitions(connection, today: date | None = None, retention_months: int = CONVERSATION_RETENTION_MONTHS) -> str | None:
+    """보존 기간이 지난 대화 기록 파티션을 삭제합니다. 실행한 ALTER 문을 반환합니다."""
+    today = today or date.today()
+    cursor = connection.cursor()
+    try:
+        cursor.execute(SELECT_CONVERSATION_PARTITIONS)
+        statement = plan_expired_partitions(list(cursor.fetchall()), today, retention_months)
+        if statement:
+            cursor.execute(statement)
+            connection.commit()
+            print(f"Dropped expired partitions: {statement}")
+        return statement
+    finally:
+        cursor.close()
+
+
+# 마이그레이션/보존 작업 CLI: python -m database.migrations [--drop-expired]
+if __name__ == "__main__":
+    from database.mysql_manager import MySQLManager
+
+    parser = argparse.ArgumentParser(description="사주 챗봇 DB 마이그레이션")
+    parser.add_argument("--drop-expired", action="store_true", help="보존 기간이 지난 대화 기록 파티션 삭제")
+    parser.add_argument("--retention-months", type=int, default=CONVERSATION_RETENTION_MONTHS)
+    args = parser.parse_args()
+
+    manager = MySQLManager()
+    with manager.connection() as connection:
+        apply_migrations(connection)
+        if args.drop_expired:
+            drop_expired_partitions(connection, retention_months=args.retention_months)
+    manager.close()
@@ -1,75 +1,141 @@
 # saju_chatbot/database/mysql_manager.py
 
 import mysql.connector
-from mysql.connector import Error
-from config import MYSQL_HOST, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DB
+from mysql.connector import Error, pooling
+from config import (
+    MYSQL_HOST,
+    MYSQL_USER,
+    MYSQL_PASSWORD,
+    MYSQL_DB,
+    MYSQL_POOL_SIZE,
+    MYSQL_POOL_TIMEOUT,
+    MYSQL_RECONNECT_ATTEMPTS,
+    MYSQL_RECONNECT_DELAY,
+)
+from database.schema import (
+    SELECT_USER_SESSION,
+    SELECT_CONVERSATION_HISTORY,
+    UPSERT_USER_SESSION,
+    session_key,
+    session_record,
+)
+from metrics import metrics
+from contextlib import contextmanager
 from datetime import datetime
+import threading
+import time
 
 
 class MySQLManager:
-    def __init__(self):
-        self.connection = None
+    def __init__(self, pool_size: int = MYSQL_POOL_SIZE, pool_timeout: float = MYSQL_POOL_TIMEOUT):
+        self.pool = None
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+        # mysql-connector 풀은 비어 있으면 즉시 PoolError를 내므로, 세마포어로 대기(타임아웃)를 구현
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._stats_lock = threading.Lock()
+        self._in_use = 0
+        self._waiting = 0
         try:
-            self.connection = mysql.connector.connect(
+            self.pool = pooling.MySQLConnectionPool(
+                pool_name="saju_chatbot_pool",
+                pool_size=pool_size,
+                pool_reset_session=True,
                 host=MYSQL_HOST,
                 user=MYSQL_USER,
                 password=MYSQL_PASSWORD,
                 database=MYSQL_DB,
             )
-            if self.connection.is_connected():
-                db_Info = self.connection.get_server_info()
+            with self.connection() as connection:
+                db_Info = connection.get_server_info()
                 print("MySQL Server version: ", db_Info)
-                cursor = self.connection.cursor()
+                cursor = connection.cursor()
                 cursor.execute("SELECT DATABASE();")
                 record = cursor.fetchone()
+                cursor.close()
                 print("Connected to database: ", record)
-                self._create_tables()
+                # 스키마 마이그레이션은 앱 시작 시 AsyncMySQLManager 또는 `python -m database.migrations`에서만 실행
         except Error as e:
             print(f"Error while connecting to MySQL: {e}")
+        metrics.register_collector("mysql_pool", self.pool_stats)
 
-    def _create_tables(self):
-        """필요한 테이블들을 생성합니다."""
-        cursor = self.connection.cursor()
-        # 사용자 세션 관리를 위한 테이블 (예시)
-        user_session_table_query = """
-        CREATE TABLE IF NOT EXISTS user_sessions (
-            session_id VARCHAR(255) PRIMARY KEY,
-            user_id VARCHAR(255) UNIQUE,
-            birth_datetime DATETIME,
-            is_lunar BOOLEAN,
-            is_leap_month BOOLEAN,
-            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-        );
+    @contextmanager
+    def connection(self):
         """
-        # 챗봇 대화 기록 (필요시)
-        conversation_history_table_query = """
-        CREATE TABLE IF NOT EXISTS conversation_history (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            session_id VARCHAR(255),
-            role ENUM('user', 'assistant'),
-            message TEXT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (session_id) REFERENCES user_sessions(session_id)
-        );
+        풀에서 연결을 하나 빌려오고, 블록이 끝나면 풀에 반납합니다.
+        빌려올 때 ping으로 상태를 확인하고 끊긴 연결은 자동으로 재연결합니다.
         """
+        if self.pool is None:
+            raise Error(msg="MySQL connection pool is not initialized.")
+
+        start = time.perf_counter()
+        with self._stats_lock:
+            self._waiting += 1
+        acquired = self._slots.acquire(timeout=self.pool_timeout)
+        with self._stats_lock:
+            self._waiting -= 1
+        metrics.observe("mysql.pool.wait_seconds", time.perf_counter() - start)
+        if not acquired:
+            metrics.inc("mysql.pool.timeouts")
+            raise pooling.PoolError(
+                msg=f"Timed out after {self.pool_timeout}s waiting for a MySQL connection."
+            )
+
+        connection = None
         try:
-            cursor.execute(user_session_table_query)
-            cursor.execute(conversation_history_table_query)
-            self.connection.commit()
-            print("Tables checked/created successfully.")
-        except Error as e:
-            print(f"Error creating tables: {e}")
+            connection = self.pool.get_connection()
+            self._ensure_alive(connection)
+            with self._stats_lock:
+                self._in_use += 1
+            try:
+                yield connection
+            finally:
+                with self._stats_lock:
+                    self._in_use -= 1
         finally:
-            cursor.close()
+            if connection is not None:
+                connection.close()  # 풀 연결의 close()는 풀에 반납
+            self._slots.release()
+
+    def _ensure_alive(self, connection):
+        """헬스체크: 연결이 끊겼으면 재연결합니다."""
+        try:
+            connection.ping(
+                reconnect=True,
+                attempts=MYSQL_RECONNECT_ATTEMPTS,
+                delay=MYSQL_RECONNECT_DELAY,
+            )
+        except Error:
+            metrics.inc("mysql.pool.reconnect_failures")
+            raise
+
+    def pool_stats(self) -> dict:
+        """메트릭용 풀 상태 정보"""
+        with self._stats_lock:
+            return {
+                "size": self.pool_size,
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "initialized": self.pool is not None,
+            }
 
     def get_user_session(self, session_id: str):
         """세션 ID로 사용자 세션 정보를 조회합니다."""
-        cursor = self.connection.cursor(dictionary=True)
-        query = "SELECT * FROM user_sessions WHERE session_id = %s"
-        cursor.execute(query, (session_id,))
-        record = cursor.fetchone()
-        cursor.close()
-        return record
+        with self.connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(SELECT_USER_SESSION, (session_key(session_id),))
+            record = cursor.fetchone()
+            cursor.close()
+            return session_record(record, session_id)
+
+    def get_conversation_history(self, session_id: str, limit: int = 50):
+        """세션의 최근 대화 기록을 시간순으로 조회합니다."""
+        with self.connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(SELECT_CONVERSATION_HISTORY, (session_key(session_id), limit))
+            rows = cursor.fetchall()
+            cursor.close()
+            return list(reversed(rows))
 
     def save_user_session(
         self,
@@ -78,34 +144,37 @@ class MySQLManager:
         birth_datetime: datetime = None,
         is_lunar: bool = None,
         is_leap_month: bool = None,
+        saju_chart: int = None,
     ):
-        """사용자 세션 정보를 저장 또는 업데이트합니다."""
-        cursor = self.connection.cursor()
-        query = """
-        INSERT INTO user_sessions (session_id, user_id, birth_datetime, is_lunar, is_leap_month)
-        VALUES (%s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            birth_datetime = VALUES(birth_datetime),
-            is_lunar = VALUES(is_lunar),
-            is_leap_month = VALUES(is_leap_month),
-            last_updated = CURRENT_TIMESTAMP;
+        """
+        사용자 세션 정보를 저장 또는 업데이트합니다.
+        saju_chart: core.chart_codec.encode_chart로 압축한 계산 결과 (선택)
         """
         try:
-            cursor.execute(
-                query, (session_id, user_id, birth_datetime, is_lunar, is_leap_month)
-            )
-            self.connection.commit()
-            print(f"Session {session_id} saved/updated successfully.")
+            with self.connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(
+                        UPSERT_USER_SESSION,
+                        (session_key(session_id), user_id, birth_datetime, is_lunar, is_leap_month, saju_chart),
+                    )
+                    connection.commit()
+                    print(f"Session {session_id} saved/updated successfully.")
+                finally:
+                    cursor.close()
         except Error as e:
             print(f"Error saving user session: {e}")
-        finally:
-            cursor.close()
 
     def close(self):
-        """데이터베이스 연결을 닫습니다."""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            print("MySQL connection closed.")
+        """풀의 모든 유휴 연결을 닫습니다."""
+        if self.pool is not None:
+            # mysql-connector 풀에는 유휴 연결을 닫는 공개 API가 없어 내부 메서드를 쓰되,
+            # 없는 버전에서는 종료를 막지 않고 프로세스 종료 시 정리되도록 둠
+            remove_connections = getattr(self.pool, "_remove_connections", None)
+            if remove_connections is not None:
+                remove_connections()
+            self.pool = None
+            print("MySQL connection pool closed.")
 
 
 # 테스트 코드 (실제 사용 시에는 이 부분을 app.py 등에서 호출)
@@ -0,0 +1,157 @@
+# saju_chatbot/database/onnx_embeddings.py
+# ONNX Runtime으로 실행하는 CPU 임베딩 모델 (선택적으로 int8 동적 양자화)
+
+from langchain_core.embeddings import Embeddings
+from config import (
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_ONNX_DIR,
+    EMBEDDING_ONNX_QUANTIZED,
+    EMBEDDING_ONNX_THREADS,
+)
+import numpy as np
+import os
+
+MODEL_FILENAME = "model.onnx"
+QUANTIZED_MODEL_FILENAME = "model.int8.onnx"
+TOKENIZER_FILENAME = "tokenizer.json"
+MAX_SEQUENCE_LENGTH = 128  # ko-sroberta-multitask(SentenceTransformer) 기본 max_seq_length
+BATCH_SIZE = 32
+ONNX_OPSET = 17
+
+
+def model_path(model_dir: str, quantized: bool) -> str:
+    return os.path.join(model_dir, QUANTIZED_MODEL_FILENAME if quantized else MODEL_FILENAME)
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    export_model()로 내보낸 ONNX 모델과 tokenizer.json만으로 임베딩을 계산합니다.
+    PyTorch/transformers 없이 onnxruntime + tokenizers로 동작하므로 로드가 빠르고 완전히 오프라인입니다.
+    SentenceTransformer와 같이 attention mask 기준 평균 풀링을 사용합니다.
+    """
+
+    def __init__(
+        self,
+        model_dir: str = EMBEDDING_ONNX_DIR,
+        quantized: bool = EMBEDDING_ONNX_QUANTIZED,
+        threads: int = EMBEDDING_ONNX_THREADS,
+        max_length: int = MAX_SEQUENCE_LENGTH,
+        batch_size: int = BATCH_SIZE,
+    ):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        path = model_path(model_dir, quantized)
+        tokenizer_path = os.path.join(model_dir, TOKENIZER_FILENAME)
+        if not os.path.exists(path) or not os.path.exists(tokenizer_path):
+            raise FileNotFoundError(
+                f"ONNX embedding model not found in {model_dir}. "
+                f"Run `python -m database.onnx_embeddings --export` first."
+            )
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length)
+        if self.tokenizer.padding is None:
+            pad_token = "[PAD]" if self.tokenizer.token_to_id("[PAD]") is not None else "<pad>"
+            self.tokenizer.enable_padding(
+                pad_id=self.tokenizer.token_to_id(pad_token) or 0, pad_token=pad_token
+            )
+        self.batch_size = batch_size
+        self.path = path
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        # 길이가 비슷한 텍스트끼리 배치로 묶어 패딩 연산을 줄이고, 결과는 원래 순서로 돌려놓음
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for position, vector in zip(batch, self._encode([texts[i] for i in batch])):
+                vectors[position] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._encode([text])[0].tolist()
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.asarray([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.asarray([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        hidden = self.session.run(None, feeds)[0]  # (batch, sequence, dim)
+
+        mask = attention_mask[:, :, None].astype(np.float32)
+        summed = (hidden * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        return (summed / counts).astype(np.float32)
+
+
+def quantize_model(source_path: str, target_path: str):
+    """가중치를 int8로 동적 양자화합니다. (MatMul/Gather 가중치, 활성값은 실행 시 양자화)"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(source_path, target_path, weight_type=QuantType.QInt8)
+
+
+def export_model(
+    model_name: str = EMBEDDING_MODEL_NAME,
+    output_dir: str = EMBEDDING_ONNX_DIR,
+    quantize: bool = True,
+):
+    """
+    HuggingFace 모델을 ONNX로 내보내고 (선택적으로) int8 양자화 모델도 만듭니다.
+    내보낼 때만 torch/transformers가 필요하며, 이후에는 output_dir만 있으면 오프라인으로 실행됩니다.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    tokenizer.backend_tokenizer.save(os.path.join(output_dir, TOKENIZER_FILENAME))
+
+    sample = tokenizer(["사주 임베딩 모델 내보내기"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+    target = model_path(output_dir, quantized=False)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            target,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET,
+        )
+    print(f"Exported {model_name} to {target}")
+
+    if quantize:
+        quantize_model(target, model_path(output_dir, quantized=True))
+        print(f"Quantized model written to {model_path(output_dir, quantized=True)}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="임베딩 모델을 ONNX로 내보내기")
+    parser.add_argument("--export", action="store_true", help="모델을 ONNX로 내보냄")
+    parser.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    parser.add_argument("--output", default=EMBEDDING_ONNX_DIR)
+    parser.add_argument("--no-quantize", action="store_true", help="int8 양자화 모델을 만들지 않음")
+    args = parser.parse_args()
+
+    if args.export:
+        export_model(args.model, args.output, quantize=not args.no_quantize)
+    else:
+        parser.print_help()
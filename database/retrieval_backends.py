@@ -0,0 +1,245 @@
+# saju_chatbot/database/retrieval_backends.py
+# ChromaManager가 사용하는 검색 백엔드 (ChromaDB / 메모리 내 NumPy 행렬)
+
+from langchain_core.documents import Document
+from config import CHROMA_PERSIST_DIRECTORY
+from abc import ABC, abstractmethod
+import numpy as np
+import threading
+
+
+class RetrievalBackend(ABC):
+    """
+    검색 백엔드 인터페이스입니다. 메서드를 하나라도 구현하지 않은 백엔드는 생성 시점에 TypeError가 납니다.
+    persistent가 True이면 재시작 후에도 벡터가 남아 있어 적재 매니페스트와 비교해 증분 적재합니다.
+    """
+
+    persistent = False
+
+    @abstractmethod
+    def stored_ids(self) -> list[str]:
+        ...
+
+    @abstractmethod
+    def add(self, doc_ids: list[str], documents: list[Document]):
+        ...
+
+    @abstractmethod
+    def delete(self, doc_ids: list[str]):
+        ...
+
+    @abstractmethod
+    def search(self, query: str, k: int, filters: dict | None = None) -> list[Document]:
+        """유사도 상위 k개 문서. filters는 normalize_filters() 형식의 메타데이터 조건입니다."""
+        ...
+
+    @abstractmethod
+    def get(self, doc_ids: list[str]) -> list[Document]:
+        """ID로 문서를 조회합니다. 없는 ID는 건너뛰고 요청한 순서를 유지합니다."""
+        ...
+
+
+def normalize_filters(filters: dict | None) -> dict[str, tuple] | None:
+    """
+    {필드: 값 또는 값 목록} 형식의 메타데이터 필터를 {필드: 정렬된 값 튜플}로 정리합니다.
+    필드끼리는 AND, 한 필드의 값 목록은 OR(IN)입니다. 비어 있으면 None을 반환합니다.
+    예: {"type": ["신살설명", "일간설명"], "name": ["도화살", "丙"]}
+    """
+    if not filters:
+        return None
+    normalized = {}
+    for field_name, value in filters.items():
+        values = value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+        normalized[field_name] = tuple(sorted({str(v) for v in values if v is not None}))
+    return dict(sorted(normalized.items()))
+
+
+def filter_key(filters: dict | None) -> tuple:
+    """캐시 키 등에 쓸 수 있는 해시 가능한 필터 표현"""
+    normalized = normalize_filters(filters)
+    return tuple(normalized.items()) if normalized else ()
+
+
+def matches_filters(metadata: dict | None, filters: dict | None) -> bool:
+    """문서 메타데이터가 (정리된) 필터를 만족하는지 확인합니다."""
+    if not filters:
+        return True
+    metadata = metadata or {}
+    return all(str(metadata.get(field_name)) in values for field_name, values in filters.items())
+
+
+def chroma_where(filters: dict | None) -> dict | None:
+    """정리된 필터를 Chroma where 절로 변환합니다."""
+    if not filters:
+        return None
+    clauses = [
+        {field_name: {"$eq": values[0]}} if len(values) == 1 else {field_name: {"$in": list(values)}}
+        for field_name, values in filters.items()
+    ]
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+class ChromaBackend(RetrievalBackend):
+    """ChromaDB(SQLite + HNSW) 백엔드. 큰 코퍼스나 프로세스 간 공유가 필요할 때 사용합니다."""
+
+    persistent = True
+
+    def __init__(
+        self,
+        embeddings,
+        collection_name: str = "saju_knowledge",
+        persist_directory: str = CHROMA_PERSIST_DIRECTORY,
+    ):
+        from langchain_chroma import Chroma
+
+        # persist_directory를 지정하여 데이터가 파일 시스템에 저장되도록 함
+        self.vectorstore = Chroma(
+            collection_name=collection_name,
+            embedding_function=embeddings,
+            persist_directory=persist_directory,
+        )
+
+    def stored_ids(self) -> list[str]:
+        return self.vectorstore.get(include=[])["ids"]
+
+    def add(self, doc_ids: list[str], documents: list[Document]):
+        # add_documents는 ID 기준 upsert
+        self.vectorstore.add_documents(documents, ids=doc_ids)
+
+    def delete(self, doc_ids: list[str]):
+        self.vectorstore.delete(ids=doc_ids)
+
+    def search(self, query: str, k: int, filters: dict | None = None) -> list[Document]:
+        if filters and not all(filters.values()):
+            return []  # 값이 하나도 없는 조건은 어떤 문서와도 맞지 않음
+        return self.vectorstore.similarity_search(query, k=k, filter=chroma_where(filters))
+
+    def get(self, doc_ids: list[str]) -> list[Document]:
+        result = self.vectorstore.get(ids=doc_ids, include=["documents", "metadatas"])
+        by_id = {
+            doc_id: Document(id=doc_id, page_content=content, metadata=metadata or {})
+            for doc_id, content, metadata in zip(
+                result["ids"], result["documents"], result["metadatas"]
+            )
+        }
+        return [by_id[doc_id] for doc_id in doc_ids if doc_id in by_id]
+
+
+class NumpyBackend(RetrievalBackend):
+    """
+    정규화된 임베딩을 연속된 float32 행렬 하나에 두고 정확한(brute-force) 코사인 검색을 하는 백엔드입니다.
+    질의마다 행렬곱 한 번 + argpartition으로 top-k를 구하므로 수십~수만 건 코퍼스에서는 Chroma보다 빠르고,
+    시작 시 SQLite/HNSW를 열 필요가 없습니다. 메모리에만 있으므로 매 시작 시 적재하며,
+    임베딩 디스크 캐시(CachedEmbeddings)와 함께 쓰면 모델 실행 없이 바로 채워집니다.
+    """
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self._lock = threading.Lock()
+        self._ids = []
+        self._documents = []
+        self._position = {}  # 문서 ID -> 행 번호
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._filter_rows = (self._documents, {})  # (문서 스냅샷, filter_key -> 조건을 만족하는 행 번호)
+
+    def stored_ids(self) -> list[str]:
+        return list(self._ids)
+
+    def add(self, doc_ids: list[str], documents: list[Document]):
+        if not doc_ids:
+            return
+        vectors = _normalize_rows(
+            np.asarray(
+                self.embeddings.embed_documents([doc.page_content for doc in documents]),
+                dtype=np.float32,
+            )
+        )
+        with self._lock:
+            ids = list(self._ids)
+            docs = list(self._documents)
+            rows = [self._matrix[i] for i in range(len(ids))]
+            for doc_id, document, vector in zip(doc_ids, documents, vectors):
+                document = Document(id=doc_id, page_content=document.page_content, metadata=dict(document.metadata))
+                if doc_id in self._position:  # upsert
+                    index = self._position[doc_id]
+                    docs[index], rows[index] = document, vector
+                else:
+                    ids.append(doc_id)
+                    docs.append(document)
+                    rows.append(vector)
+            self._replace(ids, docs, np.vstack(rows))
+
+    def delete(self, doc_ids: list[str]):
+        removed = set(doc_ids)
+        with self._lock:
+            keep = [i for i, doc_id in enumerate(self._ids) if doc_id not in removed]
+            self._replace(
+                [self._ids[i] for i in keep],
+                [self._documents[i] for i in keep],
+                self._matrix[keep] if keep else np.zeros((0, self._matrix.shape[1]), dtype=np.float32),
+            )
+
+    def search(self, query: str, k: int, filters: dict | None = None) -> list[Document]:
+        matrix, documents = self._matrix, self._documents  # 교체 중에도 일관된 스냅샷
+        rows = self._rows_matching(documents, filters) if filters else None
+        if rows is not None and len(rows) == 0:
+            return []  # 조건에 맞는 문서가 없으면 질의 임베딩도 생략
+        query_vector = _normalize_rows(
+            np.asarray([self.embeddings.embed_query(query)], dtype=np.float32)
+        )[0]
+        if rows is None:
+            return [documents[i] for i in top_k(matrix, query_vector, k)]
+        # 후보 행만 모아 점수를 계산하므로 필터가 좁을수록 검색 비용도 줄어듦
+        return [documents[rows[i]] for i in top_k(matrix[rows], query_vector, k)]
+
+    def get(self, doc_ids: list[str]) -> list[Document]:
+        position, documents = self._position, self._documents
+        return [documents[position[doc_id]] for doc_id in doc_ids if doc_id in position]
+
+    def _rows_matching(self, documents: list[Document], filters: dict) -> np.ndarray:
+        snapshot, cache = self._filter_rows
+        key = filter_key(filters)
+        rows = cache.get(key) if snapshot is documents else None
+        if rows is None:
+            rows = np.asarray(
+                [i for i, doc in enumerate(documents) if matches_filters(doc.metadata, filters)],
+                dtype=np.int64,
+            )
+            if snapshot is documents:
+                cache[key] = rows
+        return rows
+
+    def _replace(self, ids: list[str], documents: list[Document], matrix: np.ndarray):
+        # 검색 스레드가 잠금 없이 읽을 수 있도록 새 객체로 통째로 교체
+        self._filter_rows = (documents, {})
+        self._matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self._documents = documents
+        self._position = {doc_id: i for i, doc_id in enumerate(ids)}
+        self._ids = ids
+
+
+def top_k(matrix: np.ndarray, query_vector: np.ndarray, k: int) -> np.ndarray:
+    """정규화된 행렬과 질의 벡터의 내적(코사인 유사도) 상위 k개 행 번호를 점수 내림차순으로 반환합니다."""
+    count = len(matrix)
+    if count == 0 or k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    scores = matrix @ query_vector
+    if k >= count:
+        return np.argsort(-scores, kind="stable")
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def create_backend(name: str, embeddings) -> RetrievalBackend:
+    """설정 이름으로 검색 백엔드를 만듭니다. ("numpy" 또는 "chroma")"""
+    if name == "numpy":
+        return NumpyBackend(embeddings)
+    if name == "chroma":
+        return ChromaBackend(embeddings)
+    raise ValueError(f"Unknown retrieval backend: {name}")
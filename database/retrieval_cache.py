@@ -0,0 +1,91 @@
+# saju_chatbot/database/retrieval_cache.py
+
+from config import RETRIEVAL_CACHE_SIZE
+from database.embedding_cache import normalize_text
+from database.retrieval_backends import filter_key
+from metrics import metrics
+from collections import OrderedDict
+import threading
+
+_TRAILING_PUNCTUATION = " ?!.,~…？！。"
+
+
+def normalize_query(query: str) -> str:
+    """표기만 다른 같은 질문이 같은 키가 되도록 정규화합니다. (공백, 대소문자, 끝 문장부호)"""
+    return normalize_text(query).casefold().rstrip(_TRAILING_PUNCTUATION)
+
+
+class QueryResultCache:
+    """
+    정규화된 검색 질의 → 문서 ID 목록 LRU 캐시입니다.
+    적중하면 질의 임베딩과 벡터 검색을 모두 건너뜁니다.
+    지식 코퍼스 버전(적재 매니페스트)이 바뀌면 전체를 비웁니다.
+    """
+
+    def __init__(self, max_entries: int = RETRIEVAL_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.version = None
+        self._entries = OrderedDict()  # (정규화 질의, k, 필터) -> 문서 ID 목록
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        metrics.register_collector("retrieval_cache", self.stats)
+
+    def get(
+        self, query: str, k: int, version: str | None, filters: dict | None = None
+    ) -> list[str] | None:
+        key = self._key(query, k, filters)
+        with self._lock:
+            self._check_version(version)
+            doc_ids = self._entries.get(key)
+            if doc_ids is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(doc_ids)
+
+    def put(
+        self,
+        query: str,
+        k: int,
+        version: str | None,
+        doc_ids: list[str],
+        filters: dict | None = None,
+    ):
+        if self.max_entries <= 0:
+            return
+        key = self._key(query, k, filters)
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = tuple(doc_ids)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "version": self.version,
+        }
+
+    def _check_version(self, version: str | None):
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.version = version
+
+    @staticmethod
+    def _key(query: str, k: int, filters: dict | None) -> tuple:
+        return normalize_query(query), k, filter_key(filters)
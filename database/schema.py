@@ -0,0 +1,111 @@
+# saju_chatbot/database/schema.py
+# 동기(MySQLManager)/비동기(AsyncMySQLManager) 매니저가 공유하는 SQL 정의
+# 테이블 생성/변경은 database/migrations.py의 버전별 마이그레이션으로 적용합니다.
+
+import hashlib
+import re
+import uuid
+
+_UUID_PATTERN = re.compile(
+    r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+)
+
+
+def session_key(session_id: str) -> bytes:
+    """
+    문자열 session_id를 BINARY(16) 저장 키로 변환합니다.
+    UUID 형식이면 UUID 바이트 그대로, 그 외에는 SHA-256 앞 16바이트를 사용합니다.
+    (migrations.SESSION_KEY_SQL과 같은 규칙이어야 기존 행과 키가 일치합니다.)
+    """
+    if _UUID_PATTERN.match(session_id):
+        return uuid.UUID(session_id).bytes
+    return hashlib.sha256(session_id.encode("utf-8")).digest()[:16]
+
+
+def session_record(record: dict | None, session_id: str) -> dict | None:
+    """조회한 세션 행의 session_id를 BINARY 키 대신 원래 문자열로 되돌립니다."""
+    if record is not None:
+        record["session_id"] = session_id
+    return record
+
+
+# 초기(v1) 스키마 - 마이그레이션 1번. v2부터 session_id는 BINARY(16) 키, 대화 기록은 월별 파티션
+# 사용자 세션 관리를 위한 테이블 (예시)
+USER_SESSIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS user_sessions (
+    session_id VARCHAR(255) PRIMARY KEY,
+    user_id VARCHAR(255) UNIQUE,
+    birth_datetime DATETIME,
+    is_lunar BOOLEAN,
+    is_leap_month BOOLEAN,
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+"""
+
+# 챗봇 대화 기록 (필요시)
+CONVERSATION_HISTORY_TABLE = """
+CREATE TABLE IF NOT EXISTS conversation_history (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    session_id VARCHAR(255),
+    role ENUM('user', 'assistant'),
+    message TEXT,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (session_id) REFERENCES user_sessions(session_id)
+);
+"""
+
+CREATE_TABLES = [USER_SESSIONS_TABLE, CONVERSATION_HISTORY_TABLE]
+
+# session_id 파라미터에는 session_key()로 변환한 값을 넘깁니다.
+SELECT_USER_SESSION = """
+SELECT session_id, user_id, birth_datetime, is_lunar, is_leap_month, saju_chart, last_updated
+FROM user_sessions WHERE session_id = %s
+"""
+
+# 세션의 최근 대화 기록 (idx_conversation_session_time 인덱스 사용)
+SELECT_CONVERSATION_HISTORY = """
+SELECT role, message, timestamp
+FROM conversation_history WHERE session_id = %s
+ORDER BY timestamp DESC, id DESC LIMIT %s
+"""
+
+# 차트 없이 저장하는 경로(save_user_session_data 도구)가 저장된 차트를 NULL로 지우지 않도록 COALESCE 사용
+UPSERT_USER_SESSION = """
+INSERT INTO user_sessions (session_id, user_id, birth_datetime, is_lunar, is_leap_month, saju_chart)
+VALUES (%s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    birth_datetime = VALUES(birth_datetime),
+    is_lunar = VALUES(is_lunar),
+    is_leap_month = VALUES(is_leap_month),
+    saju_chart = COALESCE(VALUES(saju_chart), saju_chart),
+    last_updated = CURRENT_TIMESTAMP;
+"""
+
+
+# write-behind 배치 저장용 (여러 행을 한 번의 INSERT로 처리)
+# 대화 기록 저장을 위해 세션 행을 먼저 만들 때 기존 생년월일시를 NULL로 덮어쓰지 않도록 COALESCE 사용
+SESSION_BATCH_COLUMNS = "(session_id, user_id, birth_datetime, is_lunar, is_leap_month, saju_chart)"
+SESSION_BATCH_ROW = "(%s, %s, %s, %s, %s, %s)"
+SESSION_BATCH_UPDATE = """
+ON DUPLICATE KEY UPDATE
+    birth_datetime = COALESCE(VALUES(birth_datetime), birth_datetime),
+    is_lunar = COALESCE(VALUES(is_lunar), is_lunar),
+    is_leap_month = COALESCE(VALUES(is_leap_month), is_leap_month),
+    saju_chart = COALESCE(VALUES(saju_chart), saju_chart),
+    last_updated = CURRENT_TIMESTAMP;
+"""
+
+CONVERSATION_BATCH_COLUMNS = "(session_id, role, message, timestamp)"
+CONVERSATION_BATCH_ROW = "(%s, %s, %s, %s)"
+
+
+def build_session_batch_upsert(row_count: int) -> str:
+    """row_count개 세션 행을 한 번에 upsert하는 INSERT 문을 만듭니다."""
+    values = ", ".join([SESSION_BATCH_ROW] * row_count)
+    return f"INSERT INTO user_sessions {SESSION_BATCH_COLUMNS} VALUES {values} {SESSION_BATCH_UPDATE}"
+
+
+def build_conversation_batch_insert(row_count: int) -> str:
+    """row_count개 대화 기록 행을 한 번에 넣는 INSERT 문을 만듭니다."""
+    values = ", ".join([CONVERSATION_BATCH_ROW] * row_count)
+    return f"INSERT INTO conversation_history {CONVERSATION_BATCH_COLUMNS} VALUES {values};"
@@ -0,0 +1,143 @@
+# saju_chatbot/database/session_cache.py
+
+from config import (
+    SESSION_CACHE_MAX_ENTRIES,
+    SESSION_CACHE_TTL,
+    SESSION_CACHE_REDIS_URL,
+    SESSION_CACHE_REDIS_TTL,
+    SESSION_CACHE_SHARED_LOCAL_TTL,
+)
+from metrics import metrics
+from collections import OrderedDict
+from datetime import datetime
+import json
+import time
+
+REDIS_KEY_PREFIX = "saju:session:"
+
+
+def _encode_record(record) -> str:
+    """세션 레코드를 JSON으로 직렬화합니다. datetime은 태그를 붙여 복원할 수 있게 합니다."""
+
+    def default(value):
+        if isinstance(value, datetime):
+            return {"__datetime__": value.isoformat()}
+        return str(value)
+
+    return json.dumps(record, ensure_ascii=False, default=default)
+
+
+def _decode_record(payload):
+    def object_hook(value):
+        if "__datetime__" in value:
+            return datetime.fromisoformat(value["__datetime__"])
+        return value
+
+    return json.loads(payload, object_hook=object_hook)
+
+
+def create_redis_client(url: str | None = SESSION_CACHE_REDIS_URL):
+    """공유 캐시용 비동기 Redis 클라이언트를 만듭니다. URL이 없으면 None."""
+    if not url:
+        return None
+    import redis.asyncio as redis
+
+    return redis.from_url(url)
+
+
+class SessionCache:
+    """
+    MySQL 세션 조회 앞단의 캐시입니다.
+    - 1차: 프로세스 내 TTL + LRU 캐시
+    - 2차(선택): Redis 공유 캐시. 여러 워커가 같은 세션 값을 보도록 합니다.
+    save 경로에서 set()을 호출하는 write-through 방식이라 일반적인 대화 턴은 DB를 조회하지 않습니다.
+    "세션 없음"(None)도 캐시하므로 새 세션도 첫 조회 이후에는 DB를 다시 찾지 않습니다.
+    Redis를 쓰면 다른 워커의 write-through가 1차 캐시에 가려지지 않도록
+    1차 캐시는 shared_local_ttl(기본 2초)만 유지하고 "세션 없음"은 Redis에만 캐시합니다.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = SESSION_CACHE_MAX_ENTRIES,
+        ttl: float = SESSION_CACHE_TTL,
+        redis_client=None,
+        redis_ttl: int = SESSION_CACHE_REDIS_TTL,
+        shared_local_ttl: float = SESSION_CACHE_SHARED_LOCAL_TTL,
+    ):
+        self.max_entries = max_entries
+        self.redis = redis_client
+        self.ttl = ttl if redis_client is None else min(ttl, shared_local_ttl)
+        self.redis_ttl = redis_ttl
+        self._entries = OrderedDict()  # session_id -> (만료 시각, 레코드)
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        metrics.register_collector("session_cache", self.stats)
+
+    async def get(self, session_id: str) -> tuple[bool, dict | None]:
+        """(캐시 적중 여부, 레코드)를 반환합니다. 적중했더라도 레코드는 None일 수 있습니다. (세션 없음)"""
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            expires_at, record = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(session_id)
+                self.hits += 1
+                return True, record
+            del self._entries[session_id]
+
+        if self.redis is not None:
+            try:
+                payload = await self.redis.get(REDIS_KEY_PREFIX + session_id)
+            except Exception as e:
+                print(f"Session cache Redis get failed: {e}")
+                metrics.inc("session_cache.redis_errors")
+                payload = None
+            if payload is not None:
+                record = _decode_record(payload)
+                self._store_local(session_id, record)
+                self.redis_hits += 1
+                return True, record
+
+        self.misses += 1
+        return False, None
+
+    async def set(self, session_id: str, record: dict | None):
+        """세션 레코드를 캐시에 넣습니다. (DB 조회 결과 적재 또는 저장 시 write-through)"""
+        self._store_local(session_id, record)
+        if self.redis is not None:
+            try:
+                await self.redis.set(
+                    REDIS_KEY_PREFIX + session_id, _encode_record(record), ex=self.redis_ttl
+                )
+            except Exception as e:
+                print(f"Session cache Redis set failed: {e}")
+                metrics.inc("session_cache.redis_errors")
+
+    async def invalidate(self, session_id: str):
+        self._entries.pop(session_id, None)
+        if self.redis is not None:
+            try:
+                await self.redis.delete(REDIS_KEY_PREFIX + session_id)
+            except Exception as e:
+                print(f"Session cache Redis delete failed: {e}")
+                metrics.inc("session_cache.redis_errors")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.redis_hits) / lookups if lookups else 0.0,
+            "shared_tier": self.redis is not None,
+        }
+
+    def _store_local(self, session_id: str, record):
+        if record is None and self.redis is not None:
+            self._entries.pop(session_id, None)
+            return
+        self._entries[session_id] = (time.monotonic() + self.ttl, record)
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,153 @@
+# saju_chatbot/database/write_behind.py
+
+from config import WRITE_BEHIND_BATCH_SIZE, WRITE_BEHIND_FLUSH_INTERVAL
+from metrics import metrics
+from datetime import datetime
+import asyncio
+import time
+
+
+class WriteBehindQueue:
+    """
+    세션 upsert와 대화 기록을 메모리에 모아 두었다가 배치로 저장하는 write-behind 큐입니다.
+    - save_user_session / append_conversation은 버퍼에 넣기만 하므로 응답이 DB commit을 기다리지 않습니다.
+    - batch_size만큼 쌓이거나 flush_interval이 지나면 백그라운드 태스크가 multi-row INSERT로 저장합니다.
+    - 저장에 실패한 행은 버퍼로 되돌려 다음 flush에서 재시도하고, stop()은 남은 행을 모두 flush합니다. (at-least-once)
+
+    manager는 save_user_sessions_batch(rows), save_conversation_batch(rows) 코루틴을 제공해야 합니다.
+    """
+
+    def __init__(
+        self,
+        manager,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        flush_interval: float = WRITE_BEHIND_FLUSH_INTERVAL,
+    ):
+        self.manager = manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._sessions = {}  # session_id -> [session_id, user_id, birth_datetime, is_lunar, is_leap_month, saju_chart]
+        self._conversation_rows = []  # (session_id, role, message, timestamp)
+        self._wakeup = None
+        self._flush_lock = None
+        self._task = None
+        metrics.register_collector("write_behind", self.stats)
+
+    def start(self):
+        """현재 이벤트 루프에서 주기적 flush 태스크를 시작합니다."""
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """flush 태스크를 멈추고 남은 행을 모두 저장합니다. (graceful shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for attempt in range(3):
+            if not self.pending_count():
+                break
+            await self.flush()
+        if self.pending_count():
+            print(f"Write-behind: {self.pending_count()} rows could not be saved before shutdown.")
+
+    def save_user_session(
+        self,
+        session_id: str,
+        user_id: str,
+        birth_datetime: datetime = None,
+        is_lunar: bool = None,
+        is_leap_month: bool = None,
+        saju_chart: int = None,
+    ):
+        """세션 upsert를 버퍼에 넣습니다. 같은 세션의 대기 중인 값과는 None이 아닌 값 우선으로 합칩니다."""
+        self._merge_session([session_id, user_id, birth_datetime, is_lunar, is_leap_month, saju_chart])
+        self._notify()
+
+    def append_conversation(self, session_id: str, user_id: str, role: str, message: str, timestamp: datetime = None):
+        """
+        대화 기록 한 줄을 버퍼에 넣습니다.
+        conversation_history는 user_sessions를 참조하므로 세션 행도 함께(덮어쓰지 않는 방식으로) 저장합니다.
+        """
+        self._merge_session([session_id, user_id, None, None, None, None])
+        self._conversation_rows.append((session_id, role, message, timestamp or datetime.now()))
+        self._notify()
+
+    def pending_count(self) -> int:
+        return len(self._sessions) + len(self._conversation_rows)
+
+    def stats(self) -> dict:
+        return {
+            "pending_sessions": len(self._sessions),
+            "pending_conversation_rows": len(self._conversation_rows),
+            "running": self._task is not None and not self._task.done(),
+        }
+
+    async def flush(self):
+        """버퍼의 행을 배치로 저장합니다. 실패하면 행을 버퍼로 되돌립니다."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            sessions, self._sessions = self._sessions, {}
+            conversation_rows, self._conversation_rows = self._conversation_rows, []
+            if not sessions and not conversation_rows:
+                return
+
+            start = time.perf_counter()
+            try:
+                # 외래 키 때문에 세션 행을 먼저 저장
+                for chunk in _chunks([tuple(row) for row in sessions.values()], self.batch_size):
+                    await self.manager.save_user_sessions_batch(chunk)
+                sessions = {}
+                for chunk in _chunks(conversation_rows, self.batch_size):
+                    await self.manager.save_conversation_batch(chunk)
+                    conversation_rows = conversation_rows[len(chunk):]
+            except Exception as e:
+                print(f"Write-behind flush failed, will retry: {e}")
+                metrics.inc("write_behind.flush_failures")
+                self._requeue(sessions, conversation_rows)
+                return
+            finally:
+                metrics.observe("write_behind.flush_seconds", time.perf_counter() - start)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _notify(self):
+        if self._wakeup is not None and self.pending_count() >= self.batch_size:
+            self._wakeup.set()
+
+    def _merge_session(self, row: list):
+        pending = self._sessions.get(row[0])
+        if pending is None:
+            self._sessions[row[0]] = row
+            return
+        for index, value in enumerate(row):
+            if value is not None:
+                pending[index] = value
+
+    def _requeue(self, sessions: dict, conversation_rows: list):
+        # flush 도중 새로 들어온 값이 더 최신이므로 그 값을 우선
+        for session_id, row in sessions.items():
+            newer = self._sessions.pop(session_id, None)
+            self._sessions[session_id] = row
+            if newer is not None:
+                self._merge_session(newer)
+        self._conversation_rows = conversation_rows + self._conversation_rows
+
+
+def _chunks(rows: list, size: int):
+    for index in range(0, len(rows), max(1, size)):
+        yield rows[index:index + size]
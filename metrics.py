@@ -0,0 +1,100 @@
+# saju_chatbot/metrics.py
+
+from collections import deque
+import threading
+
+
+class TimingStats:
+    """관측값의 개수/합계/최대값과 최근 샘플(백분위 계산용)을 보관합니다."""
+
+    def __init__(self, reservoir_size: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=reservoir_size)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.samples.append(value)
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "max": self.max,
+        }
+
+
+class MetricsRegistry:
+    """
+    프로세스 내 메트릭 저장소입니다. (카운터, 게이지, 관측값)
+    다른 모듈은 register_collector로 스냅샷 시점에 계산되는 값을 추가할 수 있습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._timings = {}
+        self._collectors = {}
+
+    def inc(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            stats = self._timings.get(name)
+            if stats is None:
+                stats = self._timings[name] = TimingStats()
+            stats.observe(value)
+
+    def percentile(self, name: str, q: float, default: float = 0.0) -> float:
+        with self._lock:
+            stats = self._timings.get(name)
+            return stats.percentile(q) if stats and stats.count else default
+
+    def register_collector(self, name: str, collector):
+        """스냅샷 시 collector()의 반환값(dict)을 name 아래에 포함합니다."""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            result = {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timings": {k: v.snapshot() for k, v in self._timings.items()},
+            }
+            collectors = dict(self._collectors)
+        for name, collector in collectors.items():
+            try:
+                result[name] = collector()
+            except Exception as e:
+                result[name] = {"error": str(e)}
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._timings.clear()
+
+
+# 전역 메트릭 인스턴스
+metrics = MetricsRegistry()
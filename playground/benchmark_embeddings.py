@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+임베딩 실행 방식 벤치마크: HuggingFace(PyTorch) vs ONNX(fp32) vs ONNX(int8 동적 양자화)
+
+사주 지식 코퍼스(data/saju_terms.json, data/saju_rules.json) 전체와 용어 질문으로
+- 로드 시간, 코퍼스 임베딩 시간, 단일 질의 지연(p50/p95)
+- 정확도: PyTorch 벡터와의 코사인 유사도, 질의별 top-5 검색 결과 일치율
+을 비교합니다.
+
+사전 준비: python -m database.onnx_embeddings --export
+실행: python playground/benchmark_embeddings.py [--queries 100]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import EMBEDDING_MODEL_DEVICE, EMBEDDING_MODEL_NAME  # noqa: E402
+from database.knowledge_corpus import load_knowledge_documents  # noqa: E402
+from database.onnx_embeddings import OnnxEmbeddings  # noqa: E402
+from database.retrieval_backends import _normalize_rows, top_k  # noqa: E402
+
+TOP_K = 5
+
+
+def load_variants():
+    """(이름, 로드 함수) 목록. 설치되지 않았거나 내보내지 않은 방식은 건너뜁니다."""
+
+    def huggingface():
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        return HuggingFaceEmbeddings(
+            model_name=EMBEDDING_MODEL_NAME, model_kwargs={"device": EMBEDDING_MODEL_DEVICE}
+        )
+
+    return [
+        ("pytorch", huggingface),
+        ("onnx-fp32", lambda: OnnxEmbeddings(quantized=False)),
+        ("onnx-int8", lambda: OnnxEmbeddings(quantized=True)),
+    ]
+
+
+def make_queries(documents, count):
+    questions = []
+    for document in documents:
+        name = document.metadata.get("name") or document.metadata.get("term")
+        questions.append(f"{name}은 어떤 의미인가요?")
+    return questions[:count]
+
+
+def benchmark(name, load, corpus, queries):
+    start = time.perf_counter()
+    try:
+        embeddings = load()
+    except (ImportError, FileNotFoundError) as e:
+        print(f"{name:<10} skipped ({e})")
+        return None
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matrix = np.asarray(embeddings.embed_documents(corpus), dtype=np.float32)
+    corpus_seconds = time.perf_counter() - start
+
+    latencies = []
+    query_vectors = []
+    for query in queries:
+        start = time.perf_counter()
+        query_vectors.append(embeddings.embed_query(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    print(
+        f"{name:<10} load={load_seconds:6.2f}s  corpus({len(corpus)})={corpus_seconds:6.2f}s  "
+        f"query p50={statistics.median(latencies):7.2f}ms  "
+        f"p95={latencies[int(len(latencies) * 0.95) - 1]:7.2f}ms"
+    )
+    return matrix, np.asarray(query_vectors, dtype=np.float32)
+
+
+def compare(name, reference, candidate):
+    """기준(PyTorch) 벡터와의 코사인 유사도와 top-k 검색 결과 일치율"""
+    corpus_ref, queries_ref = (_normalize_rows(m) for m in reference)
+    corpus_new, queries_new = (_normalize_rows(m) for m in candidate)
+    cosine = (corpus_ref * corpus_new).sum(axis=1)
+    overlaps = []
+    for query_ref, query_new in zip(queries_ref, queries_new):
+        expected = set(top_k(corpus_ref, query_ref, TOP_K).tolist())
+        actual = set(top_k(corpus_new, query_new, TOP_K).tolist())
+        overlaps.append(len(expected & actual) / TOP_K)
+    print(
+        f"{name:<10} cosine vs pytorch: mean={cosine.mean():.4f} min={cosine.min():.4f}  "
+        f"top-{TOP_K} overlap={statistics.mean(overlaps):.3f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 실행 방식 벤치마크")
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+
+    documents = load_knowledge_documents()
+    corpus = [document.page_content for document in documents]
+    queries = make_queries(documents, args.queries)
+
+    results = {}
+    for name, load in load_variants():
+        result = benchmark(name, load, corpus, queries)
+        if result is not None:
+            results[name] = result
+
+    reference = results.get("pytorch")
+    if reference is None:
+        print("pytorch 결과가 없어 정확도 비교를 건너뜁니다.")
+        return
+    for name, result in results.items():
+        if name != "pytorch":
+            compare(name, reference, result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+검색 백엔드 벤치마크: NumpyBackend vs ChromaBackend
+
+임베딩 모델 비용을 빼고 백엔드 자체의 적재/검색 시간만 비교하기 위해
+텍스트 해시로 만든 고정 랜덤 벡터(768차원, ko-sroberta와 같은 차원)를 사용합니다.
+
+실행: python playground/benchmark_retrieval.py [--sizes 50 1000 20000] [--queries 200]
+"""
+
+import argparse
+import hashlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document  # noqa: E402
+from database.retrieval_backends import ChromaBackend, NumpyBackend  # noqa: E402
+
+DIM = 768
+
+
+class HashEmbeddings:
+    """텍스트마다 항상 같은 랜덤 벡터를 돌려주는 가짜 임베딩"""
+
+    def _vector(self, text):
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(DIM).astype(np.float32).tolist()
+
+    def embed_documents(self, texts):
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def benchmark(name, backend, size, queries):
+    ids = [f"doc-{i}" for i in range(size)]
+    documents = [Document(page_content=f"사주 지식 문서 {i}", metadata={"i": i}) for i in range(size)]
+
+    start = time.perf_counter()
+    backend.add(ids, documents)
+    ingest_seconds = time.perf_counter() - start
+
+    latencies = []
+    for i in range(queries):
+        start = time.perf_counter()
+        backend.search(f"질문 {i}", k=5)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    print(
+        f"{name:<6} n={size:<6} ingest={ingest_seconds * 1000:9.1f}ms  "
+        f"query p50={statistics.median(latencies):7.3f}ms  "
+        f"p95={latencies[int(len(latencies) * 0.95) - 1]:7.3f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 백엔드 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 1000, 20000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    embeddings = HashEmbeddings()
+    for size in args.sizes:
+        benchmark("numpy", NumpyBackend(embeddings), size, args.queries)
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                backend = ChromaBackend(
+                    embeddings, collection_name=f"bench_{size}", persist_directory=directory
+                )
+                benchmark("chroma", backend, size, args.queries)
+        except ImportError as e:
+            print(f"chroma n={size}: skipped ({e})")
+
+
+if __name__ == "__main__":
+    main()
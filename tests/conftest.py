@@ -6,7 +6,7 @@ import pytest
 import pytest_asyncio
 import sys
 import os
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from httpx import AsyncClient
 from fastapi.testclient import TestClient
 from langchain_core.messages import AIMessage, HumanMessage
@@ -26,13 +26,37 @@ sys.modules['chatbot.tools'] = MagicMock()
 @pytest.fixture
 def mock_mysql_manager():
     """MySQL Manager mock fixture"""
-    # app 모듈에서 직접 mysql_manager를 mock
-    with patch('app.mysql_manager') as mock_instance:
+    # app 모듈에서 직접 mysql_manager를 mock (비동기 매니저이므로 AsyncMock 사용)
+    # 테스트 간 세션 캐시가 공유되지 않도록 빈 캐시로 교체
+    from database.session_cache import SessionCache
+
+    with patch('app.mysql_manager', new_callable=AsyncMock) as mock_instance, \
+            patch('app.session_cache', SessionCache()):
         mock_instance.get_user_session.return_value = None
         mock_instance.save_user_session.return_value = None
         mock_instance.close.return_value = None
         yield mock_instance
 
+@pytest.fixture
+def mock_session_writer():
+    """write-behind 큐 mock fixture"""
+    with patch('app.session_writer') as mock_writer:
+        mock_writer.stop = AsyncMock()
+        yield mock_writer
+
+@pytest.fixture
+def sqlite_mysql_manager():
+    """SQLite 기반 가짜 세션 매니저와 이를 사용하는 write-behind 큐로 교체하는 fixture"""
+    from tests.fakes import SQLiteSessionManager
+    from database.write_behind import WriteBehindQueue
+    from database.session_cache import SessionCache
+
+    manager = SQLiteSessionManager()
+    writer = WriteBehindQueue(manager, batch_size=100, flush_interval=60)
+    with patch('app.mysql_manager', manager), patch('app.session_writer', writer), \
+            patch('app.session_cache', SessionCache()):
+        yield manager
+
 @pytest.fixture
 def mock_saju_graph():
     """Saju Graph mock fixture"""
@@ -51,14 +75,14 @@ def mock_saju_graph():
         yield mock_app
 
 @pytest.fixture
-def client(mock_mysql_manager, mock_saju_graph):
+def client(mock_mysql_manager, mock_session_writer, mock_saju_graph):
     """Test client fixture for testing FastAPI app"""
     from app import app
     with TestClient(app) as test_client:
         yield test_client
 
 @pytest_asyncio.fixture
-async def async_client(mock_mysql_manager, mock_saju_graph):
+async def async_client(mock_mysql_manager, mock_session_writer, mock_saju_graph):
     """AsyncClient fixture for testing FastAPI app"""
     from app import app
     from httpx import ASGITransport
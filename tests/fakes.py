@@ -0,0 +1,124 @@
+"""
+테스트용 가짜 구현
+"""
+
+import sqlite3
+from datetime import datetime
+
+
+class SQLiteSessionManager:
+    """
+    AsyncMySQLManager와 같은 인터페이스를 가진 SQLite(in-memory) 기반 가짜 매니저
+    MySQL 서버 없이 세션 저장/조회 흐름을 검증하는 데 사용합니다.
+    """
+
+    def __init__(self):
+        self.connection = None
+
+    async def connect(self):
+        if self.connection is not None:
+            return
+        self.connection = sqlite3.connect(
+            ":memory:", detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False
+        )
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS user_sessions (
+                session_id TEXT PRIMARY KEY,
+                user_id TEXT,
+                birth_datetime TIMESTAMP,
+                is_lunar BOOLEAN,
+                is_leap_month BOOLEAN,
+                saju_chart INTEGER,
+                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS conversation_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT REFERENCES user_sessions(session_id),
+                role TEXT,
+                message TEXT,
+                timestamp TIMESTAMP
+            )
+            """
+        )
+
+    async def get_user_session(self, session_id: str):
+        await self.connect()
+        row = self.connection.execute(
+            "SELECT * FROM user_sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        for key in ("is_lunar", "is_leap_month"):
+            if record[key] is not None:
+                record[key] = bool(record[key])
+        return record
+
+    async def save_user_session(
+        self,
+        session_id: str,
+        user_id: str,
+        birth_datetime: datetime = None,
+        is_lunar: bool = None,
+        is_leap_month: bool = None,
+        saju_chart: int = None,
+    ):
+        await self.connect()
+        self.connection.execute(
+            """
+            INSERT INTO user_sessions (session_id, user_id, birth_datetime, is_lunar, is_leap_month, saju_chart)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(session_id) DO UPDATE SET
+                birth_datetime = excluded.birth_datetime,
+                is_lunar = excluded.is_lunar,
+                is_leap_month = excluded.is_leap_month,
+                saju_chart = COALESCE(excluded.saju_chart, saju_chart),
+                last_updated = CURRENT_TIMESTAMP
+            """,
+            (session_id, user_id, birth_datetime, is_lunar, is_leap_month, saju_chart),
+        )
+        self.connection.commit()
+
+    async def save_user_sessions_batch(self, rows: list[tuple]):
+        await self.connect()
+        self.connection.executemany(
+            """
+            INSERT INTO user_sessions (session_id, user_id, birth_datetime, is_lunar, is_leap_month, saju_chart)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(session_id) DO UPDATE SET
+                birth_datetime = COALESCE(excluded.birth_datetime, birth_datetime),
+                is_lunar = COALESCE(excluded.is_lunar, is_lunar),
+                is_leap_month = COALESCE(excluded.is_leap_month, is_leap_month),
+                saju_chart = COALESCE(excluded.saju_chart, saju_chart),
+                last_updated = CURRENT_TIMESTAMP
+            """,
+            rows,
+        )
+        self.connection.commit()
+
+    async def save_conversation_batch(self, rows: list[tuple]):
+        await self.connect()
+        self.connection.executemany(
+            "INSERT INTO conversation_history (session_id, role, message, timestamp) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        self.connection.commit()
+
+    async def get_conversation(self, session_id: str) -> list[dict]:
+        await self.connect()
+        rows = self.connection.execute(
+            "SELECT role, message FROM conversation_history WHERE session_id = ? ORDER BY id",
+            (session_id,),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    async def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,232 @@
+"""
+LLM 요청 동시 실행 제한(AdmissionController) 테스트
+"""
+
+import asyncio
+import threading
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from chatbot.admission import AdmissionController, AdmissionRejected, parse_model_limits
+
+
+def controller(**kwargs):
+    options = {"max_concurrent": 1, "max_queue": 10, "max_pending_per_user": 5, "queue_timeout": 1.0}
+    options.update(kwargs)
+    return AdmissionController(**options)
+
+
+async def settle():
+    """대기 중인 태스크가 대기열에 들어가도록 이벤트 루프를 한 바퀴 돌림"""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+class TestAdmissionController:
+    def test_waiting_users_are_served_round_robin(self):
+        """
+        Given: 슬롯 1개가 사용 중이고, heavy 사용자 3개 요청 뒤에 light 사용자 1개 요청이 대기
+        When: 슬롯이 하나씩 반납됨
+        Then: 도착 순서가 아니라 사용자를 번갈아 가며 들여보낸다 (heavy, light, heavy, heavy)
+        """
+        admission = controller()
+        order = []
+
+        async def request(user_id):
+            async with admission.slot("gpt-4o-mini", user_id):
+                order.append(user_id)
+                await asyncio.sleep(0)
+
+        async def run():
+            first = await admission.acquire("gpt-4o-mini", "first")
+            tasks = [asyncio.create_task(request("heavy")) for _ in range(3)]
+            await settle()
+            tasks.append(asyncio.create_task(request("light")))
+            await settle()
+            assert admission.slots("gpt-4o-mini").stats()["queued"] == 4
+            first.release()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+
+        assert order == ["heavy", "light", "heavy", "heavy"]
+        stats = admission.slots("gpt-4o-mini").stats()
+        assert stats["active"] == 0 and stats["queued"] == 0 and stats["admitted"] == 5
+
+    def test_user_over_pending_limit_gets_429(self):
+        """
+        Given: 사용자당 실행+대기 2개 제한
+        When: 같은 사용자가 세 번째 요청
+        Then: Retry-After와 함께 429로 거절되고, 다른 사용자는 대기할 수 있다
+        """
+        admission = controller(max_pending_per_user=2)
+
+        async def run():
+            await admission.acquire("m", "user")
+            waiting = asyncio.create_task(admission.acquire("m", "user"))
+            await settle()
+            with pytest.raises(AdmissionRejected) as rejected:
+                await admission.acquire("m", "user")
+            other = asyncio.create_task(admission.acquire("m", "other"))
+            await settle()
+            assert admission.slots("m").stats()["queued"] == 2
+            waiting.cancel()
+            other.cancel()
+            return rejected.value
+
+        rejected = asyncio.run(run())
+
+        assert rejected.status_code == 429
+        assert rejected.retry_after >= 1
+
+    def test_full_queue_and_timeout_get_503(self):
+        """
+        Given: 대기열 1칸, 대기 시간 0.05초
+        When: 대기열이 찬 상태에서 요청 / 대기 중 시간 초과
+        Then: 둘 다 503이고, 시간 초과된 요청은 대기열에서 빠진다
+        """
+        admission = controller(max_queue=1, queue_timeout=0.05)
+
+        async def run():
+            await admission.acquire("m", "a")
+            waiting = asyncio.create_task(admission.acquire("m", "b"))
+            await settle()
+            with pytest.raises(AdmissionRejected) as full:
+                await admission.acquire("m", "c")
+            with pytest.raises(AdmissionRejected) as timed_out:
+                await waiting
+            return full.value, timed_out.value
+
+        full, timed_out = asyncio.run(run())
+
+        assert full.status_code == 503
+        assert timed_out.status_code == 503
+        stats = admission.slots("m").stats()
+        assert stats["queued"] == 0
+        assert stats["rejected_queue_full"] == 1 and stats["timed_out"] == 1
+
+    def test_cancelled_waiter_does_not_leak_slot(self):
+        """
+        Given: 대기 중에 취소된 요청
+        When: 슬롯이 반납됨
+        Then: 취소된 요청은 건너뛰고 다음 요청이 슬롯을 받는다
+        """
+        admission = controller()
+
+        async def run():
+            holder = await admission.acquire("m", "a")
+            cancelled = asyncio.create_task(admission.acquire("m", "b"))
+            following = asyncio.create_task(admission.acquire("m", "c"))
+            await settle()
+            cancelled.cancel()
+            await settle()
+            holder.release()
+            permit = await following
+            assert permit.user_id == "c"
+            permit.release()
+            permit.release()  # 두 번 반납해도 한 번만 적용
+
+        asyncio.run(run())
+
+        stats = admission.slots("m").stats()
+        assert stats["active"] == 0 and stats["queued"] == 0
+
+    def test_model_limits(self):
+        """
+        Given: 모델별 동시 실행 수 설정 문자열
+        When: 파싱하여 모델별 슬롯 생성
+        Then: 지정한 모델은 해당 값, 나머지는 기본값을 사용한다
+        """
+        limits = parse_model_limits("gpt-4o=2, gpt-4o-mini=16")
+        admission = controller(max_concurrent=4, model_limits=limits)
+
+        assert limits == {"gpt-4o": 2, "gpt-4o-mini": 16}
+        assert admission.slots("gpt-4o").max_concurrent == 2
+        assert admission.slots("o3").max_concurrent == 4
+
+
+class TestAdmissionAPI:
+    @pytest.fixture
+    def saturated(self, monkeypatch):
+        """슬롯 1개를 다른 사용자가 점유하고 대기열이 없는 상태"""
+        import app as app_module
+
+        admission = controller(max_queue=0)
+        monkeypatch.setattr(app_module, "llm_admission", admission)
+        asyncio.run(admission.acquire(app_module.OPENAI_MODEL, "someone-else"))
+        return admission
+
+    def test_chat_rejected_with_retry_after_when_saturated(self, client, sample_chat_request, saturated):
+        """포화 상태의 /chat/, /chat/stream 요청은 그래프 실행 없이 503 + Retry-After"""
+        # When
+        response = client.post("/chat/", json=sample_chat_request)
+        stream_response = client.post("/chat/stream", json=sample_chat_request)
+
+        # Then
+        for rejected in (response, stream_response):
+            assert rejected.status_code == 503
+            assert int(rejected.headers["retry-after"]) >= 1
+
+    def test_chat_releases_slot_after_request(self, client, sample_chat_request, monkeypatch):
+        """요청이 끝나면(오류 포함) 슬롯이 반납됨"""
+        import app as app_module
+
+        admission = controller(max_queue=0)
+        monkeypatch.setattr(app_module, "llm_admission", admission)
+        app_module.saju_graph_app.invoke.side_effect = [Exception("LLM 오류"), app_module.saju_graph_app.invoke.return_value]
+
+        # When
+        failed = client.post("/chat/", json=sample_chat_request)
+        succeeded = client.post("/chat/", json=sample_chat_request)
+
+        # Then
+        assert failed.status_code == 500
+        assert succeeded.status_code == 200
+        assert admission.slots(app_module.OPENAI_MODEL).stats()["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_chat_keeps_slot_until_graph_finishes(
+        self, mock_mysql_manager, mock_session_writer, mock_saju_graph, monkeypatch
+    ):
+        """요청이 취소되어도 스레드의 그래프 실행이 끝날 때까지 슬롯을 잡아 동시 실행 수가 제한을 넘지 않음"""
+        # Given
+        import app as app_module
+
+        admission = controller(max_concurrent=1, queue_timeout=5.0)
+        monkeypatch.setattr(app_module, "llm_admission", admission)
+        lock = threading.Lock()
+        started = threading.Event()
+        finish = threading.Event()
+        runs = {"in_flight": 0, "max_in_flight": 0}
+
+        def slow_invoke(state):
+            with lock:
+                runs["in_flight"] += 1
+                runs["max_in_flight"] = max(runs["max_in_flight"], runs["in_flight"])
+            started.set()
+            finish.wait(timeout=5)
+            with lock:
+                runs["in_flight"] -= 1
+            return {"messages": [AIMessage(content="완료")]}
+
+        mock_saju_graph.invoke.side_effect = slow_invoke
+        slots = admission.slots(app_module.OPENAI_MODEL)
+
+        # When - 첫 요청의 그래프가 실행 중일 때 요청을 취소하고 두 번째 요청을 보냄
+        first = asyncio.create_task(app_module.chat_with_saju_bot(app_module.ChatRequest(user_id="u-1", message="첫 요청")))
+        await asyncio.to_thread(started.wait, 5)
+        first.cancel()
+        await settle()
+        second = asyncio.create_task(app_module.chat_with_saju_bot(app_module.ChatRequest(user_id="u-2", message="두 번째")))
+        await settle()
+        held_after_cancel = (slots.stats()["active"], slots.stats()["queued"], runs["in_flight"])
+        finish.set()
+        response = await asyncio.wait_for(second, timeout=5)
+
+        # Then
+        assert first.cancelled()
+        assert held_after_cancel == (1, 1, 1)
+        assert response.status_code == 200
+        assert runs["max_in_flight"] == 1
+        assert slots.stats()["active"] == 0
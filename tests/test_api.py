@@ -2,6 +2,8 @@
 FastAPI 앱 API 테스트
 """
 
+import json
+
 import pytest
 from unittest.mock import Mock, patch
 from fastapi.testclient import TestClient
@@ -28,6 +30,18 @@ class TestChatAPI:
         assert "full_history" in data
         assert data["response"] == "안녕하세요! 사주팔자 상담을 도와드리겠습니다."
 
+    def test_chat_response_includes_token_usage(self, client, sample_chat_request):
+        """응답에 요청/세션 토큰 사용량 포함 테스트"""
+        # When
+        response = client.post("/chat/", json=sample_chat_request)
+
+        # Then
+        assert response.status_code == status.HTTP_200_OK
+        token_usage = response.json()["token_usage"]
+        assert token_usage["request"]["total_tokens"] == 0  # 그래프가 mock이므로 LLM 호출 없음
+        assert "session" in token_usage
+        assert "over_budget" in token_usage
+
     def test_chat_with_history(self, client, sample_chat_request_with_history, mock_saju_graph):
         """대화 기록이 있는 채팅 요청 테스트"""
         # Given
@@ -84,7 +98,7 @@ class TestChatAPI:
         assert data["session_id"] is not None  # 새로운 세션 ID가 생성됨
         assert data["response"] == "새로운 세션에서 안녕하세요!"
 
-    def test_chat_with_existing_session_data(self, client, mock_mysql_manager, mock_saju_graph):
+    def test_chat_with_existing_session_data(self, client, mock_mysql_manager, mock_session_writer, mock_saju_graph):
         """기존 세션 데이터가 있는 경우 테스트"""
         # Given
         from datetime import datetime
@@ -122,7 +136,9 @@ class TestChatAPI:
 
         assert data["response"] == "기존 사주 정보를 바탕으로 답변드리겠습니다."
         mock_mysql_manager.get_user_session.assert_called_once()
-        mock_mysql_manager.save_user_session.assert_called_once()
+        # 저장은 응답 경로에서 DB를 기다리지 않고 write-behind 큐에 적재
+        mock_session_writer.save_user_session.assert_called_once()
+        mock_mysql_manager.save_user_session.assert_not_called()
 
     def test_chat_tool_message_response(self, client, sample_chat_request, mock_saju_graph):
         """도구 메시지 응답 테스트"""
@@ -237,6 +253,80 @@ class TestChatAPI:
         assert len(call_args["messages"]) == 4  # 히스토리 3개 + 현재 메시지 1개
 
 
+class TestChatHistoryModes:
+    """응답 full_history 형식(history_mode) 테스트"""
+
+    @pytest.fixture
+    def tool_conversation(self, mock_saju_graph):
+        mock_saju_graph.invoke.return_value = {
+            "messages": [
+                HumanMessage(content="1990년 5월 15일 오후 2시생입니다"),
+                AIMessage(
+                    content="",
+                    tool_calls=[{"name": "calculate_and_analyze_saju", "args": {"birth_year": 1990}, "id": "call-1"}],
+                ),
+                ToolMessage(content='{"saju_info": {"year_ganji": "庚午"}}', tool_call_id="call-1"),
+                AIMessage(content="경오년생이시네요."),
+            ],
+            "session_id": "test-session-456",
+        }
+        return mock_saju_graph
+
+    def test_full_history_embeds_tool_payload_as_object(self, client, sample_chat_request, tool_conversation):
+        """full 모드: 도구 결과가 이스케이프된 문자열이 아닌 JSON 객체로 포함되고, 그대로 다시 보낼 수 있음"""
+        # When
+        data = client.post("/chat/", json=sample_chat_request).json()
+
+        # Then
+        assert len(data["full_history"]) == 4
+        assert data["full_history"][2]["content"] == {"saju_info": {"year_ganji": "庚午"}}
+
+        # When - 받은 기록을 다음 요청에 그대로 사용
+        response = client.post("/chat/", json={**sample_chat_request, "history": data["full_history"]})
+
+        # Then - 도구 결과는 다시 JSON 문자열로 변환되어 그래프에 전달
+        assert response.status_code == status.HTTP_200_OK
+        tool_message = tool_conversation.invoke.call_args[0][0]["messages"][2]
+        assert isinstance(tool_message, ToolMessage)
+        assert json.loads(tool_message.content) == {"saju_info": {"year_ganji": "庚午"}}
+
+    def test_compact_history_keeps_only_dialogue(self, client, sample_chat_request, tool_conversation):
+        """compact 모드: 도구 호출/결과 없이 사용자 질문과 챗봇 답변만 포함"""
+        # When
+        data = client.post("/chat/", json={**sample_chat_request, "history_mode": "compact"}).json()
+
+        # Then
+        assert data["full_history"] == [
+            {"role": "user", "content": "1990년 5월 15일 오후 2시생입니다"},
+            {"role": "assistant", "content": "경오년생이시네요."},
+        ]
+
+    def test_none_history_omits_field(self, client, sample_chat_request, tool_conversation):
+        """none 모드: full_history를 보내지 않음, 잘못된 모드는 422"""
+        # When
+        data = client.post("/chat/", json={**sample_chat_request, "history_mode": "none"}).json()
+
+        # Then
+        assert "full_history" not in data
+        assert data["response"] == "경오년생이시네요."
+        assert client.post("/chat/", json={**sample_chat_request, "history_mode": "all"}).status_code == 422
+
+
+class TestMetricsAPI:
+    """메트릭 API 테스트"""
+
+    def test_metrics_endpoint(self, client):
+        """메트릭 스냅샷 조회 테스트"""
+        # When
+        response = client.get("/metrics")
+
+        # Then
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert "counters" in data
+        assert "token_meter" in data
+
+
 class TestAPIValidation:
     """API 입력 검증 테스트"""
 
@@ -0,0 +1,327 @@
+"""
+비동기 AsyncMySQLManager 테스트 (배치 SQL, BINARY(16) 키 변환, 가짜 aiomysql 풀 사용)
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from pymysql import Error, OperationalError
+
+from database.async_mysql_manager import AsyncMySQLManager
+from database.schema import build_conversation_batch_insert, build_session_batch_upsert, session_key
+from metrics import metrics
+
+UUID_SESSION = "123e4567-e89b-12d3-a456-426614174000"
+
+
+class FakeAsyncCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, query, params=None):
+        if self.connection.execute_error:
+            raise self.connection.execute_error
+        self.connection.executed.append((query, params))
+
+    async def fetchone(self):
+        return None
+
+    async def fetchall(self):
+        return []
+
+
+class FakeAsyncConnection:
+    """ping(reconnect=True) 호출과 실행한 쿼리를 기록하는 가짜 aiomysql 연결"""
+
+    def __init__(self):
+        self.executed = []
+        self.pings = []
+        self.commits = 0
+        self.ping_error = None
+        self.execute_error = None
+
+    async def ping(self, reconnect=True):
+        self.pings.append(reconnect)
+        if self.ping_error:
+            raise self.ping_error
+
+    def cursor(self, *cursor_class):
+        return FakeAsyncCursor(self)
+
+    async def commit(self):
+        self.commits += 1
+
+
+class FakeAsyncPool:
+    """aiomysql.Pool 대신 쓰는 가짜 풀 (연결 하나를 돌려 쓰며 maxsize만큼만 빌려줌)"""
+
+    def __init__(self, maxsize=1):
+        self.connection = FakeAsyncConnection()
+        self.maxsize = maxsize
+        self.size = maxsize
+        self.in_use = 0
+        self.acquired = 0
+        self.released = 0
+        self._returned = asyncio.Condition()
+
+    @property
+    def freesize(self):
+        return self.maxsize - self.in_use
+
+    async def acquire(self):
+        async with self._returned:
+            await self._returned.wait_for(lambda: self.in_use < self.maxsize)
+            self.in_use += 1
+            self.acquired += 1
+        return self.connection
+
+    def release(self, connection):
+        assert connection is self.connection
+        self.in_use -= 1
+        self.released += 1
+
+        async def notify():
+            async with self._returned:
+                self._returned.notify_all()
+
+        asyncio.get_running_loop().create_task(notify())
+
+
+@pytest.fixture
+def manager():
+    """가짜 풀을 붙인 매니저 (connect()/마이그레이션 생략)"""
+    metrics.reset()
+    manager = AsyncMySQLManager(pool_size=1, pool_timeout=0.05)
+    manager.pool = FakeAsyncPool(maxsize=1)
+    return manager
+
+
+class TestBatchSQL:
+    """write-behind 배치 SQL 생성 테스트"""
+
+    def test_session_batch_upsert_has_one_group_per_row(self):
+        """행마다 6개 자리표시자, 기존 값을 NULL로 덮어쓰지 않는 COALESCE 갱신"""
+        # When
+        query = build_session_batch_upsert(3)
+
+        # Then
+        assert query.startswith("INSERT INTO user_sessions (session_id, user_id,")
+        assert query.count("(%s, %s, %s, %s, %s, %s)") == 3
+        assert query.count("%s") == 18
+        assert "saju_chart = COALESCE(VALUES(saju_chart), saju_chart)" in query
+        assert "birth_datetime = COALESCE(VALUES(birth_datetime), birth_datetime)" in query
+
+    def test_conversation_batch_insert_has_one_group_per_row(self):
+        """행마다 4개 자리표시자, 갱신 없는 단순 INSERT"""
+        # When
+        query = build_conversation_batch_insert(2)
+
+        # Then
+        assert query == (
+            "INSERT INTO conversation_history (session_id, role, message, timestamp) "
+            "VALUES (%s, %s, %s, %s), (%s, %s, %s, %s);"
+        )
+
+
+class TestBatchSaves:
+    """배치 저장 시 session_id를 BINARY(16) 키로 바꿔 파라미터를 한 줄로 펼치는지 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_session_batch_flattens_rows_with_binary_keys(self, manager):
+        """
+        Given: UUID 세션과 일반 문자열 세션 두 행
+        When: save_user_sessions_batch
+        Then: 쿼리 하나로 실행하고, session_id만 session_key()로 바꾼 값이 행 순서대로 펼쳐진다
+        """
+        # Given
+        birth = datetime(1990, 5, 10, 15, 30)
+        rows = [
+            (UUID_SESSION, "user-1", birth, False, False, 123),
+            ("plain-session", "user-2", None, None, None, None),
+        ]
+
+        # When
+        await manager.save_user_sessions_batch(rows)
+
+        # Then
+        connection = manager.pool.connection
+        [(query, params)] = connection.executed
+        assert query == build_session_batch_upsert(2)
+        assert params == [
+            session_key(UUID_SESSION), "user-1", birth, False, False, 123,
+            session_key("plain-session"), "user-2", None, None, None, None,
+        ]
+        assert params[0] == bytes.fromhex(UUID_SESSION.replace("-", ""))
+        assert all(len(params[index]) == 16 for index in (0, 6))
+        assert query.count("%s") == len(params)
+        assert connection.commits == 1
+        assert manager.pool.released == 1
+
+    @pytest.mark.asyncio
+    async def test_conversation_batch_flattens_rows_with_binary_keys(self, manager):
+        """대화 기록 행도 session_id만 16바이트 키로 바꿔 (키, 역할, 메시지, 시각) 순서로 펼침"""
+        # Given
+        at = datetime(2024, 1, 1, 9, 0)
+        rows = [
+            ("plain-session", "user", "안녕하세요", at),
+            (UUID_SESSION, "assistant", "반갑습니다", at),
+        ]
+
+        # When
+        await manager.save_conversation_batch(rows)
+
+        # Then
+        [(query, params)] = manager.pool.connection.executed
+        assert query == build_conversation_batch_insert(2)
+        assert params == [
+            session_key("plain-session"), "user", "안녕하세요", at,
+            session_key(UUID_SESSION), "assistant", "반갑습니다", at,
+        ]
+        assert query.count("%s") == len(params)
+        assert manager.pool.connection.commits == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_batches_do_not_touch_the_pool(self, manager):
+        """빈 배치는 연결을 빌리지 않음"""
+        # When
+        await manager.save_user_sessions_batch([])
+        await manager.save_conversation_batch([])
+
+        # Then
+        assert manager.pool.acquired == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_raises_and_releases_connection(self, manager):
+        """
+        Given: 쿼리 실행이 실패하는 연결
+        When: 배치 저장
+        Then: write-behind 큐가 재시도하도록 예외를 올리고, 커밋 없이 연결을 반납한다
+        """
+        # Given
+        manager.pool.connection.execute_error = OperationalError(2013, "Lost connection")
+
+        # When / Then
+        with pytest.raises(Error):
+            await manager.save_conversation_batch([("s", "user", "메시지", datetime(2024, 1, 1))])
+        assert manager.pool.connection.commits == 0
+        assert manager.pool.released == 1
+        assert manager.pool.in_use == 0
+
+
+class TestAsyncPool:
+    """풀 대기 타임아웃, ping 재연결, 오류 시 반납 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_checkout_times_out_when_pool_is_exhausted(self, manager):
+        """모든 연결이 사용 중이면 pool_timeout 뒤에 Error, 타임아웃 메트릭 증가"""
+        # When / Then
+        async with manager.connection():
+            with pytest.raises(Error, match="Timed out after 0.05s"):
+                async with manager.connection():
+                    pass
+
+        snapshot = metrics.snapshot()
+        assert snapshot["counters"]["mysql.async_pool.timeouts"] == 1
+        assert snapshot["timings"]["mysql.async_pool.wait_seconds"]["count"] == 2
+        assert manager.pool.in_use == 0
+
+    @pytest.mark.asyncio
+    async def test_waiter_gets_connection_after_release(self, manager):
+        """제한 시간 안에 반납되면 대기하던 요청이 같은 연결을 받음"""
+        # Given
+        manager.pool_timeout = 1.0
+        holder_entered = asyncio.Event()
+        release_holder = asyncio.Event()
+
+        async def holder():
+            async with manager.connection():
+                holder_entered.set()
+                await release_holder.wait()
+
+        # When
+        holding = asyncio.create_task(holder())
+        await holder_entered.wait()
+        waiting = asyncio.create_task(manager.get_conversation_history("s"))
+        await asyncio.sleep(0.01)
+        stats_while_waiting = manager.pool_stats()
+        release_holder.set()
+        await holding
+        await waiting
+
+        # Then
+        assert stats_while_waiting["idle"] == 0
+        assert manager.pool.acquired == 2
+        assert manager.pool_stats() == {"size": 1, "open": 1, "idle": 1, "initialized": True}
+        assert "mysql.async_pool.timeouts" not in metrics.snapshot()["counters"]
+
+    @pytest.mark.asyncio
+    async def test_connection_is_pinged_with_reconnect(self, manager):
+        """빌려줄 때마다 ping(reconnect=True)으로 끊긴 연결을 다시 이음"""
+        # When
+        async with manager.connection():
+            pass
+        async with manager.connection():
+            pass
+
+        # Then
+        assert manager.pool.connection.pings == [True, True]
+
+    @pytest.mark.asyncio
+    async def test_failed_ping_releases_connection(self, manager):
+        """재연결(ping)에 실패하면 오류를 내고 연결을 반납해 다음 요청이 대기 없이 성공"""
+        # Given
+        manager.pool.connection.ping_error = OperationalError(2003, "Can't connect to MySQL server")
+
+        # When
+        with pytest.raises(Error):
+            async with manager.connection():
+                pass
+
+        # Then
+        assert manager.pool.released == 1
+        manager.pool.connection.ping_error = None
+        async with manager.connection():
+            pass
+        assert "mysql.async_pool.timeouts" not in metrics.snapshot()["counters"]
+
+    @pytest.mark.asyncio
+    async def test_connection_released_when_block_raises(self, manager):
+        """블록 안에서 예외가 나도 연결을 반납"""
+        # When
+        with pytest.raises(ValueError):
+            async with manager.connection():
+                raise ValueError("query failed")
+
+        # Then
+        assert manager.pool.released == 1
+        assert manager.pool.in_use == 0
+
+    @pytest.mark.asyncio
+    async def test_uninitialized_pool_raises_after_failed_connect(self, monkeypatch):
+        """풀 생성에 실패하면 connection()은 Error를 내고 다음 요청에서 다시 시도"""
+        # Given
+        import database.async_mysql_manager as module
+
+        attempts = []
+
+        async def failing_create_pool(**kwargs):
+            attempts.append(kwargs["maxsize"])
+            raise OperationalError(2003, "Can't connect to MySQL server")
+
+        monkeypatch.setattr(module.aiomysql, "create_pool", failing_create_pool)
+        manager = AsyncMySQLManager(pool_size=3)
+
+        # When / Then
+        for _ in range(2):
+            with pytest.raises(Error, match="not initialized"):
+                async with manager.connection():
+                    pass
+        assert attempts == [3, 3]
+        assert manager.pool_stats() == {"size": 3, "initialized": False}
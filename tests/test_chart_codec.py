@@ -0,0 +1,106 @@
+"""
+사주 차트 압축 저장/복원 테스트
+"""
+
+import re
+import sqlite3
+
+import pytest
+
+from core.chart_codec import (
+    ANALYSIS_VERSION,
+    decode_chart,
+    encode_chart,
+    ganji_from_index,
+    ganji_index,
+    hydrate_chart,
+)
+
+SAJU_INFO = {
+    "year_ganji": "庚午",
+    "month_ganji": "辛巳",
+    "day_ganji": "丁丑",
+    "time_ganji": "戊申",
+}
+
+
+class TestChartCodec:
+    """encode_chart / decode_chart 테스트"""
+
+    def test_sexagenary_index_round_trip(self):
+        """육십갑자 60개 모두 인덱스 ↔ 간지 변환이 일치"""
+        # When
+        ganjis = [ganji_from_index(index) for index in range(60)]
+
+        # Then
+        assert ganjis[0] == "甲子" and ganjis[59] == "癸亥"
+        assert len(set(ganjis)) == 60
+        assert [ganji_index(ganji) for ganji in ganjis] == list(range(60))
+
+    def test_invalid_ganji_is_rejected(self):
+        """존재하지 않는 조합(양간+음지)은 ValueError"""
+        with pytest.raises(ValueError):
+            ganji_index("甲丑")
+
+    def test_encode_decode_round_trip(self):
+        """네 기둥이 INT UNSIGNED 하나로 압축되고 그대로 복원"""
+        # When
+        code = encode_chart(SAJU_INFO)
+        decoded = decode_chart(code)
+
+        # Then
+        assert 0 <= code < 2**32
+        assert {key: decoded[key] for key in SAJU_INFO} == SAJU_INFO
+        assert len(decoded["gan_list"]) == 10 and len(decoded["ji_list"]) == 12
+
+    def test_other_analysis_version_is_ignored(self):
+        """분석 버전이 다르거나 값이 없으면 복원하지 않음 (도구로 다시 계산)"""
+        # Given
+        old_code = encode_chart(SAJU_INFO, version=ANALYSIS_VERSION + 1)
+
+        # When / Then
+        assert decode_chart(old_code) is None
+        assert decode_chart(None) is None
+
+    def test_hydrate_chart_reruns_analysis(self):
+        """저장된 코드로 계산 결과와 분석 결과를 모두 복원"""
+        # When
+        saju_info, analyzed_info = hydrate_chart(encode_chart(SAJU_INFO))
+
+        # Then
+        assert saju_info["day_ganji"] == "丁丑"
+        assert analyzed_info["day_gan"] == "丁"
+        assert sum(analyzed_info["ohang_counts"].values()) == 8
+
+
+class TestStoredChartUpsert:
+    """세션 upsert가 저장된 차트를 보존하는지 테스트 (schema.UPSERT_USER_SESSION을 SQLite 문법으로 바꿔 실행)"""
+
+    @staticmethod
+    def run_upsert(connection, params):
+        from database.schema import UPSERT_USER_SESSION
+
+        query = UPSERT_USER_SESSION.replace("%s", "?").replace(
+            "ON DUPLICATE KEY UPDATE", "ON CONFLICT(session_id) DO UPDATE SET"
+        )
+        connection.execute(re.sub(r"VALUES\((\w+)\)", r"excluded.\1", query), params)
+
+    def test_save_without_chart_keeps_stored_chart(self):
+        """차트 없이 저장(save_user_session_data 도구)해도 기존 차트는 그대로, 새 차트는 덮어씀"""
+        # Given
+        connection = sqlite3.connect(":memory:")
+        connection.execute(
+            "CREATE TABLE user_sessions (session_id TEXT PRIMARY KEY, user_id TEXT, birth_datetime TEXT, "
+            "is_lunar BOOLEAN, is_leap_month BOOLEAN, saju_chart INTEGER, last_updated TIMESTAMP)"
+        )
+        self.run_upsert(connection, ("s-1", "u-1", "1990-05-15 14:00:00", False, False, 12345))
+
+        # When
+        self.run_upsert(connection, ("s-1", "u-1", "1990-05-15 14:00:00", False, None, None))
+        kept = connection.execute("SELECT saju_chart FROM user_sessions").fetchone()[0]
+        self.run_upsert(connection, ("s-1", "u-1", "1990-05-15 14:00:00", False, False, 678))
+        replaced = connection.execute("SELECT saju_chart FROM user_sessions").fetchone()[0]
+
+        # Then
+        assert kept == 12345
+        assert replaced == 678
@@ -0,0 +1,310 @@
+"""
+LLM 없는 사주 계산 서비스(ChartService)와 /saju/batch, /saju/chart 엔드포인트 테스트
+"""
+
+import asyncio
+import json
+import threading
+from datetime import datetime
+
+import pytest
+
+from core.chart_service import ChartService
+
+PILLARS = {"year_ganji": "甲子", "month_ganji": "乙丑", "day_ganji": "丙寅", "time_ganji": "丁卯"}
+
+
+class CountingCalculator:
+    def __init__(self):
+        self.calls = 0
+
+    def calculate_saju(self, birth_datetime, is_lunar=False, is_leap_month=False):
+        self.calls += 1
+        if birth_datetime.year < 1900:
+            raise ValueError("지원하지 않는 연도")
+        return {**PILLARS, "birth_datetime": birth_datetime}
+
+
+class CountingAnalyzer:
+    def __init__(self):
+        self.calls = 0
+
+    def analyze_saju(self, saju_info):
+        self.calls += 1
+        return {"day_gan": saju_info["day_ganji"][0], "sinsal_results": ["역마살"]}
+
+
+def item(index, value, **kwargs):
+    return {"index": index, "id": f"p{index}", "birth_datetime": value, **kwargs}
+
+
+class TestChartService:
+    def test_same_input_and_same_chart_are_computed_once(self):
+        """
+        Given: 같은 입력 두 번과, 다른 입력이지만 같은 사주
+        When: compute_many 호출
+        Then: 계산은 입력 종류 수만큼, 분석은 사주 종류 수만큼만 수행된다
+        """
+        calculator, analyzer = CountingCalculator(), CountingAnalyzer()
+        service = ChartService(calculator, analyzer)
+        birth = datetime(1990, 5, 15, 14, 0)
+
+        rows = service.compute_many([item(0, birth), item(1, birth), item(2, datetime(1991, 1, 1))])
+
+        assert calculator.calls == 2
+        assert analyzer.calls == 1
+        assert [row["index"] for row in rows] == [0, 1, 2]
+        assert rows[0]["saju_info"] == PILLARS
+        assert rows[0]["birth_datetime"] == "1990-05-15T14:00:00"
+        assert service.stats()["analyze_hits"] == 2
+
+    def test_results_are_isolated_from_cache(self):
+        """
+        Given: 한 번 계산된 결과
+        When: 호출 측이 결과를 수정
+        Then: 다음 결과에는 영향이 없다
+        """
+        service = ChartService(CountingCalculator(), CountingAnalyzer())
+        birth = datetime(1990, 5, 15, 14, 0)
+
+        service.compute(birth)["analyzed_info"]["sinsal_results"].append("변경")
+
+        assert service.compute(birth)["analyzed_info"]["sinsal_results"] == ["역마살"]
+
+    def test_failing_item_becomes_error_row(self):
+        """
+        Given: 계산 중 예외가 나는 입력이 섞인 배치
+        When: compute_many 호출
+        Then: 해당 입력만 error 행이 되고 나머지는 계산된다
+        """
+        service = ChartService(CountingCalculator(), CountingAnalyzer())
+
+        rows = service.compute_many([item(0, datetime(1850, 1, 1)), item(1, datetime(1990, 5, 15))])
+
+        assert rows[0] == {"index": 0, "id": "p0", "error": "사주 계산 중 오류가 발생했습니다: 지원하지 않는 연도"}
+        assert rows[1]["saju_info"] == PILLARS
+
+
+def ndjson(text):
+    return [json.loads(line) for line in text.splitlines()]
+
+
+class TestSajuBatchEndpoint:
+    def test_json_array_streams_ndjson_in_order(self, client):
+        """
+        Given: JSON 배열 입력 (잘못된 항목 포함)
+        When: /saju/batch 호출
+        Then: 입력 순서대로 NDJSON 결과가 오고 잘못된 항목은 error 행이 된다
+        """
+        response = client.post(
+            "/saju/batch",
+            json=[
+                {"id": "a", "birth_datetime": "1990-05-15T14:00:00"},
+                {"id": "b", "birth_datetime": "생일 아님"},
+                {"id": "c", "birth_datetime": "1985-03-10T08:30:00", "is_lunar": True},
+            ],
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = ndjson(response.text)
+        assert [row["id"] for row in rows] == ["a", "b", "c"]
+        assert [row["index"] for row in rows] == [0, 1, 2]
+        assert set(rows[0]["saju_info"]) == {"year_ganji", "month_ganji", "day_ganji", "time_ganji"}
+        assert "analyzed_info" in rows[0]
+        assert "error" in rows[1]
+        assert "saju_info" in rows[2]
+
+    def test_ndjson_input_with_items_wrapper_equivalent(self, client):
+        """
+        Given: 같은 입력을 NDJSON과 {"items": [...]} 형식으로 전송
+        When: /saju/batch 호출
+        Then: 결과가 같고, 깨진 JSON 줄은 error 행이 된다
+        """
+        items = [{"birth_datetime": "1990-05-15T14:00:00"}, {"birth_datetime": "2000-01-01T00:00:00"}]
+        body = "\n".join(json.dumps(i) for i in items) + "\n{깨진 줄\n"
+
+        streamed = ndjson(
+            client.post("/saju/batch", content=body, headers={"Content-Type": "application/x-ndjson"}).text
+        )
+        wrapped = ndjson(client.post("/saju/batch", json={"items": items}).text)
+
+        assert streamed[:2] == wrapped
+        assert streamed[2]["index"] == 2 and "error" in streamed[2]
+
+    def test_invalid_body_and_limit(self, client, monkeypatch):
+        """
+        Given: 배열이 아닌 본문 / 최대 항목 수를 넘는 배열
+        When: /saju/batch 호출
+        Then: 각각 400, 413을 반환한다
+        """
+        import app as app_module
+
+        monkeypatch.setattr(app_module, "SAJU_BATCH_MAX_ITEMS", 1)
+
+        assert client.post("/saju/batch", json={"birth_datetime": "1990-05-15T14:00:00"}).status_code == 400
+        too_many = [{"birth_datetime": "1990-05-15T14:00:00"}] * 2
+        assert client.post("/saju/batch", json=too_many).status_code == 413
+
+    @pytest.mark.asyncio
+    async def test_rows_stream_incrementally_when_client_accepts_compression(self, monkeypatch):
+        """
+        Given: 압축을 받는 클라이언트(Accept-Encoding: br, gzip)와 두 번째 항목 계산이 첫 행 전송을 기다리는 서비스
+        When: ASGI 앱을 직접 호출해 /saju/batch 응답 메시지를 받음
+        Then: 압축 없이 첫 행이 두 번째 항목 계산 전에 전송된다 (압축 미들웨어가 모아 두지 않음)
+        """
+        import app as app_module
+
+        first_row_sent = threading.Event()
+        waited = []
+
+        class GatedChartService:
+            def compute_many(self, items):
+                if items[0]["index"] > 0:
+                    waited.append(first_row_sent.wait(timeout=2))
+                return [{"index": item["index"], "id": item["id"], "saju_info": PILLARS} for item in items]
+
+        monkeypatch.setattr(app_module, "chart_service", GatedChartService())
+        monkeypatch.setattr(app_module, "SAJU_BATCH_CHUNK_SIZE", 1)
+        body = json.dumps([{"birth_datetime": "1990-05-15T14:00:00"}, {"birth_datetime": "2000-01-01T00:00:00"}])
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+            "path": "/saju/batch", "raw_path": b"/saju/batch", "root_path": "", "query_string": b"",
+            "headers": [(b"content-type", b"application/json"), (b"accept-encoding", b"br, gzip")],
+            "client": ("test", 1), "server": ("test", 80),
+        }
+        request_messages = [{"type": "http.request", "body": body.encode(), "more_body": False}]
+        done = asyncio.Event()
+        messages = []
+
+        async def receive():
+            if request_messages:
+                return request_messages.pop(0)
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+            if message["type"] == "http.response.body" and message.get("body"):
+                first_row_sent.set()
+
+        await asyncio.wait_for(app_module.app(scope, receive, send), timeout=10)
+        done.set()
+
+        headers = dict(messages[0]["headers"])
+        chunks = [message["body"] for message in messages[1:] if message.get("body")]
+        assert waited == [True]
+        assert b"content-encoding" not in headers
+        assert len(chunks) == 2
+        assert [row["index"] for row in ndjson(b"".join(chunks).decode())] == [0, 1]
+
+
+class TestChartEtag:
+    def test_etag_depends_on_inputs_and_rules(self):
+        """
+        Given: 같은 입력 / 다른 입력 / 규칙 데이터가 다른 분석기
+        When: etag 계산
+        Then: 같은 입력만 같은 ETag이고, 규칙이 바뀌면 ETag도 바뀐다
+        """
+        service = ChartService(CountingCalculator(), CountingAnalyzer())
+        birth = datetime(1990, 5, 15, 14, 0)
+        changed_rules = CountingAnalyzer()
+        changed_rules.sipsung_rules = {"甲": {"甲": "비견"}}
+
+        etag = service.etag(birth)
+
+        assert etag.startswith('"') and etag.endswith('"')
+        assert service.etag(birth) == etag
+        assert service.etag(birth, is_lunar=True) != etag
+        assert service.etag(datetime(1990, 5, 15, 16, 0)) != etag
+        assert ChartService(CountingCalculator(), changed_rules).etag(birth) != etag
+
+    def test_rules_version_covers_all_rule_inputs(self):
+        """
+        Given: 오행 표만 다른 분석기 / 다른 모듈의 계산기
+        When: rules_version 계산
+        Then: 십성 규칙 외의 규칙 데이터나 계산 코드가 바뀌어도 버전이 바뀐다
+        """
+        from core.saju_calculator import SajuCalculator
+
+        base = ChartService(CountingCalculator(), CountingAnalyzer()).rules_version
+        changed_table = CountingAnalyzer()
+        changed_table.gan_ohang = {"甲": "火"}
+
+        assert ChartService(CountingCalculator(), CountingAnalyzer()).rules_version == base
+        assert ChartService(CountingCalculator(), changed_table).rules_version != base
+        assert ChartService(SajuCalculator(), CountingAnalyzer()).rules_version != base
+
+
+class TestSajuChartEndpoint:
+    def test_chart_has_cache_headers(self, client):
+        """
+        Given: 생년월일시 쿼리
+        When: GET /saju/chart
+        Then: 차트와 함께 강한 ETag, 긴 Cache-Control이 온다
+        """
+        response = client.get("/saju/chart", params={"birth_datetime": "1990-05-15T14:00:00"})
+
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        assert response.headers["cache-control"].startswith("public, max-age=")
+        body = response.json()
+        assert body["birth_datetime"] == "1990-05-15T14:00:00"
+        assert set(body["saju_info"]) == {"year_ganji", "month_ganji", "day_ganji", "time_ganji"}
+        assert "analyzed_info" in body and "rules_version" in body
+
+    def test_chart_is_not_compressed_so_strong_etag_stays_valid(self, client, monkeypatch):
+        """
+        Given: 압축 기준보다 큰 차트 응답과 압축을 받는 클라이언트
+        When: GET /saju/chart
+        Then: 압축하지 않아 어떤 Accept-Encoding이든 같은 본문과 같은 강한 ETag가 온다
+        """
+        import app as app_module
+
+        big = {"saju_info": PILLARS, "analyzed_info": {"note": "가" * 4000}}
+        monkeypatch.setattr(app_module.chart_service, "compute", lambda *args: big)
+        params = {"birth_datetime": "1990-05-15T14:00:00"}
+
+        compressed = client.get("/saju/chart", params=params, headers={"Accept-Encoding": "br, gzip"})
+        identity = client.get("/saju/chart", params=params, headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in compressed.headers
+        assert compressed.headers["etag"] == identity.headers["etag"]
+        assert compressed.content == identity.content
+
+    def test_if_none_match_returns_304_without_computing(self, client, monkeypatch):
+        """
+        Given: 이전 응답의 ETag
+        When: If-None-Match로 재요청
+        Then: 계산 없이 빈 본문 304를 반환하고, 다른 입력은 새로 계산한다
+        """
+        import app as app_module
+
+        params = {"birth_datetime": "1990-05-15T14:00:00", "is_lunar": "true"}
+        etag = client.get("/saju/chart", params=params).headers["etag"]
+
+        compute = app_module.chart_service.compute
+        calls = []
+
+        def counting_compute(*args):
+            calls.append(args)
+            return compute(*args)
+
+        monkeypatch.setattr(app_module.chart_service, "compute", counting_compute)
+        response = client.get("/saju/chart", params=params, headers={"If-None-Match": f'"other", W/{etag}'})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert calls == []
+        other = client.get("/saju/chart", params={"birth_datetime": "1990-05-15T14:00:00"}, headers={"If-None-Match": etag})
+        assert other.status_code == 200
+        assert len(calls) == 1
+
+    def test_invalid_datetime_returns_422(self, client):
+        """
+        Given: 날짜 형식이 아닌 birth_datetime
+        When: GET /saju/chart
+        Then: 422를 반환한다
+        """
+        assert client.get("/saju/chart", params={"birth_datetime": "생일"}).status_code == 422
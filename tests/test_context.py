@@ -0,0 +1,234 @@
+"""
+대화 컨텍스트 관리 (윈도잉 + 누적 요약) 테스트
+"""
+
+import json
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from chatbot.context import (
+    ConversationContextManager,
+    SUMMARY_PREFIX,
+    chart_system_message,
+    compact_tool_content,
+    split_turns,
+    tool_results_in_current_turn,
+)
+
+
+def make_conversation(num_turns: int) -> list:
+    """도구 호출이 포함된 num_turns 턴짜리 대화를 만듭니다."""
+    messages = []
+    for i in range(num_turns):
+        messages.append(HumanMessage(content=f"질문 {i}"))
+        messages.append(
+            AIMessage(
+                content="",
+                tool_calls=[{"name": "calculate_and_analyze_saju", "args": {}, "id": f"call-{i}"}],
+            )
+        )
+        messages.append(
+            ToolMessage(
+                content=json.dumps(
+                    {
+                        "saju_info": {
+                            "year_ganji": "甲子",
+                            "month_ganji": "乙丑",
+                            "day_ganji": "丙寅",
+                            "time_ganji": "丁卯",
+                        },
+                        "analyzed_info": {"day_gan": "丙", "ohang_counts": {"木": 3}},
+                    },
+                    ensure_ascii=False,
+                ),
+                tool_call_id=f"call-{i}",
+            )
+        )
+        messages.append(AIMessage(content=f"답변 {i}"))
+    return messages
+
+
+class CountingSummarizer:
+    """호출 횟수와 입력을 기록하는 가짜 요약기"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, previous_summary, messages):
+        self.calls.append((previous_summary, len(messages)))
+        return (previous_summary or "") + f"[{len(messages)}개 요약]"
+
+
+class TestSplitTurns:
+    """턴 분할 테스트"""
+
+    def test_split_keeps_tool_pairs_together(self):
+        """도구 호출과 결과가 같은 턴에 묶이는지 테스트"""
+        # Given
+        messages = [SystemMessage(content="시스템")] + make_conversation(2)
+
+        # When
+        head, turns = split_turns(messages)
+
+        # Then
+        assert len(head) == 1
+        assert len(turns) == 2
+        assert all(isinstance(turn[0], HumanMessage) for turn in turns)
+        assert len(turns[0]) == 4
+
+
+class TestConversationContextManager:
+    """ConversationContextManager 테스트"""
+
+    def test_short_conversation_is_unchanged(self):
+        """최대 턴 수 이하의 대화는 요약 없이 그대로 전달"""
+        # Given
+        summarizer = CountingSummarizer()
+        manager = ConversationContextManager(summarizer=summarizer, max_turns=4, token_budget=100000)
+        messages = make_conversation(3)
+
+        # When
+        context = manager.build_context(messages, session_id="s1")
+
+        # Then
+        assert context["summary"] is None
+        assert context["summarized_count"] == 0
+        assert len(context["messages"]) == len(messages)
+        assert summarizer.calls == []
+
+    def test_old_turns_are_replaced_by_summary(self):
+        """오래된 턴은 요약 메시지 하나로 대체"""
+        # Given
+        summarizer = CountingSummarizer()
+        manager = ConversationContextManager(summarizer=summarizer, max_turns=2, token_budget=100000)
+        messages = make_conversation(5)
+
+        # When
+        context = manager.build_context(messages, session_id="s1")
+
+        # Then
+        assert isinstance(context["messages"][0], SystemMessage)
+        assert context["messages"][0].content.startswith(SUMMARY_PREFIX)
+        assert context["summarized_count"] == 12  # 3턴 x 4메시지
+        assert len(context["messages"]) == 1 + 2 * 4
+        assert context["messages"][-1].content == "답변 4"
+
+    def test_old_tool_outputs_are_collapsed(self):
+        """현재 턴이 아닌 도구 결과는 차트 참조로 축약"""
+        # Given
+        manager = ConversationContextManager(max_turns=3, token_budget=100000)
+        messages = make_conversation(3)
+
+        # When
+        context = manager.build_context(messages, session_id="s1")
+        tool_messages = [m for m in context["messages"] if isinstance(m, ToolMessage)]
+
+        # Then
+        assert tool_messages[0].content.startswith("[사주 차트]")
+        assert tool_messages[0].tool_call_id == "call-0"
+        assert tool_messages[-1].content == messages[-2].content  # 현재 턴은 원문 유지
+
+    def test_rolling_summary_is_cached_and_extended(self):
+        """같은 세션에서는 새로 밀려난 메시지만 요약"""
+        # Given
+        summarizer = CountingSummarizer()
+        manager = ConversationContextManager(summarizer=summarizer, max_turns=2, token_budget=100000)
+        messages = make_conversation(4)
+
+        # When
+        manager.build_context(messages, session_id="s1")
+        manager.build_context(messages, session_id="s1")  # 변화 없음 -> 캐시 사용
+        messages = messages + [HumanMessage(content="질문 4"), AIMessage(content="답변 4")]
+        context = manager.build_context(messages, session_id="s1")
+
+        # Then
+        assert summarizer.calls == [(None, 8), ("[8개 요약]", 4)]
+        assert context["summary"] == "[8개 요약][4개 요약]"
+
+    def test_token_budget_moves_more_turns_into_summary(self):
+        """토큰 예산을 넘으면 최근 턴이라도 요약으로 이동 (현재 턴은 항상 유지)"""
+        # Given
+        manager = ConversationContextManager(max_turns=10, token_budget=200)
+        messages = []
+        for i in range(6):
+            messages.append(HumanMessage(content=f"질문 {i} " + "내용 " * 50))
+            messages.append(AIMessage(content=f"답변 {i} " + "응답 " * 50))
+
+        # When
+        context = manager.build_context(messages, session_id="s2")
+
+        # Then
+        assert context["summarized_count"] > 0
+        assert context["messages"][-1].content.startswith("답변 5")
+        assert context["messages"][-2].content.startswith("질문 5")
+
+    def test_summarizer_failure_falls_back_to_extractive(self):
+        """요약기 오류 시 LLM 없는 추출 요약 사용"""
+        # Given
+        def failing_summarizer(previous_summary, messages):
+            raise RuntimeError("LLM down")
+
+        manager = ConversationContextManager(summarizer=failing_summarizer, max_turns=1, token_budget=100000)
+
+        # When
+        context = manager.build_context(make_conversation(2), session_id="s3")
+
+        # Then
+        assert "사용자: 질문 0" in context["summary"]
+
+
+class TestCompactToolContent:
+    """도구 결과 축약 테스트"""
+
+    def test_non_chart_content_is_truncated(self):
+        """사주 차트가 아닌 긴 결과는 앞부분만 유지"""
+        # Given
+        content = "지식 " * 500
+
+        # When
+        compacted = compact_tool_content(content)
+
+        # Then
+        assert len(compacted) < len(content)
+        assert compacted.endswith("…(생략)")
+
+
+class TestChartContext:
+    """저장된 차트 주입 및 현재 턴 도구 결과 판별 테스트"""
+
+    def test_chart_system_message_contains_pillars(self):
+        """차트 시스템 메시지에 네 기둥과 일간 포함"""
+        # When
+        message = chart_system_message(
+            {"year_ganji": "庚午", "month_ganji": "辛巳", "day_ganji": "丁丑", "time_ganji": "戊申"},
+            {"day_gan": "丁"},
+        )
+
+        # Then
+        assert isinstance(message, SystemMessage)
+        assert "일주 丁丑" in message.content
+        assert "(일간 丁)" in message.content
+
+    def test_chart_system_message_includes_prefetched_knowledge(self):
+        """미리 구성한 차트 지식이 있으면 시스템 메시지에 포함"""
+        # When
+        message = chart_system_message(
+            {"year_ganji": "庚午", "month_ganji": "辛巳", "day_ganji": "丁丑", "time_ganji": "戊申"},
+            {"day_gan": "丁"},
+            "[신살] 도화살: 이성에게 인기가 많고",
+        )
+
+        # Then
+        assert "[이 사주와 관련된 지식]\n[신살] 도화살" in message.content
+        assert "검색 도구를 호출하지 마세요" in message.content
+
+    def test_tool_results_in_current_turn(self):
+        """마지막 사용자 메시지 이후의 도구 결과만 현재 턴으로 판단"""
+        # Given
+        messages = make_conversation(2)
+
+        # When / Then
+        assert tool_results_in_current_turn(messages) is True
+        assert tool_results_in_current_turn(messages + [HumanMessage(content="다음 질문")]) is False
+        assert tool_results_in_current_turn(
+            messages + [HumanMessage(content="다음 질문"), AIMessage(content="답변")]
+        ) is False
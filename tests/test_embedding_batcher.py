@@ -0,0 +1,105 @@
+"""
+질의 임베딩 배치 처리기 테스트
+"""
+
+import threading
+import time
+
+import pytest
+
+from database.embedding_batcher import EmbeddingBatcher
+
+
+class RecordingEmbeddings:
+    """호출된 배치를 기록하고, 배치마다 일정 시간이 걸리는 가짜 임베딩 모델"""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.batches = []
+        self.query_calls = 0
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("model failure")
+        return [[float(len(text)), float(sum(map(ord, text)))] for text in texts]
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return self.embed_documents([text])[0]
+
+
+def run_concurrently(batcher, texts):
+    results = [None] * len(texts)
+    barrier = threading.Barrier(len(texts))
+
+    def worker(index):
+        barrier.wait()
+        results[index] = batcher.embed_query(texts[index])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(texts))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestEmbeddingBatcher:
+    """EmbeddingBatcher 테스트"""
+
+    def test_concurrent_queries_share_one_batch(self):
+        """동시에 들어온 질의는 한 번의 배치 인코딩으로 처리하고 각자 자기 결과를 받음"""
+        # Given
+        model = RecordingEmbeddings()
+        batcher = EmbeddingBatcher(model, max_batch_size=32, max_wait_ms=50)
+        texts = [f"질문 {i}" for i in range(16)] + ["질문 0"]
+
+        # When
+        results = run_concurrently(batcher, texts)
+        batcher.close()
+
+        # Then
+        assert len(model.batches) <= 2
+        assert results == [RecordingEmbeddings().embed_documents([text])[0] for text in texts]
+        assert batcher.stats()["requests"] == len(texts)
+        assert batcher.stats()["largest_batch"] > 1
+
+    def test_batch_size_is_bounded(self):
+        """max_batch_size를 넘는 요청은 여러 배치로 나뉨"""
+        # Given
+        model = RecordingEmbeddings(delay=0.01)
+        batcher = EmbeddingBatcher(model, max_batch_size=4, max_wait_ms=50)
+
+        # When
+        run_concurrently(batcher, [f"질문 {i}" for i in range(10)])
+        batcher.close()
+
+        # Then
+        assert all(len(batch) <= 4 for batch in model.batches)
+        assert sum(len(batch) for batch in model.batches) == 10
+
+    def test_model_error_reaches_every_caller(self):
+        """모델 오류는 배치의 모든 호출자에게 전달"""
+        # Given
+        batcher = EmbeddingBatcher(RecordingEmbeddings(fail=True), max_wait_ms=20)
+
+        # When / Then
+        with pytest.raises(RuntimeError, match="model failure"):
+            batcher.embed_query("도화살")
+        batcher.close()
+
+    def test_zero_wait_bypasses_batching(self):
+        """max_wait_ms=0이면 바로 모델의 embed_query 호출"""
+        # Given
+        model = RecordingEmbeddings()
+        batcher = EmbeddingBatcher(model, max_wait_ms=0)
+
+        # When
+        batcher.embed_query("도화살")
+
+        # Then
+        assert model.query_calls == 1
+        assert batcher.stats()["batches"] == 0
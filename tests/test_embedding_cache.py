@@ -0,0 +1,155 @@
+"""
+임베딩 디스크 캐시 테스트
+"""
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from database.embedding_cache import CachedEmbeddings, fcntl, normalize_text
+
+
+class CountingEmbeddings:
+    """호출된 텍스트를 기록하는 가짜 임베딩 모델"""
+
+    def __init__(self, dim: int = 4):
+        self.dim = dim
+        self.calls = []
+
+    def _vector(self, text: str) -> list[float]:
+        return [float(len(text)), float(ord(text[0])) / 1000, 0.5, -1.0][: self.dim]
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        self.calls.append([text])
+        return self._vector(text)
+
+
+class LabelEmbeddings:
+    """'p{프로세스}-{번호}' 텍스트를 [프로세스, 번호, 0, 1] 벡터로 바꾸는 가짜 모델 (어느 벡터인지 확인용)"""
+
+    def embed_documents(self, texts):
+        return [[float(part) for part in text[1:].split("-")] + [0.0, 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def write_from_process(cache_dir, worker, count, batch, start):
+    """다른 워커 프로세스처럼 같은 cache_dir에 배치 단위로 임베딩을 저장"""
+    cache = CachedEmbeddings("test-model", factory=LabelEmbeddings, cache_dir=cache_dir)
+    start.wait()
+    for first in range(0, count, batch):
+        cache.embed_documents([f"p{worker}-{i}" for i in range(first, min(first + batch, count))])
+
+
+def make_cache(tmp_path, model=None, **kwargs):
+    model = model or CountingEmbeddings()
+    loads = []
+
+    def factory():
+        loads.append(1)
+        return model
+
+    cache = CachedEmbeddings("test-model", factory=factory, cache_dir=str(tmp_path), **kwargs)
+    return cache, model, loads
+
+
+class TestCachedEmbeddings:
+    """CachedEmbeddings 테스트"""
+
+    def test_only_missing_texts_are_embedded(self, tmp_path):
+        """캐시된 텍스트는 모델을 호출하지 않고, 정규화된 같은 텍스트도 적중"""
+        # Given
+        cache, model, _ = make_cache(tmp_path)
+        cache.embed_documents(["도화살", "역마살"])
+
+        # When
+        vectors = cache.embed_documents(["도화살", " 역마살 ", "화개살"])
+        query_vector = cache.embed_query("도화살")
+
+        # Then
+        assert model.calls == [["도화살", "역마살"], ["화개살"]]
+        assert np.allclose(query_vector, vectors[0])
+        assert cache.stats()["hits"] == 3
+
+    def test_cache_persists_across_instances_without_loading_model(self, tmp_path):
+        """재시작 후에도 디스크의 벡터를 사용하며 모델을 로드하지 않음"""
+        # Given
+        first, _, _ = make_cache(tmp_path)
+        expected = first.embed_documents(["갑목", "을목"])
+
+        # When
+        second, model, loads = make_cache(tmp_path)
+        vectors = second.embed_documents(["갑목", "을목"])
+
+        # Then
+        assert loads == []
+        assert model.calls == []
+        assert np.allclose(vectors, expected, rtol=1e-3)  # float16 저장 오차
+        assert second.stats()["model_loaded"] is False
+
+    def test_matrix_grows_and_uses_configured_dtype(self, tmp_path):
+        """초기 용량을 넘으면 행렬을 키우고, 기존 행은 유지"""
+        # Given
+        cache, _, _ = make_cache(tmp_path, dtype="float16")
+        texts = [f"문서 {i}" for i in range(1500)]
+
+        # When
+        cache.embed_documents(texts)
+        reloaded, model, _ = make_cache(tmp_path)
+        vector = reloaded.embed_query("문서 7")
+
+        # Then
+        assert reloaded._vectors.dtype == np.float16
+        assert len(reloaded._vectors) >= 1500
+        assert model.calls == []
+        assert vector[0] == len("문서 7")
+
+    def test_max_rows_limits_growth(self, tmp_path):
+        """최대 행 수를 넘는 텍스트는 계산만 하고 저장하지 않음"""
+        # Given
+        cache, model, _ = make_cache(tmp_path, max_rows=1)
+
+        # When
+        cache.embed_documents(["첫째", "둘째"])
+        cache.embed_documents(["둘째"])
+
+        # Then
+        assert cache.stats()["entries"] == 1
+        assert model.calls[-1] == ["둘째"]
+
+    @pytest.mark.skipif(fcntl is None, reason="프로세스 간 잠금은 fcntl이 있는 환경에서만 지원")
+    def test_processes_sharing_cache_dir_keep_keys_and_rows_consistent(self, tmp_path):
+        """두 프로세스가 같은 cache_dir에 번갈아 쓰고 행렬을 키워도 모든 키가 자기 벡터를 가리킴"""
+        # Given - 합쳐서 INITIAL_CAPACITY(1024)를 넘겨 쓰는 도중 행렬 파일이 교체되도록 함
+        context = multiprocessing.get_context("fork")
+        start = context.Event()
+        count = 700
+        workers = [
+            context.Process(target=write_from_process, args=(str(tmp_path), worker, count, 25, start))
+            for worker in (1, 2)
+        ]
+
+        # When
+        for process in workers:
+            process.start()
+        start.set()
+        for process in workers:
+            process.join(timeout=60)
+
+        # Then
+        assert [process.exitcode for process in workers] == [0, 0]
+        reloaded, model, _ = make_cache(tmp_path)
+        texts = [f"p{worker}-{i}" for worker in (1, 2) for i in range(count)]
+        vectors = reloaded.embed_documents(texts)
+        assert model.calls == []
+        assert reloaded.stats()["entries"] == 2 * count
+        assert np.allclose(vectors, LabelEmbeddings().embed_documents(texts))
+
+    def test_normalize_text(self):
+        assert normalize_text("  도화살이\n  뭔가요? ") == "도화살이 뭔가요?"
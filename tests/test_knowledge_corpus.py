@@ -0,0 +1,145 @@
+"""
+사주 지식 코퍼스 증분 적재 계획 테스트
+"""
+
+from langchain_core.documents import Document
+
+from database.knowledge_corpus import (
+    chart_filters,
+    document_id,
+    load_knowledge_documents,
+    load_manifest,
+    plan_ingestion,
+    save_manifest,
+)
+
+MODEL = "jhgan/ko-sroberta-multitask"
+
+
+def ingest(plan, stored_ids: set) -> set:
+    """계획을 가상의 저장소 ID 집합에 반영합니다."""
+    return (stored_ids - set(plan.to_delete)) | {doc_id for doc_id, _ in plan.to_add}
+
+
+class TestKnowledgeCorpus:
+    """load_knowledge_documents / document_id 테스트"""
+
+    def test_loads_terms_and_rules(self):
+        """용어와 규칙 JSON이 모두 문서로 변환"""
+        # When
+        documents = load_knowledge_documents()
+
+        # Then
+        assert any(doc.metadata.get("category") == "천간" for doc in documents)
+        assert any(doc.metadata.get("type") == "십성설명" for doc in documents)
+
+    def test_document_id_is_content_hash(self):
+        """같은 내용은 같은 ID, 내용이나 메타데이터가 바뀌면 다른 ID"""
+        # Given
+        doc = Document(page_content="신살 도화살은 매력", metadata={"type": "신살설명", "name": "도화살"})
+
+        # When / Then
+        assert document_id(doc) == document_id(Document(page_content=doc.page_content, metadata=dict(doc.metadata)))
+        assert document_id(doc) != document_id(Document(page_content="신살 도화살은 인기", metadata=doc.metadata))
+        assert document_id(doc) != document_id(Document(page_content=doc.page_content, metadata={}))
+
+
+class TestPlanIngestion:
+    """plan_ingestion 테스트"""
+
+    def test_restart_with_unchanged_corpus_embeds_nothing(self):
+        """첫 적재 후 같은 코퍼스로 재시작하면 추가/삭제 없음"""
+        # Given
+        documents = load_knowledge_documents()
+        first = plan_ingestion(documents, [], {}, MODEL)
+        stored = ingest(first, set())
+
+        # When
+        second = plan_ingestion(documents, stored, first.manifest, MODEL)
+
+        # Then
+        assert len(first.to_add) == len(stored) > 0
+        assert second.is_noop
+        assert second.manifest["version"] == first.manifest["version"]
+
+    def test_changed_document_is_replaced(self):
+        """바뀐 문서만 추가하고 이전 버전은 삭제"""
+        # Given
+        documents = [Document(page_content=f"문서 {i}", metadata={"i": i}) for i in range(3)]
+        first = plan_ingestion(documents, [], {}, MODEL)
+        stored = ingest(first, set())
+        documents[1] = Document(page_content="문서 1 (수정)", metadata={"i": 1})
+
+        # When
+        plan = plan_ingestion(documents, stored, first.manifest, MODEL)
+
+        # Then
+        assert [doc.page_content for _, doc in plan.to_add] == ["문서 1 (수정)"]
+        assert len(plan.to_delete) == 1
+        assert plan.manifest["version"] != first.manifest["version"]
+
+    def test_legacy_random_ids_are_removed(self):
+        """해시 ID 도입 전 중복 적재된 벡터는 정리"""
+        # Given
+        documents = [Document(page_content="문서", metadata={})]
+        manifest = {"embedding_model": MODEL}
+
+        # When
+        plan = plan_ingestion(documents, ["uuid-1", "uuid-2"], manifest, MODEL)
+
+        # Then
+        assert plan.to_delete == ["uuid-1", "uuid-2"]
+        assert len(plan.to_add) == 1
+
+    def test_embedding_model_change_reembeds_everything(self):
+        """임베딩 모델이 바뀌면 전체를 다시 임베딩"""
+        # Given
+        documents = [Document(page_content="문서", metadata={})]
+        first = plan_ingestion(documents, [], {}, MODEL)
+        stored = ingest(first, set())
+
+        # When
+        plan = plan_ingestion(documents, stored, first.manifest, "other-model")
+
+        # Then
+        assert plan.to_delete == sorted(stored)
+        assert len(plan.to_add) == 1
+
+
+class TestManifest:
+    def test_save_and_load_round_trip(self, tmp_path):
+        """매니페스트 저장/로드, 없는 파일은 빈 매니페스트"""
+        # Given
+        path = str(tmp_path / "chroma" / "knowledge_manifest.json")
+
+        # When
+        missing = load_manifest(path)
+        save_manifest(path, {"version": "abc", "document_ids": ["1"]})
+
+        # Then
+        assert missing == {}
+        assert load_manifest(path)["version"] == "abc"
+
+
+class TestChartFilters:
+    """분석된 사주 → 메타데이터 필터 테스트"""
+
+    def test_filters_cover_day_stem_sinsal_and_dominant_elements(self):
+        """일간, 신살, 가장 강한 오행(동률 포함) 문서만 선택"""
+        # Given
+        analyzed = {
+            "day_gan": "丁",
+            "sinsal_results": ["도화살"],
+            "ohang_counts": {"金": 3, "火": 3, "土": 2},
+        }
+
+        # When
+        filters = chart_filters(analyzed)
+        selected = [
+            doc for doc in load_knowledge_documents()
+            if doc.metadata.get("type") in filters["type"] and doc.metadata.get("name") in filters["name"]
+        ]
+
+        # Then
+        assert filters == {"type": ["일간설명", "신살설명", "오행설명"], "name": ["丁", "도화살", "火", "金"]}
+        assert sorted(doc.metadata["name"] for doc in selected) == sorted(filters["name"])
\ No newline at end of file
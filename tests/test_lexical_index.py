@@ -0,0 +1,91 @@
+"""
+어휘(BM25) 색인, RRF 테스트
+"""
+
+from langchain_core.documents import Document
+
+from database.knowledge_corpus import document_id, load_knowledge_documents
+from database.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+
+
+def make_index() -> LexicalIndex:
+    documents = load_knowledge_documents()
+    index = LexicalIndex()
+    index.add([document_id(doc) for doc in documents], documents)
+    return index
+
+
+class TestTokenize:
+    def test_hangul_bigrams_and_hanja_unigrams(self):
+        """한글은 bigram, 한자는 unigram + bigram"""
+        assert tokenize("도화살이") == ["도화", "화살", "살이"]
+        assert tokenize("甲木") == ["甲", "木", "甲木"]
+        assert tokenize("Saju 2024") == ["saju", "2024"]
+
+
+class TestLexicalIndex:
+    """LexicalIndex 테스트"""
+
+    def test_exact_term_returns_entry_documents(self):
+        """알려진 용어 질의는 그 항목 문서를 반환 (규칙 설명 문서 우선)"""
+        # Given
+        index = make_index()
+
+        # When
+        doc_ids = index.exact_term_ids("도화살이 뭔가요?")
+
+        # Then
+        contents = [index._documents[doc_id].page_content for doc_id in doc_ids]
+        assert contents[0].startswith("신살 도화살은")
+        assert all("도화살" in content for content in contents)
+
+    def test_bm25_ranks_matching_documents(self):
+        """용어 사전에 없는 질의도 BM25로 관련 문서를 찾음"""
+        # Given
+        index = make_index()
+
+        # When
+        results = index.search("재물 욕심", k=3)
+
+        # Then
+        top_content = index._documents[results[0][0]].page_content
+        assert "재물" in top_content
+        assert results[0][1] >= results[-1][1]
+
+    def test_delete_removes_postings_and_terms(self):
+        """삭제한 문서는 검색/용어 조회에서 제외"""
+        # Given
+        index = LexicalIndex(term_dictionary={"도화살": {"도화살"}})
+        index.add(["d1"], [Document(page_content="신살 도화살은 매력", metadata={"name": "도화살"})])
+
+        # When
+        index.delete(["d1"])
+
+        # Then
+        assert index.search("도화살", k=3) == []
+        assert index.exact_term_ids("도화살") == []
+        assert len(index) == 0
+
+
+class TestReciprocalRankFusion:
+    def test_documents_ranked_high_in_both_lists_win(self):
+        """두 목록 모두에서 상위인 문서가 먼저"""
+        assert reciprocal_rank_fusion([["a", "b", "c"], ["b", "d", "a"]])[:2] == ["b", "a"]
+
+
+class TestLexicalFilters:
+    def test_filters_apply_to_search_exact_terms_and_listing(self):
+        """BM25 검색, 용어 조회, 필터 목록 모두 메타데이터 필터 적용"""
+        # Given
+        index = make_index()
+        filters = {"type": ("신살설명",), "name": ("도화살", "역마살")}
+
+        # When
+        searched = [index._documents[doc_id].metadata for doc_id, _ in index.search("이동 매력", 10, filters)]
+        exact = index.exact_term_ids("도화살", {"type": ("오행설명",)})
+        listed = [index._documents[doc_id].metadata["name"] for doc_id in index.filter_ids(filters)]
+
+        # Then
+        assert searched and all(meta["type"] == "신살설명" for meta in searched)
+        assert exact == []
+        assert sorted(listed) == ["도화살", "역마살"]
@@ -0,0 +1,255 @@
+"""
+공유 LLM 클라이언트(연결 풀, 지터 재시도, 헤지 요청) 테스트 - 로컬 가짜 OpenAI 호환 서버 사용
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import openai
+import pytest
+
+from chatbot.llm_factory import RetryPolicy, create_chat_model, create_http_clients
+
+
+class FakeOpenAIServer:
+    """
+    /v1/chat/completions를 흉내 내는 서버.
+    script의 동작을 요청 순서대로 하나씩 적용합니다. ("ok", "slow", 상태 코드 정수) 다 쓰면 "ok".
+    """
+
+    def __init__(self, script=(), slow_seconds=1.0):
+        self.script = list(script)
+        self.slow_seconds = slow_seconds
+        self.requests = 0
+        self.connections = set()
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with server.lock:
+                    server.requests += 1
+                    number = server.requests
+                    server.connections.add(self.client_address)
+                    action = server.script.pop(0) if server.script else "ok"
+                if action == "slow":
+                    time.sleep(server.slow_seconds)
+                if isinstance(action, int):
+                    self.reply(action, {"error": {"message": "일시적 오류", "type": "server_error"}}, {"Retry-After": "0"})
+                    return
+                content = f"응답 {number}: {body['messages'][-1]['content']}"
+                self.reply(
+                    200,
+                    {
+                        "id": f"chatcmpl-{number}",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": body["model"],
+                        "choices": [
+                            {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+                        ],
+                        "usage": {"prompt_tokens": 3, "completion_tokens": 5, "total_tokens": 8},
+                    },
+                )
+
+            def reply(self, status, payload, headers=None):
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def chat_model(server, policy, **overrides):
+    return create_chat_model(create_http_clients(policy), base_url=server.base_url, api_key="test-key", **overrides)
+
+
+IDEMPOTENT = {"default_headers": {"Idempotency-Key": "test-request"}}  # 헤지를 허용하는 표시
+
+
+class TestLLMClient:
+    def test_connections_are_reused(self):
+        """
+        Given: 공유 HTTP 클라이언트로 만든 모델
+        When: 세 번 연속 호출
+        Then: 모든 호출이 keep-alive 연결 하나를 재사용한다
+        """
+        with FakeOpenAIServer() as server:
+            llm = chat_model(server, RetryPolicy(max_retries=0, hedge=False))
+
+            answers = [llm.invoke(f"질문 {i}").content for i in range(3)]
+
+        assert answers == ["응답 1: 질문 0", "응답 2: 질문 1", "응답 3: 질문 2"]
+        assert len(server.connections) == 1
+
+    def test_transient_errors_are_retried(self):
+        """
+        Given: 처음 두 요청이 503/429로 실패하는 서버
+        When: 재시도 2번 정책으로 호출
+        Then: 세 번째 요청의 응답을 받는다
+        """
+        policy = RetryPolicy(max_retries=2, base_delay=0.01, hedge=False)
+        with FakeOpenAIServer(script=[503, 429]) as server:
+            answer = chat_model(server, policy).invoke("재시도").content
+
+        assert answer == "응답 3: 재시도"
+        assert server.requests == 3
+        assert policy.retries == 2
+
+    def test_retries_are_bounded_and_client_errors_not_retried(self):
+        """
+        Given: 계속 500을 반환하는 서버 / 400을 반환하는 서버
+        When: 재시도 1번 정책으로 호출
+        Then: 500은 2번 시도 후 오류, 400은 재시도 없이 바로 오류
+        """
+        policy = RetryPolicy(max_retries=1, base_delay=0.01, hedge=False)
+        with FakeOpenAIServer(script=[500, 500]) as server:
+            with pytest.raises(openai.InternalServerError):
+                chat_model(server, policy).invoke("실패")
+        assert server.requests == 2
+
+        with FakeOpenAIServer(script=[400]) as server:
+            with pytest.raises(openai.BadRequestError):
+                chat_model(server, policy).invoke("잘못된 요청")
+        assert server.requests == 1
+
+    def test_backoff_uses_jitter_and_retry_after(self):
+        """
+        Given: 재시도 정책
+        When: 대기 시간 계산
+        Then: 지수 상한 안의 임의 값이며, Retry-After가 있으면 그 값을 max_delay 안에서 따른다
+        """
+        import httpx
+
+        policy = RetryPolicy(base_delay=0.5, max_delay=3.0)
+
+        delays = {policy.backoff(3) for _ in range(50)}
+
+        assert all(0 <= delay <= 3.0 for delay in delays)
+        assert len(delays) > 1
+        assert policy.backoff(0, httpx.Response(429, headers={"Retry-After": "2"})) == 2.0
+        assert policy.backoff(0, httpx.Response(429, headers={"Retry-After": "60"})) == 3.0
+
+    def test_slow_request_is_hedged(self):
+        """
+        Given: p95가 짧게 관측된 상태에서 첫 요청만 느린 서버
+        When: 헤지가 켜진 정책으로 호출
+        Then: p95 이후 보낸 두 번째 요청의 응답을 먼저 받는다
+        """
+        policy = RetryPolicy(max_retries=0, hedge=True, hedge_min_samples=5, hedge_min_delay=0.05)
+        for _ in range(5):
+            policy.latency.observe(0.01)
+
+        with FakeOpenAIServer(script=["slow"], slow_seconds=1.0) as server:
+            start = time.perf_counter()
+            answer = chat_model(server, policy, **IDEMPOTENT).invoke("헤지").content
+            elapsed = time.perf_counter() - start
+
+        assert answer == "응답 2: 헤지"
+        assert elapsed < 0.8
+        assert policy.hedged == 1 and policy.hedge_wins == 1
+
+    def test_non_idempotent_post_is_not_hedged(self):
+        """
+        Given: 헤지 조건을 만족하지만 Idempotency-Key가 없는 POST
+        When: 느린 서버에 호출
+        Then: 같은 요청을 중복으로 보내지 않고 첫 응답을 기다린다
+        """
+        policy = RetryPolicy(max_retries=0, hedge=True, hedge_min_samples=5, hedge_min_delay=0.05)
+        for _ in range(5):
+            policy.latency.observe(0.01)
+
+        with FakeOpenAIServer(script=["slow"], slow_seconds=0.3) as server:
+            answer = chat_model(server, policy).invoke("헤지 안 함").content
+
+        assert answer == "응답 1: 헤지 안 함"
+        assert server.requests == 1
+        assert policy.hedged == 0
+
+    def test_read_timeout_is_not_retried(self):
+        """
+        Given: 응답이 타임아웃보다 늦는 서버 (요청은 이미 서버에 도착)
+        When: 재시도 2번 정책으로 호출
+        Then: POST를 다시 보내지 않고 바로 타임아웃 오류
+        """
+        policy = RetryPolicy(max_retries=2, base_delay=0.01, hedge=False)
+        with FakeOpenAIServer(script=["slow"], slow_seconds=0.5) as server:
+            with pytest.raises(openai.APITimeoutError):
+                chat_model(server, policy, timeout=0.1).invoke("느린 요청")
+            time.sleep(0.5)  # 느린 응답이 끝날 때까지 대기
+
+        assert server.requests == 1
+        assert policy.retries == 0
+
+    def test_connect_errors_are_retried(self):
+        """
+        Given: 아무도 듣지 않는 포트 (요청이 서버에 닿지 않음)
+        When: 재시도 2번 정책으로 동기/비동기 호출
+        Then: 연결 오류는 안전하므로 매번 2번 재시도 후 오류
+        """
+        with FakeOpenAIServer() as server:
+            base_url = server.base_url
+        policy = RetryPolicy(max_retries=2, base_delay=0.01, hedge=False)
+        llm = create_chat_model(create_http_clients(policy), base_url=base_url, api_key="test-key")
+
+        with pytest.raises(openai.APIConnectionError):
+            llm.invoke("연결 실패")
+        with pytest.raises(openai.APIConnectionError):
+            asyncio.run(llm.ainvoke("연결 실패"))
+
+        assert policy.retries == 4
+
+    def test_hedging_waits_for_enough_samples(self):
+        """
+        Given: 응답 시간 샘플이 부족한 정책
+        When: 헤지 지연 계산
+        Then: 헤지하지 않는다 (None)
+        """
+        policy = RetryPolicy(hedge=True, hedge_min_samples=20)
+        policy.latency.observe(0.2)
+
+        assert policy.hedge_delay() is None
+        assert RetryPolicy(hedge=False).hedge_delay() is None
+
+    def test_async_client_retries_and_hedges(self):
+        """
+        Given: 첫 요청이 503, 이후 요청이 느린 서버
+        When: ainvoke 호출 (비동기 transport)
+        Then: 재시도 후 헤지 요청의 응답을 받는다
+        """
+        policy = RetryPolicy(max_retries=1, base_delay=0.01, hedge=True, hedge_min_samples=5, hedge_min_delay=0.05)
+        for _ in range(5):
+            policy.latency.observe(0.01)
+
+        with FakeOpenAIServer(script=[503, "slow"], slow_seconds=1.0) as server:
+            start = time.perf_counter()
+            answer = asyncio.run(chat_model(server, policy, **IDEMPOTENT).ainvoke("비동기")).content
+            elapsed = time.perf_counter() - start
+
+        assert answer == "응답 3: 비동기"
+        assert elapsed < 0.8
+        assert policy.retries == 1 and policy.hedge_wins == 1
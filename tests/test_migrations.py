@@ -0,0 +1,296 @@
+"""
+스키마 마이그레이션 및 대화 기록 파티션 관리 테스트
+"""
+
+import hashlib
+import uuid
+from datetime import date
+
+import pytest
+
+from database.migrations import (
+    LATEST_VERSION,
+    MigrationLockTimeout,
+    _v2_compact_keys_and_partitions,
+    _v3_stored_chart,
+    apply_migrations,
+    plan_expired_partitions,
+    plan_future_partitions,
+)
+from database.schema import session_key, session_record
+
+
+class FakeCursor:
+    """실행한 SQL을 기록하고 정해진 조회 결과를 돌려주는 커서"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._result = []
+
+    def execute(self, query, params=None):
+        self.connection.executed.append((" ".join(query.split()), params))
+        if "GET_LOCK" in query:
+            self._result = [(1 if self.connection.lock_available else 0,)]
+        elif "RELEASE_LOCK" in query:
+            self._result = [(1,)]
+        elif "FROM schema_migrations" in query:
+            self._result = [(version,) for version in self.connection.applied]
+        elif "information_schema.COLUMNS" in query:
+            self._result = [(table, column) for table in self.connection.tables for column in ("session_id",)]
+        elif "information_schema.PARTITIONS" in query:
+            self._result = list(self.connection.partitions)
+        else:
+            self._result = []
+        if query.startswith("INSERT INTO schema_migrations"):
+            self.connection.applied.append(params[0])
+        if self.connection.fail_on and self.connection.fail_on in query:
+            raise RuntimeError("migration failed")
+
+    def fetchall(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, applied=None, partitions=None, tables=("user_sessions", "conversation_history"),
+                 lock_available=True, fail_on=None):
+        self.applied = list(applied or [])
+        self.partitions = partitions or []
+        self.tables = list(tables)
+        self.lock_available = lock_available
+        self.fail_on = fail_on
+        self.executed = []
+        self.commits = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+
+class TestSessionKey:
+    """session_id → BINARY(16) 키 변환 테스트"""
+
+    def test_uuid_session_id_uses_uuid_bytes(self):
+        """UUID 형식은 UUID 바이트 그대로 사용"""
+        # Given
+        session_id = str(uuid.uuid4())
+
+        # When / Then
+        assert session_key(session_id) == uuid.UUID(session_id).bytes
+        assert session_key(session_id.upper()) == uuid.UUID(session_id).bytes
+
+    def test_other_session_id_uses_sha256_prefix(self):
+        """그 외 문자열은 SHA-256 앞 16바이트 (SQL의 UNHEX(LEFT(SHA2(..., 256), 32))와 동일)"""
+        # Given
+        session_id = "test_session_123"
+
+        # When
+        key = session_key(session_id)
+
+        # Then
+        assert len(key) == 16
+        assert key.hex() == hashlib.sha256(session_id.encode()).hexdigest()[:32]
+
+    def test_session_record_restores_string_id(self):
+        """조회 결과의 session_id는 원래 문자열로 복원"""
+        # Given
+        record = {"session_id": session_key("s-1"), "user_id": "u-1"}
+
+        # When / Then
+        assert session_record(record, "s-1")["session_id"] == "s-1"
+        assert session_record(None, "s-1") is None
+
+
+class TestPartitionPlanning:
+    """월별 파티션 생성/삭제 계획 테스트"""
+
+    EXISTING = [
+        ("p_archive", "'2026-01-01'"),
+        ("p202601", "'2026-02-01'"),
+        ("p202602", "'2026-03-01'"),
+        ("pmax", "MAXVALUE"),
+    ]
+
+    def test_future_partitions_split_pmax(self):
+        """현재 달 + months_ahead개월까지 pmax를 쪼개서 파티션 생성"""
+        # When
+        statement = plan_future_partitions(self.EXISTING, date(2026, 3, 15), months_ahead=1)
+
+        # Then
+        assert statement.startswith("ALTER TABLE conversation_history REORGANIZE PARTITION pmax INTO")
+        assert "PARTITION p202603 VALUES LESS THAN ('2026-04-01')" in statement
+        assert "PARTITION p202604 VALUES LESS THAN ('2026-05-01')" in statement
+        assert statement.endswith("PARTITION pmax VALUES LESS THAN (MAXVALUE))")
+
+    def test_future_partitions_noop_when_covered(self):
+        """이미 충분한 파티션이 있으면 변경 없음"""
+        # When / Then
+        assert plan_future_partitions(self.EXISTING, date(2026, 1, 10), months_ahead=1) is None
+        assert plan_future_partitions([], date(2026, 1, 10)) is None  # 파티션 없는 테이블
+
+    def test_expired_partitions_are_dropped_but_never_pmax(self):
+        """보존 기간이 지난 파티션만 DROP"""
+        # When
+        statement = plan_expired_partitions(self.EXISTING, date(2027, 3, 5), retention_months=12)
+
+        # Then
+        assert statement == "ALTER TABLE conversation_history DROP PARTITION p_archive, p202601, p202602"
+        assert plan_expired_partitions(self.EXISTING, date(2026, 6, 1), retention_months=12) is None
+
+    def test_year_boundary(self):
+        """12월 다음은 다음 해 1월"""
+        # Given
+        existing = [("p202612", "'2027-01-01'"), ("pmax", "MAXVALUE")]
+
+        # When
+        statement = plan_future_partitions(existing, date(2026, 12, 20), months_ahead=1)
+
+        # Then
+        assert "PARTITION p202701 VALUES LESS THAN ('2027-02-01')" in statement
+
+
+class TestApplyMigrations:
+    """마이그레이션 실행기 테스트"""
+
+    def test_fresh_database_applies_all_versions(self):
+        """새 DB에는 모든 버전을 순서대로 적용하고 버전을 기록"""
+        # Given
+        connection = FakeConnection()
+
+        # When
+        applied = apply_migrations(connection, today=date(2026, 3, 1))
+
+        # Then
+        statements = [query for query, _ in connection.executed]
+        assert applied == list(range(1, LATEST_VERSION + 1))
+        assert any("user_id VARCHAR(255) NOT NULL" in query for query in statements)
+        assert any("PARTITION BY RANGE COLUMNS(timestamp)" in query for query in statements)
+        assert any(query.startswith("RENAME TABLE") for query in statements)
+        assert connection.applied == applied
+
+    def test_applied_versions_are_skipped(self):
+        """이미 적용된 버전은 다시 실행하지 않음"""
+        # Given
+        connection = FakeConnection(applied=list(range(1, LATEST_VERSION + 1)))
+
+        # When
+        applied = apply_migrations(connection, today=date(2026, 3, 1))
+
+        # Then
+        assert applied == []
+        assert not any("CREATE TABLE IF NOT EXISTS user_sessions" in query for query, _ in connection.executed)
+
+    def test_runs_under_named_lock_and_reads_versions_after_locking(self):
+        """GET_LOCK을 얻은 뒤에 적용 버전을 읽고, 끝나면 RELEASE_LOCK"""
+        # Given
+        connection = FakeConnection(applied=list(range(1, LATEST_VERSION + 1)))
+
+        # When
+        apply_migrations(connection, today=date(2026, 3, 1))
+
+        # Then
+        statements = [query for query, _ in connection.executed]
+        assert statements[0] == "SELECT GET_LOCK(%s, %s)"
+        assert statements.index("SELECT version FROM schema_migrations") > 0
+        assert statements[-1] == "SELECT RELEASE_LOCK(%s)"
+
+    def test_lock_timeout_applies_nothing(self):
+        """다른 워커가 락을 잡고 있으면 아무것도 실행하지 않고 MigrationLockTimeout"""
+        # Given
+        connection = FakeConnection(lock_available=False)
+
+        # When / Then
+        with pytest.raises(MigrationLockTimeout):
+            apply_migrations(connection, today=date(2026, 3, 1), lock_timeout=1)
+        assert [query for query, _ in connection.executed] == ["SELECT GET_LOCK(%s, %s)"]
+
+    def test_lock_released_when_migration_fails(self):
+        """마이그레이션이 실패해도 락은 반납"""
+        # Given
+        connection = FakeConnection(applied=[1], fail_on="RENAME TABLE")
+
+        # When
+        with pytest.raises(RuntimeError):
+            apply_migrations(connection, today=date(2026, 3, 1))
+
+        # Then
+        assert connection.executed[-1][0] == "SELECT RELEASE_LOCK(%s)"
+        assert connection.applied == [1]
+
+
+class TestMigrationRetry:
+    """중간에 실패한 v2/v3를 다시 실행해도 안전한지 테스트 (MySQL DDL은 롤백되지 않음)"""
+
+    TODAY = date(2026, 3, 1)
+
+    @staticmethod
+    def normalized(statements):
+        return [" ".join(statement.split()) for statement in statements]
+
+    def test_v2_drops_leftover_copy_before_copying(self):
+        """복사 도중 실패해 남은 *_new는 지우고 다시 만들어 행이 중복되지 않음"""
+        # Given - conversation_history_new에 일부 행이 복사된 상태
+        schema = {"user_sessions": {"session_id"}, "conversation_history": {"session_id"},
+                  "conversation_history_new": {"session_id"}}
+
+        # When
+        statements = self.normalized(_v2_compact_keys_and_partitions(self.TODAY, schema))
+
+        # Then
+        drop = statements.index("DROP TABLE IF EXISTS conversation_history_new;")
+        copy = next(i for i, query in enumerate(statements) if query.startswith("INSERT INTO conversation_history_new"))
+        assert drop < copy
+        assert statements[-1] == (
+            "RENAME TABLE conversation_history TO conversation_history_legacy, "
+            "conversation_history_new TO conversation_history, "
+            "user_sessions TO user_sessions_legacy, user_sessions_new TO user_sessions;"
+        )
+
+    def test_v2_skips_tables_already_swapped(self):
+        """이미 교체된 테이블은 건너뛰고 남은 테이블만 복사/이름 변경"""
+        # Given - user_sessions만 교체가 끝난 상태
+        schema = {"user_sessions": {"session_id"}, "user_sessions_legacy": {"session_id"},
+                  "conversation_history": {"session_id"}}
+
+        # When
+        statements = self.normalized(_v2_compact_keys_and_partitions(self.TODAY, schema))
+
+        # Then
+        assert not any("user_sessions_new" in query for query in statements)
+        assert statements[-1] == (
+            "RENAME TABLE conversation_history TO conversation_history_legacy, "
+            "conversation_history_new TO conversation_history;"
+        )
+
+    def test_v2_copies_from_legacy_when_original_already_renamed(self):
+        """원래 테이블이 *_legacy로 옮겨진 뒤 실패했다면 *_legacy에서 복사하고 *_new만 이름 변경"""
+        # Given
+        schema = {"user_sessions": {"session_id"}, "user_sessions_legacy": {"session_id"},
+                  "conversation_history_legacy": {"session_id"}, "conversation_history_new": {"session_id"}}
+
+        # When
+        statements = self.normalized(_v2_compact_keys_and_partitions(self.TODAY, schema))
+
+        # Then
+        assert any(query.endswith("FROM conversation_history_legacy WHERE session_id IS NOT NULL AND role IS NOT NULL ORDER BY id;")
+                   for query in statements)
+        assert statements[-1] == "RENAME TABLE conversation_history_new TO conversation_history;"
+
+    def test_v2_noop_when_fully_swapped(self):
+        """두 테이블 모두 교체되었으면 실행할 SQL 없음 (버전만 기록)"""
+        # Given
+        schema = {table: {"session_id"} for table in (
+            "user_sessions", "user_sessions_legacy", "conversation_history", "conversation_history_legacy")}
+
+        # When / Then
+        assert _v2_compact_keys_and_partitions(self.TODAY, schema) == []
+
+    def test_v3_skips_existing_column(self):
+        """saju_chart 컬럼이 이미 있으면 ALTER 하지 않음"""
+        # When / Then
+        assert _v3_stored_chart(self.TODAY, {"user_sessions": {"session_id", "saju_chart"}}) == []
+        assert len(_v3_stored_chart(self.TODAY, {"user_sessions": {"session_id"}})) == 1
@@ -0,0 +1,210 @@
+"""
+동기 MySQLManager 연결 풀 테스트 (가짜 풀 사용, MySQL 서버 불필요)
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from metrics import metrics
+
+MANAGER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database", "mysql_manager.py")
+
+
+class FakeCursor:
+    def execute(self, query, params=None):
+        pass
+
+    def fetchone(self):
+        return ("saju_chatbot_db",)
+
+    def close(self):
+        pass
+
+
+class FakePooledConnection:
+    """ping(reconnect=True)로 끊긴 연결을 다시 잇는 가짜 풀 연결"""
+
+    def __init__(self, pool, error_class):
+        self.pool = pool
+        self.error_class = error_class
+        self.connected = True
+        self.reconnects = 0
+        self.reconnect_fails = False
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        if self.connected:
+            return
+        if not reconnect or self.reconnect_fails:
+            raise self.error_class(msg="Lost connection to MySQL server")
+        self.connected = True
+        self.reconnects += 1
+
+    def get_server_info(self):
+        return "8.0.0-fake"
+
+    def cursor(self, dictionary=False):
+        return FakeCursor()
+
+    def close(self):
+        self.pool.returned += 1
+
+
+class FakePool:
+    """mysql-connector MySQLConnectionPool 대신 쓰는 가짜 풀 (연결 하나를 돌려 씀)"""
+
+    def __init__(self, error_class, **kwargs):
+        self.connection = FakePooledConnection(self, error_class)
+        self.checkouts = 0
+        self.returned = 0
+
+    def get_connection(self):
+        self.checkouts += 1
+        return self.connection
+
+
+@pytest.fixture
+def manager_module():
+    """conftest가 mock한 mysql.connector/mysql_manager 대신 실제 모듈을 불러옴"""
+    with patch.dict(sys.modules):
+        for name in [name for name in sys.modules if name == "mysql" or name.startswith("mysql.")]:
+            del sys.modules[name]
+        spec = importlib.util.spec_from_file_location("mysql_manager_under_test", MANAGER_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        yield module
+
+
+@pytest.fixture
+def make_manager(manager_module):
+    def make(pool_size=1, pool_timeout=0.05):
+        with patch.object(
+            manager_module.pooling,
+            "MySQLConnectionPool",
+            lambda **kwargs: FakePool(manager_module.Error, **kwargs),
+        ):
+            return manager_module.MySQLManager(pool_size=pool_size, pool_timeout=pool_timeout)
+
+    metrics.reset()
+    return make
+
+
+class TestMySQLManagerPool:
+    """풀 대기 타임아웃, 재연결, 세마포어 반납, 메트릭 테스트"""
+
+    def test_checkout_times_out_when_pool_is_exhausted(self, make_manager, manager_module):
+        """모든 연결이 사용 중이면 pool_timeout 뒤에 PoolError"""
+        # Given
+        manager = make_manager(pool_size=1, pool_timeout=0.05)
+
+        # When / Then
+        with manager.connection():
+            with pytest.raises(manager_module.pooling.PoolError):
+                with manager.connection():
+                    pass
+        assert metrics.snapshot()["counters"]["mysql.pool.timeouts"] == 1
+        assert manager.pool_stats()["waiting"] == 0
+
+    def test_dropped_connection_is_reconnected_on_checkout(self, make_manager):
+        """끊긴 연결은 빌려줄 때 ping(reconnect=True)으로 다시 연결"""
+        # Given
+        manager = make_manager()
+        manager.pool.connection.connected = False
+
+        # When
+        with manager.connection() as connection:
+            connected = connection.connected
+
+        # Then
+        assert connected is True
+        assert connection.reconnects == 1
+
+    def test_failed_reconnect_releases_slot_and_counts(self, make_manager, manager_module):
+        """재연결에 실패하면 오류를 내고, 연결과 슬롯은 반납"""
+        # Given
+        manager = make_manager(pool_size=1)
+        manager.pool.connection.connected = False
+        manager.pool.connection.reconnect_fails = True
+        returned = manager.pool.returned
+
+        # When
+        with pytest.raises(manager_module.Error):
+            with manager.connection():
+                pass
+
+        # Then
+        assert metrics.snapshot()["counters"]["mysql.pool.reconnect_failures"] == 1
+        assert manager.pool.returned == returned + 1
+        manager.pool.connection.reconnect_fails = False
+        with manager.connection():  # 슬롯이 남아 있으면 대기 없이 성공
+            pass
+
+    def test_slot_released_when_block_raises(self, make_manager):
+        """블록 안에서 예외가 나도 연결과 세마포어를 반납"""
+        # Given
+        manager = make_manager(pool_size=1, pool_timeout=0.05)
+        returned = manager.pool.returned
+
+        # When
+        with pytest.raises(ValueError):
+            with manager.connection():
+                raise ValueError("query failed")
+
+        # Then
+        assert manager.pool.returned == returned + 1
+        assert manager.pool_stats()["in_use"] == 0
+        with manager.connection():
+            pass
+        assert "mysql.pool.timeouts" not in metrics.snapshot()["counters"]
+
+    def test_pool_metrics_track_in_use_and_waiting(self, make_manager):
+        """사용 중/대기 중 연결 수와 대기 시간을 메트릭으로 보고"""
+        # Given
+        manager = make_manager(pool_size=1, pool_timeout=5)
+        waiting_started = threading.Event()
+        observed = {}
+
+        def waiter():
+            waiting_started.set()
+            with manager.connection():
+                pass
+
+        # When
+        with manager.connection():
+            observed["in_use"] = manager.pool_stats()["in_use"]
+            thread = threading.Thread(target=waiter)
+            thread.start()
+            waiting_started.wait()
+            for _ in range(200):
+                if manager.pool_stats()["waiting"] == 1:
+                    break
+                time.sleep(0.005)
+            observed["waiting"] = manager.pool_stats()["waiting"]
+        thread.join(timeout=5)
+
+        # Then
+        snapshot = metrics.snapshot()
+        assert observed == {"in_use": 1, "waiting": 1}
+        assert manager.pool_stats()["in_use"] == 0
+        assert snapshot["mysql_pool"]["size"] == 1
+        assert snapshot["timings"]["mysql.pool.wait_seconds"]["count"] == 3  # 생성 시 확인 1 + 2
+
+    def test_close_without_private_pool_api(self, make_manager):
+        """풀에 _remove_connections가 없어도 close()가 실패하지 않음"""
+        # Given
+        manager = make_manager()
+        with_api = make_manager()
+        with_api.pool._remove_connections = lambda: setattr(with_api, "removed", True)
+
+        # When
+        manager.close()
+        with_api.close()
+
+        # Then
+        assert manager.pool is None
+        assert with_api.removed is True
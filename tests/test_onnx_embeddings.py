@@ -0,0 +1,107 @@
+"""
+ONNX Runtime 임베딩 테스트 (작은 합성 모델 사용)
+"""
+
+import numpy as np
+import pytest
+
+onnx = pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+
+from onnx import TensorProto, helper, numpy_helper  # noqa: E402
+from tokenizers import Tokenizer, models, pre_tokenizers  # noqa: E402
+
+from database.onnx_embeddings import (  # noqa: E402
+    OnnxEmbeddings,
+    TOKENIZER_FILENAME,
+    model_path,
+    quantize_model,
+)
+
+VOCAB = ["[PAD]", "[UNK]", "사주", "오행", "십성", "신살", "도화살", "역마살"]
+DIM = 16
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    """단어 임베딩 조회(Gather) + 선형 변환(MatMul)만 있는 합성 모델과 WordLevel 토크나이저"""
+    rng = np.random.default_rng(0)
+    table = rng.standard_normal((len(VOCAB), DIM)).astype(np.float32)
+    weight = rng.standard_normal((DIM, DIM)).astype(np.float32)
+    graph = helper.make_graph(
+        [
+            helper.make_node("Gather", ["table", "input_ids"], ["embedded"]),
+            helper.make_node("MatMul", ["embedded", "weight"], ["last_hidden_state"]),
+        ],
+        "tiny_encoder",
+        [
+            helper.make_tensor_value_info("input_ids", TensorProto.INT64, ["batch", "sequence"]),
+            helper.make_tensor_value_info("attention_mask", TensorProto.INT64, ["batch", "sequence"]),
+        ],
+        [helper.make_tensor_value_info("last_hidden_state", TensorProto.FLOAT, ["batch", "sequence", DIM])],
+        initializer=[numpy_helper.from_array(table, "table"), numpy_helper.from_array(weight, "weight")],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+    onnx.save(model, model_path(str(tmp_path), quantized=False))
+
+    tokenizer = Tokenizer(models.WordLevel({token: i for i, token in enumerate(VOCAB)}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.save(str(tmp_path / TOKENIZER_FILENAME))
+    return str(tmp_path), table @ weight
+
+
+class TestOnnxEmbeddings:
+    """OnnxEmbeddings 테스트"""
+
+    def test_embeddings_match_reference_and_ignore_padding(self, model_dir):
+        """평균 풀링 결과가 기대값과 같고, 같은 배치의 긴 텍스트 때문에 생긴 패딩은 무시"""
+        # Given
+        directory, projected = model_dir
+        embeddings = OnnxEmbeddings(directory, quantized=False)
+
+        # When
+        vectors = embeddings.embed_documents(["사주", "도화살 역마살 신살 오행", "오행 십성"])
+
+        # Then
+        np.testing.assert_allclose(vectors[0], projected[2], rtol=1e-5)
+        np.testing.assert_allclose(vectors[1], projected[[6, 7, 5, 3]].mean(axis=0), rtol=1e-5)
+        np.testing.assert_allclose(vectors[2], projected[[3, 4]].mean(axis=0), rtol=1e-5)
+        np.testing.assert_allclose(embeddings.embed_query("사주"), vectors[0], rtol=1e-5)
+
+    def test_batches_preserve_input_order(self, model_dir):
+        """길이순으로 배치를 묶어도 결과는 입력 순서대로"""
+        # Given
+        directory, _ = model_dir
+        embeddings = OnnxEmbeddings(directory, quantized=False, batch_size=2)
+        texts = ["도화살 역마살 신살", "사주", "오행 십성", "신살"]
+
+        # When
+        batched = embeddings.embed_documents(texts)
+
+        # Then
+        for text, vector in zip(texts, batched):
+            np.testing.assert_allclose(vector, embeddings.embed_query(text), rtol=1e-5)
+
+    def test_quantized_model_stays_close_to_full_precision(self, model_dir):
+        """int8 동적 양자화 모델의 벡터가 원본과 코사인 유사도 0.99 이상"""
+        # Given
+        directory, _ = model_dir
+        quantize_model(model_path(directory, False), model_path(directory, True))
+        full = OnnxEmbeddings(directory, quantized=False)
+        quantized = OnnxEmbeddings(directory, quantized=True)
+        texts = ["사주 오행", "도화살", "역마살 신살 십성"]
+
+        # When
+        a = np.asarray(full.embed_documents(texts))
+        b = np.asarray(quantized.embed_documents(texts))
+
+        # Then
+        cosine = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+        assert cosine.min() > 0.99
+
+    def test_missing_model_explains_how_to_export(self, tmp_path):
+        """모델 파일이 없으면 내보내기 방법을 알려주는 오류"""
+        with pytest.raises(FileNotFoundError, match="--export"):
+            OnnxEmbeddings(str(tmp_path))
@@ -4,10 +4,15 @@
 
 import pytest
 import asyncio
+import json
 import time
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from httpx import AsyncClient
 from unittest.mock import Mock
-from langchain_core.messages import AIMessage
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from chatbot.responses import FastJSONResponse, history_payload
 
 
 class TestAPIPerformance:
@@ -294,4 +299,110 @@ class TestAPIScalability:
             all(r.status_code == 200 for r in session_responses)
             for session_responses in session_results
         )
-        assert total_time < 30.0  # 30초 이내에 모든 세션 완료
\ No newline at end of file
+        assert total_time < 30.0  # 30초 이내에 모든 세션 완료
+
+class TestResponseEncodingPerformance:
+    """/chat/ 응답 인코딩 시간과 크기 측정 (orjson, history_mode, 압축)"""
+
+    CHART_JSON = json.dumps(
+        {
+            "saju_info": {"year_ganji": "庚午", "month_ganji": "辛巳", "day_ganji": "丁丑", "time_ganji": "丁未"},
+            "analyzed_info": {
+                "ohang_counts": {"木": 0, "火": 4, "土": 2, "金": 2, "水": 0},
+                "sipsung_results": {f"기둥_{i}": "정재" for i in range(8)},
+                "sinsal_results": ["도화살", "역마살"],
+                "day_gan": "丁",
+            },
+        },
+        ensure_ascii=False,
+    )
+
+    def long_conversation(self, turns=40):
+        """매 턴 사주 계산 도구를 호출하는 긴 대화"""
+        messages = []
+        for turn in range(turns):
+            call_id = f"call-{turn}"
+            messages += [
+                HumanMessage(content=f"{turn}번째 질문: 제 직업운과 재물운은 어떤가요?"),
+                AIMessage(
+                    content="",
+                    tool_calls=[{"name": "calculate_and_analyze_saju", "args": {"birth_year": 1990}, "id": call_id}],
+                ),
+                ToolMessage(content=self.CHART_JSON, tool_call_id=call_id),
+                AIMessage(content="정화(丁火) 일간으로 화 기운이 강해 열정적이고 표현력이 뛰어납니다. " * 5),
+            ]
+        return messages
+
+    def payload(self, mode="full"):
+        payload = {"session_id": "perf-session", "response": "답변", "token_usage": {"request": {"total_tokens": 0}}}
+        history = history_payload(self.long_conversation(), mode)
+        if history is not None:
+            payload["full_history"] = history
+        return payload
+
+    @staticmethod
+    def measure(encode, content, repeat=20):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            body = encode(content)
+        return (time.perf_counter() - start) / repeat, body
+
+    def test_orjson_encoding_faster_than_stdlib(self):
+        """orjson 응답 인코딩이 FastAPI 기본 경로(jsonable_encoder + json.dumps)보다 빠르고 작음"""
+        pytest.importorskip("orjson")
+        # Given
+        content = self.payload()
+
+        # When
+        stdlib_seconds, stdlib_body = self.measure(
+            lambda c: JSONResponse(jsonable_encoder(c)).body, content
+        )
+        orjson_seconds, orjson_body = self.measure(lambda c: FastJSONResponse(c).body, content)
+
+        # Then
+        print(
+            f"\nencode stdlib={stdlib_seconds * 1000:.2f}ms ({len(stdlib_body)}B) "
+            f"orjson={orjson_seconds * 1000:.2f}ms ({len(orjson_body)}B)"
+        )
+        assert json.loads(orjson_body) == json.loads(stdlib_body)
+        assert orjson_seconds < stdlib_seconds
+        assert len(orjson_body) <= len(stdlib_body)
+
+    def test_history_modes_reduce_payload_bytes(self):
+        """도구 결과를 객체로 포함하면 이스케이프가 사라지고, compact/none은 기록 크기를 크게 줄임"""
+        # Given - 도구 결과를 문자열로 두던 기존 형식
+        escaped = self.payload()
+        for message in escaped["full_history"]:
+            if message["role"] == "tool":
+                message["content"] = json.dumps(message["content"], ensure_ascii=False)
+
+        # When
+        sizes = {"escaped": len(FastJSONResponse(escaped).body)}
+        for mode in ("full", "compact", "none"):
+            sizes[mode] = len(FastJSONResponse(self.payload(mode)).body)
+
+        # Then
+        print(f"\npayload bytes {sizes}")
+        assert sizes["full"] < sizes["escaped"]
+        assert sizes["compact"] < sizes["full"] * 0.7
+        assert sizes["none"] < 200
+
+    def test_large_response_is_compressed(self, client, mock_saju_graph):
+        """큰 /chat/ 응답은 압축되어 전송 바이트가 줄어듦"""
+        # Given
+        mock_saju_graph.invoke.return_value = {"messages": self.long_conversation(), "session_id": "perf-session"}
+        request = {"user_id": "perf-user", "message": "직업운", "history": []}
+
+        # When
+        identity = client.post("/chat/", json=request, headers={"Accept-Encoding": "identity"})
+        compressed = client.post("/chat/", json=request, headers={"Accept-Encoding": "br, gzip"})
+
+        # Then
+        print(
+            f"\nwire bytes identity={identity.num_bytes_downloaded} "
+            f"{compressed.headers['content-encoding']}={compressed.num_bytes_downloaded}"
+        )
+        assert "content-encoding" not in identity.headers
+        assert compressed.headers["content-encoding"] in ("br", "gzip")
+        assert compressed.json()["full_history"] == identity.json()["full_history"]
+        assert compressed.num_bytes_downloaded < identity.num_bytes_downloaded * 0.2
@@ -0,0 +1,152 @@
+"""
+검색 백엔드(NumpyBackend) 테스트
+"""
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from database.retrieval_backends import (
+    NumpyBackend,
+    RetrievalBackend,
+    chroma_where,
+    create_backend,
+    matches_filters,
+    normalize_filters,
+    top_k,
+)
+
+
+class KeywordEmbeddings:
+    """키워드 포함 여부로 벡터를 만드는 가짜 임베딩"""
+
+    KEYWORDS = ["도화살", "역마살", "화개살", "목", "화"]
+
+    def _vector(self, text):
+        return [float(keyword in text) for keyword in self.KEYWORDS] + [0.01]
+
+    def embed_documents(self, texts):
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def make_backend():
+    backend = NumpyBackend(KeywordEmbeddings())
+    documents = [
+        Document(page_content="신살 도화살은 매력", metadata={"type": "신살설명", "name": "도화살"}),
+        Document(page_content="신살 역마살은 이동", metadata={"type": "신살설명", "name": "역마살"}),
+        Document(page_content="신살 화개살은 예술", metadata={"type": "신살설명", "name": "화개살"}),
+        Document(page_content="오행 목은 나무", metadata={"type": "오행설명", "name": "木"}),
+    ]
+    backend.add(["d1", "d2", "d3", "d4"], documents)
+    return backend
+
+
+class TestTopK:
+    def test_matches_full_sort(self):
+        """argpartition 결과가 전체 정렬 상위 k개와 같음"""
+        # Given
+        rng = np.random.default_rng(0)
+        matrix = rng.standard_normal((500, 16)).astype(np.float32)
+        query = rng.standard_normal(16).astype(np.float32)
+
+        # When
+        result = top_k(matrix, query, 10)
+
+        # Then
+        assert list(result) == list(np.argsort(-(matrix @ query))[:10])
+        assert len(top_k(matrix, query, 1000)) == 500
+        assert len(top_k(matrix[:0], query, 3)) == 0
+
+
+class TestNumpyBackend:
+    """NumpyBackend 테스트"""
+
+    def test_search_returns_most_similar_first(self):
+        """가장 유사한 문서가 먼저, 문서 ID 포함"""
+        # Given
+        backend = make_backend()
+
+        # When
+        docs = backend.search("역마살이 뭔가요?", k=2)
+
+        # Then
+        assert docs[0].metadata["name"] == "역마살"
+        assert docs[0].id == "d2"
+        assert len(docs) == 2
+
+    def test_upsert_delete_and_get(self):
+        """같은 ID는 교체, 삭제 후 검색/조회에서 제외"""
+        # Given
+        backend = make_backend()
+
+        # When
+        backend.add(["d1"], [Document(page_content="신살 도화살은 인기", metadata={"name": "도화살"})])
+        backend.delete(["d3"])
+
+        # Then
+        assert sorted(backend.stored_ids()) == ["d1", "d2", "d4"]
+        assert [doc.page_content for doc in backend.get(["d2", "d1", "d3"])] == [
+            "신살 역마살은 이동",
+            "신살 도화살은 인기",
+        ]
+        assert all(doc.id != "d3" for doc in backend.search("화개살", k=5))
+
+    def test_filtered_search_only_scores_matching_documents(self):
+        """필터를 만족하는 문서 안에서만 검색, 맞는 문서가 없으면 빈 결과"""
+        # Given
+        backend = make_backend()
+
+        # When
+        sinsal_only = backend.search("목", k=5, filters=normalize_filters({"type": "신살설명"}))
+        chosen = backend.search(
+            "역마살", k=5, filters=normalize_filters({"type": "신살설명", "name": ["도화살", "화개살"]})
+        )
+        nothing = backend.search("목", k=5, filters=normalize_filters({"name": []}))
+
+        # Then
+        assert {doc.id for doc in sinsal_only} == {"d1", "d2", "d3"}
+        assert {doc.id for doc in chosen} == {"d1", "d3"}
+        assert nothing == []
+
+    def test_create_backend_rejects_unknown_name(self):
+        """알 수 없는 백엔드 이름은 ValueError"""
+        with pytest.raises(ValueError):
+            create_backend("faiss", KeywordEmbeddings())
+
+    def test_incomplete_backend_fails_at_creation(self):
+        """인터페이스 메서드를 빠뜨린 백엔드는 검색할 때가 아니라 생성할 때 TypeError"""
+        # Given
+        class SearchOnlyBackend(RetrievalBackend):
+            def search(self, query, k, filters=None):
+                return []
+
+        # When / Then
+        with pytest.raises(TypeError, match="stored_ids"):
+            SearchOnlyBackend()
+
+
+class TestFilters:
+    """메타데이터 필터 정리/비교/변환 테스트"""
+
+    def test_normalize_and_match(self):
+        """필드끼리는 AND, 값 목록은 IN"""
+        # Given
+        filters = normalize_filters({"type": ["신살설명", "일간설명"], "name": "도화살"})
+
+        # Then
+        assert filters == {"name": ("도화살",), "type": ("신살설명", "일간설명")}
+        assert matches_filters({"type": "신살설명", "name": "도화살"}, filters)
+        assert not matches_filters({"type": "오행설명", "name": "도화살"}, filters)
+        assert matches_filters({"name": "x"}, None)
+        assert normalize_filters({}) is None
+
+    def test_chroma_where(self):
+        """Chroma where 절: 값 하나는 $eq, 여러 개는 $in, 필드가 여러 개면 $and"""
+        assert chroma_where(normalize_filters({"type": "신살설명"})) == {"type": {"$eq": "신살설명"}}
+        assert chroma_where(normalize_filters({"type": "신살설명", "name": ["도화살", "역마살"]})) == {
+            "$and": [{"name": {"$in": ["도화살", "역마살"]}}, {"type": {"$eq": "신살설명"}}]
+        }
+        assert chroma_where(None) is None
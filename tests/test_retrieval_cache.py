@@ -0,0 +1,56 @@
+"""
+지식 검색 결과 캐시 테스트
+"""
+
+from database.retrieval_cache import QueryResultCache, normalize_query
+
+
+class TestQueryResultCache:
+    """QueryResultCache 테스트"""
+
+    def test_near_identical_queries_share_entry(self):
+        """공백/문장부호만 다른 질의는 같은 캐시 항목 사용"""
+        # Given
+        cache = QueryResultCache(max_entries=10)
+        cache.put("도화살이 뭔가요?", 5, "v1", ["a", "b"])
+
+        # When
+        result = cache.get("  도화살이   뭔가요 ", 5, "v1")
+
+        # Then
+        assert result == ["a", "b"]
+        assert cache.get("도화살이 뭔가요?", 3, "v1") is None  # k가 다르면 별도 항목
+        assert cache.get("도화살이 뭔가요?", 5, "v1", {"type": "신살설명"}) is None  # 필터가 다르면 별도 항목
+        assert cache.stats()["hit_ratio"] == 1 / 3
+
+    def test_manifest_version_change_invalidates(self):
+        """코퍼스 버전이 바뀌면 기존 결과를 버림"""
+        # Given
+        cache = QueryResultCache(max_entries=10)
+        cache.put("역마살", 5, "v1", ["a"])
+
+        # When
+        result = cache.get("역마살", 5, "v2")
+
+        # Then
+        assert result is None
+        assert cache.stats()["invalidations"] == 1
+        assert cache.stats()["version"] == "v2"
+
+    def test_lru_eviction(self):
+        """최대 개수를 넘으면 가장 오래 사용하지 않은 질의부터 제거"""
+        # Given
+        cache = QueryResultCache(max_entries=2)
+        cache.put("q1", 5, "v1", ["a"])
+        cache.put("q2", 5, "v1", ["b"])
+        cache.get("q1", 5, "v1")
+
+        # When
+        cache.put("q3", 5, "v1", ["c"])
+
+        # Then
+        assert cache.get("q2", 5, "v1") is None
+        assert cache.get("q1", 5, "v1") == ["a"]
+
+    def test_normalize_query(self):
+        assert normalize_query("Wood 기운은?!") == "wood 기운은"
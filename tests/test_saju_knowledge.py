@@ -0,0 +1,57 @@
+"""
+차트 관련 지식 사전 구성 테스트
+"""
+
+from core.saju_analyzer import SajuAnalyzer
+from core.saju_knowledge import build_chart_knowledge, chart_knowledge_entries, dominant_elements
+
+SAJU_INFO = {
+    "year_ganji": "庚午",
+    "month_ganji": "辛巳",
+    "day_ganji": "丁丑",
+    "time_ganji": "戊申",
+}
+
+
+class TestChartKnowledge:
+    """chart_knowledge_entries / build_chart_knowledge 테스트"""
+
+    def test_entries_follow_chart_without_retrieval(self):
+        """일간 → 신살 → 강한 오행 → 차트의 십성 순서, 중복 없이 규칙 항목만"""
+        # Given
+        analyzed = SajuAnalyzer().analyze_saju(SAJU_INFO)
+
+        # When
+        entries = chart_knowledge_entries(analyzed)
+
+        # Then
+        assert [(entry.category, entry.term) for entry in entries] == [
+            ("일간", "丁"),
+            ("신살", "도화살"),
+            ("오행", "火"),
+            ("오행", "金"),
+            ("십성", "편재"),
+            ("십성", "겁재"),
+            ("십성", "정재"),
+            ("십성", "상관"),
+        ]
+
+    def test_build_chart_knowledge_renders_entries(self):
+        """렌더링된 지식에 항목 설명과 조건 포함, 분석이 없으면 None"""
+        # Given
+        analyzed = SajuAnalyzer().analyze_saju(SAJU_INFO)
+
+        # When
+        knowledge = build_chart_knowledge(analyzed)
+
+        # Then
+        assert knowledge.startswith("[일간] 丁:")
+        assert "- 조건: 년지/일지 기준 자오묘유" in knowledge
+        assert build_chart_knowledge(None) is None
+        assert build_chart_knowledge({"ohang_counts": {}}) is None
+
+    def test_dominant_elements(self):
+        """가장 많은 오행, 동률이면 모두"""
+        assert dominant_elements({"木": 1, "水": 4}) == ["水"]
+        assert dominant_elements({"金": 3, "火": 3, "土": 2}) == ["火", "金"]
+        assert dominant_elements({}) == []
@@ -0,0 +1,396 @@
+"""
+세션 저장소 (비동기 MySQL 매니저 인터페이스) 테스트
+"""
+
+import importlib.util
+import os
+
+import pytest
+from datetime import datetime
+from fastapi import status
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from unittest.mock import Mock, patch
+
+
+class FakeSaveTool:
+    """call_tool이 실행할 가짜 save_user_session_data 도구"""
+
+    name = "save_user_session_data"
+
+    def invoke(self, args):
+        return '{"status": "success"}'
+
+
+@pytest.fixture
+def real_nodes():
+    """conftest가 mock한 chatbot.nodes 대신 실제 노드 모듈을 불러옴 (LLM은 mock)"""
+    nodes_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "chatbot", "nodes.py")
+    with patch("chatbot.llm_factory.get_chat_model", return_value=Mock()):
+        spec = importlib.util.spec_from_file_location("nodes_under_test", nodes_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def sqlite_client(sqlite_mysql_manager, mock_saju_graph):
+    """SQLite 가짜 매니저를 사용하는 테스트 클라이언트"""
+    from app import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+class TestSQLiteSessionManager:
+    """가짜 매니저 자체 동작 테스트 (AsyncMySQLManager와 같은 인터페이스)"""
+
+    @pytest.mark.asyncio
+    async def test_save_and_get_user_session(self):
+        """세션 저장 후 조회"""
+        # Given
+        from tests.fakes import SQLiteSessionManager
+
+        manager = SQLiteSessionManager()
+        birth = datetime(1990, 5, 15, 14, 0)
+
+        # When
+        await manager.save_user_session("s-1", "u-1", birth, False, False)
+        await manager.save_user_session("s-1", "u-1", birth, True, False)  # upsert
+        record = await manager.get_user_session("s-1")
+
+        # Then
+        assert record["birth_datetime"] == birth
+        assert record["is_lunar"] is True
+        assert await manager.get_user_session("missing") is None
+        await manager.close()
+
+
+class TestChatSessionPersistence:
+    """/chat/ 요청 흐름의 세션 저장/복원 테스트"""
+
+    def test_session_saved_and_restored_across_requests(
+        self, sqlite_client, sqlite_mysql_manager, mock_saju_graph
+    ):
+        """첫 요청에서 저장된 생년월일시가 다음 요청의 초기 상태로 로드"""
+        # Given - 첫 요청에서 사주가 계산됨
+        birth = datetime(1990, 5, 15, 14, 0)
+        mock_saju_graph.invoke.return_value = {
+            "messages": [AIMessage(content="사주를 계산했습니다.")],
+            "user_birth_datetime": birth,
+            "user_birth_is_lunar": False,
+            "user_birth_is_leap_month": False,
+            "saju_calculated_info": {"year_ganji": "庚午"},
+        }
+        request = {
+            "user_id": "persist-user",
+            "session_id": "persist-session",
+            "message": "1990년 5월 15일 오후 2시생입니다",
+        }
+
+        # When
+        import app as app_module
+
+        first = sqlite_client.post("/chat/", json=request)
+        sqlite_client.portal.call(app_module.session_writer.flush)
+        mock_saju_graph.invoke.return_value = {
+            "messages": [AIMessage(content="기존 정보로 답변합니다.")],
+        }
+        second = sqlite_client.post("/chat/", json={**request, "message": "직업운은요?"})
+
+        # Then
+        assert first.status_code == status.HTTP_200_OK
+        assert second.status_code == status.HTTP_200_OK
+        initial_state = mock_saju_graph.invoke.call_args[0][0]
+        assert initial_state["user_birth_datetime"] == birth
+        assert initial_state["user_birth_is_lunar"] is False
+
+    def test_returning_session_is_hydrated_from_stored_chart(
+        self, sqlite_client, sqlite_mysql_manager, mock_saju_graph
+    ):
+        """저장된 차트로 계산/분석 결과까지 초기 상태에 복원 (도구 호출 불필요)"""
+        # Given - 첫 요청에서 계산된 차트가 세션에 압축 저장됨
+        import app as app_module
+
+        birth = datetime(1990, 5, 10, 15, 30)
+        saju_info = {
+            "year_ganji": "庚午",
+            "month_ganji": "辛巳",
+            "day_ganji": "丁丑",
+            "time_ganji": "戊申",
+        }
+        mock_saju_graph.invoke.return_value = {
+            "messages": [AIMessage(content="사주를 계산했습니다.")],
+            "user_birth_datetime": birth,
+            "user_birth_is_lunar": False,
+            "user_birth_is_leap_month": False,
+            "saju_calculated_info": saju_info,
+        }
+        request = {"user_id": "chart-user", "session_id": "chart-session", "message": "사주 봐주세요"}
+        sqlite_client.post("/chat/", json=request)
+        sqlite_client.portal.call(app_module.session_writer.flush)
+        app_module.session_cache._entries.clear()  # 다른 워커/재시작 상황: DB에서 로드
+
+        # When
+        mock_saju_graph.invoke.return_value = {"messages": [AIMessage(content="재물운은...")]}
+        response = sqlite_client.post("/chat/", json={**request, "message": "재물운은요?"})
+
+        # Then
+        assert response.status_code == status.HTTP_200_OK
+        initial_state = mock_saju_graph.invoke.call_args[0][0]
+        assert initial_state["saju_calculated_info"]["day_ganji"] == "丁丑"
+        assert initial_state["saju_analyzed_info"]["day_gan"] == "丁"
+
+    def test_conversation_rows_are_written_behind(self, sqlite_client, sqlite_mysql_manager):
+        """대화 기록은 응답 경로가 아니라 이후 flush에서 저장"""
+        # Given
+        import app as app_module
+
+        request = {"user_id": "history-user", "session_id": "history-session", "message": "안녕하세요"}
+
+        # When
+        response = sqlite_client.post("/chat/", json=request)
+        rows_before_flush = sqlite_client.portal.call(
+            sqlite_mysql_manager.get_conversation, "history-session"
+        )
+        sqlite_client.portal.call(app_module.session_writer.flush)
+        rows_after_flush = sqlite_client.portal.call(
+            sqlite_mysql_manager.get_conversation, "history-session"
+        )
+
+        # Then
+        assert response.status_code == status.HTTP_200_OK
+        assert rows_before_flush == []  # 응답은 DB 저장을 기다리지 않음
+        assert [row["role"] for row in rows_after_flush] == ["user", "assistant"]
+        assert rows_after_flush[0]["message"] == "안녕하세요"
+
+
+class FlakyManager:
+    """처음 fail_times번은 실패하는 배치 저장 매니저"""
+
+    def __init__(self, fail_times: int = 0):
+        self.fail_times = fail_times
+        self.session_batches = []
+        self.conversation_batches = []
+
+    async def save_user_sessions_batch(self, rows):
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise RuntimeError("DB unavailable")
+        self.session_batches.append(list(rows))
+
+    async def save_conversation_batch(self, rows):
+        self.conversation_batches.append(list(rows))
+
+
+class TestWriteBehindQueue:
+    """WriteBehindQueue 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_flush_batches_and_coalesces_sessions(self):
+        """같은 세션의 upsert는 하나로 합치고, 배치 크기 단위로 저장"""
+        # Given
+        from database.write_behind import WriteBehindQueue
+
+        manager = FlakyManager()
+        queue = WriteBehindQueue(manager, batch_size=2, flush_interval=60)
+        birth = datetime(1990, 5, 15, 14, 0)
+
+        # When
+        queue.save_user_session("s-1", "u-1", birth, False, False)
+        queue.append_conversation("s-1", "u-1", "user", "질문")  # 생년월일시를 덮어쓰지 않음
+        for i in range(3):
+            queue.append_conversation(f"s-{i + 2}", "u-2", "user", f"메시지 {i}")
+        await queue.flush()
+
+        # Then
+        session_rows = [row for batch in manager.session_batches for row in batch]
+        assert len(session_rows) == 4
+        assert session_rows[0] == ("s-1", "u-1", birth, False, False, None)
+        assert [len(batch) for batch in manager.conversation_batches] == [2, 2]
+        assert queue.pending_count() == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_is_retried(self):
+        """저장 실패 시 행을 버퍼로 되돌리고 다음 flush에서 재시도"""
+        # Given
+        from database.write_behind import WriteBehindQueue
+
+        manager = FlakyManager(fail_times=1)
+        queue = WriteBehindQueue(manager, batch_size=10, flush_interval=60)
+        queue.append_conversation("s-1", "u-1", "user", "질문")
+
+        # When
+        await queue.flush()
+        pending_after_failure = queue.pending_count()
+        await queue.flush()
+
+        # Then
+        assert pending_after_failure == 2  # 세션 행 + 대화 행
+        assert manager.conversation_batches[0][0][2] == "질문"
+        assert queue.pending_count() == 0
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending_rows(self):
+        """종료 시 남은 행을 모두 저장 (at-least-once)"""
+        # Given
+        from database.write_behind import WriteBehindQueue
+
+        manager = FlakyManager()
+        queue = WriteBehindQueue(manager, batch_size=100, flush_interval=60)
+        queue.start()
+        queue.append_conversation("s-1", "u-1", "assistant", "답변")
+
+        # When
+        await queue.stop()
+
+        # Then
+        assert len(manager.conversation_batches) == 1
+        assert queue.pending_count() == 0
+
+
+class TestSessionCache:
+    """SessionCache 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_and_negative_caching(self):
+        """최대 개수를 넘으면 오래된 항목부터 제거하고, None(세션 없음)도 캐시"""
+        # Given
+        from database.session_cache import SessionCache
+
+        cache = SessionCache(max_entries=2, ttl=60)
+
+        # When
+        await cache.set("s-1", {"user_id": "u-1"})
+        await cache.set("s-2", None)
+        await cache.get("s-1")  # s-1을 최근 사용으로 갱신
+        await cache.set("s-3", {"user_id": "u-3"})
+
+        # Then
+        assert await cache.get("s-1") == (True, {"user_id": "u-1"})
+        assert await cache.get("s-2") == (False, None)  # 가장 오래된 항목 제거
+        assert cache.stats()["entries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        """TTL이 지나면 캐시 미스"""
+        # Given
+        from database.session_cache import SessionCache
+
+        cache = SessionCache(ttl=0)
+
+        # When
+        await cache.set("s-1", {"user_id": "u-1"})
+
+        # Then
+        assert await cache.get("s-1") == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_shared_redis_tier_keeps_workers_coherent(self):
+        """한 워커의 write-through가 Redis를 통해 다른 워커에 보임"""
+        # Given
+        from fakeredis import FakeAsyncRedis
+        from database.session_cache import SessionCache
+
+        redis_client = FakeAsyncRedis()
+        worker_a = SessionCache(redis_client=redis_client)
+        worker_b = SessionCache(redis_client=redis_client)
+        birth = datetime(1990, 5, 15, 14, 0)
+
+        # When
+        await worker_a.set("s-1", {"birth_datetime": birth, "is_lunar": False})
+        found, record = await worker_b.get("s-1")
+
+        # Then
+        assert found is True
+        assert record["birth_datetime"] == birth
+        assert worker_b.stats()["redis_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_worker_sees_other_workers_write_after_reading(self):
+        """B가 먼저 읽은 뒤 A가 저장해도 B의 다음 조회는 A의 값을 봄 (세션 없음/이전 레코드가 남지 않음)"""
+        # Given
+        from fakeredis import FakeAsyncRedis
+        from database import session_cache
+        from database.session_cache import SessionCache
+
+        redis_client = FakeAsyncRedis()
+        worker_a = SessionCache(redis_client=redis_client, ttl=300, shared_local_ttl=2)
+        worker_b = SessionCache(redis_client=redis_client, ttl=300, shared_local_ttl=2)
+        birth = datetime(1990, 5, 15, 14, 0)
+        now = [1000.0]
+
+        with patch.object(session_cache.time, "monotonic", lambda: now[0]):
+            # When - B는 세션이 없다고 읽고(DB 조회 결과 적재), A가 차트를 저장
+            assert await worker_b.get("s-1") == (False, None)
+            await worker_b.set("s-1", None)
+            await worker_a.set("s-1", {"birth_datetime": birth, "saju_chart": "v1"})
+            found, first = await worker_b.get("s-1")
+            # A가 차트를 다시 저장하고 B의 1차 캐시 유지 시간이 지남
+            await worker_a.set("s-1", {"birth_datetime": birth, "saju_chart": "v2"})
+            now[0] += 3
+            _, second = await worker_b.get("s-1")
+
+        # Then
+        assert found is True
+        assert first["saju_chart"] == "v1"
+        assert second["saju_chart"] == "v2"
+        assert worker_b.ttl == 2
+
+    def test_save_tool_invalidates_cached_session(self, client, mock_mysql_manager, mock_saju_graph, real_nodes):
+        """save_user_session_data 도구가 DB에 저장한 턴 이후에는 캐시 대신 DB에서 다시 조회"""
+        # Given - 도구 결과 메시지는 실제 call_tool 노드로 만듦
+        request = {"user_id": "cache-user", "session_id": "tool-session", "message": "1990년 5월 15일생이에요"}
+        tool_request = AIMessage(
+            content="",
+            tool_calls=[{"name": "save_user_session_data", "args": {"session_id": "tool-session"}, "id": "call-1"}],
+        )
+        with patch.object(real_nodes, "tools", [FakeSaveTool()]):
+            tool_messages = real_nodes.call_tool({"messages": [HumanMessage(content=request["message"]), tool_request]})["messages"]
+        mock_saju_graph.invoke.return_value = {
+            "messages": [HumanMessage(content=request["message"]), tool_request, *tool_messages, AIMessage(content="저장했습니다.")],
+        }
+
+        # When
+        client.post("/chat/", json=request)
+        mock_saju_graph.invoke.return_value = {"messages": [AIMessage(content="네.")]}
+        client.post("/chat/", json=request)
+        client.post("/chat/", json=request)
+
+        # Then - 첫 턴 조회 + 도구 저장 후 다시 조회, 세 번째 턴은 캐시
+        assert tool_messages[0].name == "save_user_session_data"
+        assert mock_mysql_manager.get_user_session.call_count == 2
+
+    def test_repeat_turns_skip_database(self, client, mock_mysql_manager, mock_saju_graph):
+        """같은 세션의 반복 요청은 DB를 한 번만 조회"""
+        # Given
+        request = {"user_id": "cache-user", "session_id": "cache-session", "message": "안녕하세요"}
+
+        # When
+        for _ in range(3):
+            response = client.post("/chat/", json=request)
+            assert response.status_code == status.HTTP_200_OK
+
+        # Then
+        mock_mysql_manager.get_user_session.assert_called_once()
+
+    def test_saved_session_is_written_through(self, client, mock_mysql_manager, mock_saju_graph):
+        """사주 계산 후 저장된 세션은 다음 턴에 DB 조회 없이 캐시에서 로드"""
+        # Given
+        birth = datetime(1990, 5, 15, 14, 0)
+        mock_saju_graph.invoke.return_value = {
+            "messages": [AIMessage(content="사주를 계산했습니다.")],
+            "user_birth_datetime": birth,
+            "user_birth_is_lunar": False,
+            "user_birth_is_leap_month": False,
+            "saju_calculated_info": {"year_ganji": "庚午"},
+        }
+        request = {"user_id": "cache-user", "session_id": "written-session", "message": "사주 봐주세요"}
+
+        # When
+        client.post("/chat/", json=request)
+        mock_saju_graph.invoke.return_value = {"messages": [AIMessage(content="네.")]}
+        client.post("/chat/", json=request)
+
+        # Then
+        mock_mysql_manager.get_user_session.assert_called_once()
+        assert mock_saju_graph.invoke.call_args[0][0]["user_birth_datetime"] == birth
@@ -0,0 +1,94 @@
+"""
+진행 중인 동일 작업 합치기(SingleFlight) 테스트
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.single_flight import SingleFlight
+
+
+class SlowWork:
+    """호출 횟수를 세고, 모든 호출자가 합류할 때까지 잠시 머무는 작업"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, value):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return f"결과:{value}"
+
+
+class TestSingleFlight:
+    def test_concurrent_same_key_runs_once(self):
+        """
+        Given: 같은 키로 동시에 들어온 8개의 호출
+        When: do 호출
+        Then: 작업은 한 번만 실행되고 모든 호출자가 같은 결과를 받는다
+        """
+        flight = SingleFlight("test_same_key")
+        work = SlowWork()
+        barrier = threading.Barrier(8)
+
+        def call(_):
+            barrier.wait()
+            return flight.do("2000", work, "2000")
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(call, range(8)))
+
+        assert results == ["결과:2000"] * 8
+        assert work.calls == 1
+        assert flight.stats() == {"executions": 1, "coalesced": 7, "in_flight": 0}
+
+    def test_different_keys_and_sequential_calls_run_separately(self):
+        """
+        Given: 서로 다른 키의 동시 호출과, 끝난 뒤 같은 키의 재호출
+        When: do 호출
+        Then: 키마다 실행되고, 끝난 작업의 결과는 캐시하지 않는다
+        """
+        flight = SingleFlight("test_keys")
+        work = SlowWork()
+        barrier = threading.Barrier(4)
+
+        def call(key):
+            barrier.wait()
+            return flight.do(key, work, key)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(call, ["a", "b", "a", "b"]))
+        flight.do("a", work, "a")
+
+        assert sorted(set(results)) == ["결과:a", "결과:b"]
+        assert work.calls == 3
+
+    def test_exception_is_shared_and_key_released(self):
+        """
+        Given: 예외를 내는 작업에 동시에 합류한 호출자들
+        When: do 호출
+        Then: 모두 같은 예외를 받고, 이후 같은 키로 다시 실행할 수 있다
+        """
+        flight = SingleFlight("test_error")
+        started = threading.Event()
+
+        def fail():
+            started.set()
+            time.sleep(0.05)
+            raise RuntimeError("LLM 오류")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(flight.do, "key", fail)
+            started.wait()
+            follower = pool.submit(flight.do, "key", fail)
+            for future in (leader, follower):
+                with pytest.raises(RuntimeError, match="LLM 오류"):
+                    future.result()
+
+        assert flight.do("key", lambda: "복구") == "복구"
@@ -0,0 +1,144 @@
+"""
+/chat/stream SSE 엔드포인트 및 이벤트 변환 테스트
+"""
+
+import json
+
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+
+from chatbot.streaming import format_sse, is_graph_end, translate_event
+
+CHART_OUTPUT = json.dumps(
+    {"saju_info": {"day_ganji": "丁丑"}, "analyzed_info": {"day_gan": "丁"}}, ensure_ascii=False
+)
+
+
+def node_event(kind, node):
+    return {"event": kind, "name": node, "metadata": {"langgraph_node": node}, "parent_ids": ["root"]}
+
+
+def graph_events(final_state):
+    """LangGraph astream_events(v2)가 내보내는 형태의 이벤트 순서"""
+    return [
+        {"event": "on_chain_start", "name": "LangGraph", "metadata": {}, "parent_ids": []},
+        node_event("on_chain_start", "call_tool"),
+        {"event": "on_tool_start", "name": "calculate_and_analyze_saju", "metadata": {"langgraph_node": "call_tool"}},
+        {
+            "event": "on_tool_end",
+            "name": "calculate_and_analyze_saju",
+            "metadata": {"langgraph_node": "call_tool"},
+            "data": {"output": CHART_OUTPUT},
+        },
+        node_event("on_chain_end", "call_tool"),
+        {
+            "event": "on_chat_model_stream",
+            "name": "ChatOpenAI",
+            "metadata": {"langgraph_node": "manage_context"},  # 요약 LLM 토큰은 내보내지 않음
+            "data": {"chunk": AIMessageChunk(content="요약")},
+        },
+        *[
+            {
+                "event": "on_chat_model_stream",
+                "name": "ChatOpenAI",
+                "metadata": {"langgraph_node": "respond_to_user"},
+                "data": {"chunk": AIMessageChunk(content=delta)},
+            }
+            for delta in ["불의 기운이 ", "강합니다"]
+        ],
+        {"event": "on_chain_end", "name": "LangGraph", "metadata": {}, "parent_ids": [], "data": {"output": final_state}},
+    ]
+
+
+def parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestTranslateEvent:
+    """astream_events → SSE 이벤트 변환 테스트"""
+
+    def test_node_tool_chart_and_token_events(self):
+        """노드 진행, 차트, 답변 토큰만 변환하고 내부 호출은 무시"""
+        # When
+        translated = [translate_event(event) for event in graph_events({"messages": []})]
+
+        # Then
+        assert [item for item in translated if item] == [
+            ("node_started", {"node": "call_tool"}),
+            ("tool_started", {"tool": "calculate_and_analyze_saju"}),
+            ("chart", {"saju_info": {"day_ganji": "丁丑"}, "analyzed_info": {"day_gan": "丁"}}),
+            ("node_finished", {"node": "call_tool"}),
+            ("token", {"node": "respond_to_user", "delta": "불의 기운이 "}),
+            ("token", {"node": "respond_to_user", "delta": "강합니다"}),
+        ]
+
+    def test_failed_calculation_is_reported_as_tool_finished(self):
+        """오류 결과는 chart가 아닌 tool_finished"""
+        # Given
+        event = {
+            "event": "on_tool_end",
+            "name": "calculate_and_analyze_saju",
+            "data": {"output": '{"error": true, "message": "잘못된 날짜"}'},
+        }
+
+        # Then
+        assert translate_event(event) == ("tool_finished", {"tool": "calculate_and_analyze_saju"})
+
+    def test_format_sse_and_graph_end(self):
+        assert format_sse("token", {"delta": "사주"}) == 'event: token\ndata: {"delta": "사주"}\n\n'
+        assert is_graph_end({"event": "on_chain_end", "name": "LangGraph", "parent_ids": []})
+        assert not is_graph_end(node_event("on_chain_end", "call_llm"))
+
+
+class TestChatStreamAPI:
+    """/chat/stream 엔드포인트 테스트"""
+
+    def test_stream_emits_progress_then_done(self, client, sample_chat_request, mock_saju_graph, mock_session_writer):
+        """session → 진행/차트/토큰 → done 순서로 보내고, 대화 기록을 저장"""
+        # Given
+        final_state = {
+            "messages": [HumanMessage(content="사주 봐주세요"), AIMessage(content="불의 기운이 강합니다")],
+            "saju_calculated_info": None,
+        }
+
+        async def astream_events(state, version):
+            assert version == "v2"
+            for event in graph_events(final_state):
+                yield event
+
+        mock_saju_graph.astream_events = astream_events
+
+        # When
+        response = client.post("/chat/stream", json=sample_chat_request)
+
+        # Then
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_sse(response.text)
+        names = [name for name, _ in events]
+        assert names[0] == "session"
+        assert names.index("chart") < names.index("token") < names.index("done")
+        assert events[-1][1]["response"] == "불의 기운이 강합니다"
+        assert "token_usage" in events[-1][1]
+        mock_session_writer.append_conversation.assert_any_call(
+            "test-session-456", "test-user-123", "assistant", "불의 기운이 강합니다"
+        )
+
+    def test_stream_reports_graph_error(self, client, sample_chat_request, mock_saju_graph):
+        """그래프 실행 중 오류는 error 이벤트로 전달"""
+        # Given
+        async def astream_events(state, version):
+            yield node_event("on_chain_start", "call_llm")
+            raise RuntimeError("LLM 연결 실패")
+
+        mock_saju_graph.astream_events = astream_events
+
+        # When
+        events = parse_sse(client.post("/chat/stream", json=sample_chat_request).text)
+
+        # Then
+        assert events[-1][0] == "error"
+        assert "LLM 연결 실패" in events[-1][1]["message"]
@@ -0,0 +1,135 @@
+"""
+사주 용어 사전, Aho-Corasick 매처, 용어 직접 조회 테스트
+"""
+
+import time
+
+from core.term_lookup import TermLookup, TermMatcher, build_term_dictionary
+
+
+class TestTermDictionary:
+    """용어 사전 테스트"""
+
+    def test_dictionary_covers_terms_rules_and_aliases(self):
+        """용어, 설명 속 별칭, 규칙 항목, 한자 표기를 모두 포함"""
+        # When
+        dictionary = build_term_dictionary()
+
+        # Then
+        assert dictionary["甲"] == {"甲"}
+        assert dictionary["갑목"] == {"甲"}
+        assert dictionary["신금"] == {"辛", "申"}
+        assert dictionary["고진살"] == {"고진살"}  # saju_rules.json에만 있는 항목
+        assert dictionary["十神"] == {"십성"}
+        assert "쥐" not in dictionary  # 한 글자 한글 별칭 제외
+
+    def test_only_ganji_readings_become_aliases(self):
+        """설명 속 괄호 별칭(음양, 동물)과 오행 풀이는 일상어와 겹쳐 별칭으로 쓰지 않음"""
+        # When
+        dictionary = build_term_dictionary()
+
+        # Then
+        assert dictionary["계수"] == {"癸"}
+        assert dictionary["해수"] == {"亥"}
+        for everyday_word in ("양수", "음수", "원숭이", "토끼", "나무"):
+            assert everyday_word not in dictionary
+
+
+class TestTermMatcher:
+    """Aho-Corasick 매처 테스트"""
+
+    def test_find_all_reports_overlapping_surfaces(self):
+        """겹치는 표기(접미사 포함)를 모두 찾음"""
+        # Given
+        matcher = TermMatcher({"도화살": {"도화살"}, "화살": {"화살"}, "살": {"살"}})
+
+        # When
+        matches = matcher.find_all("도화살")
+
+        # Then
+        assert sorted(matches) == [(0, "도화살"), (1, "화살"), (2, "살")]
+
+    def test_find_terms_prefers_longest_match(self):
+        """가장 긴 표기 우선, 등장 순서대로 중복 없이"""
+        # Given
+        matcher = TermMatcher(build_term_dictionary())
+
+        # When / Then
+        assert matcher.find_terms("역마살이 뭐야? 역마살 말고 桃花殺도") == ["역마살", "도화살"]
+        assert matcher.find_terms("오늘 날씨 어때") == []
+
+    def test_terms_inside_ordinary_words_are_ignored(self):
+        """
+        Given: 용어(상관, 정화, 계수, 해수)가 다른 낱말의 일부로 들어간 일상 문장
+        When: 용어를 찾음
+        Then: 아무 용어도 찾지 않아 벡터 검색으로 넘어가고, 조사가 붙은 용어는 그대로 찾는다
+        """
+        # Given
+        matcher = TermMatcher(build_term_dictionary())
+        sentences = [
+            "그건 상관없어요",
+            "상관관계가 궁금해요",
+            "공기정화기 추천해 주세요",
+            "정화조 청소 비용이 얼마죠",
+            "계수기로 인원을 세요",
+            "양수와 음수의 덧셈",
+            "해수욕장에 가고 싶어요",
+            "나무를 심었어요",
+        ]
+
+        # When / Then
+        for sentence in sentences:
+            assert matcher.find_terms(sentence) == [], sentence
+        assert matcher.find_terms("상관이 뭐야? 정화 일간은요") == ["상관", "丁", "일간"]
+
+
+class TestTermLookup:
+    """TermLookup 테스트"""
+
+    def test_lookup_returns_rule_entry_with_details(self):
+        """신살 질문은 saju_rules.json의 항목(설명 + 조건)을 반환"""
+        # Given
+        lookup = TermLookup()
+
+        # When
+        entries = lookup.lookup("역마살이 뭐야")
+
+        # Then
+        assert len(entries) == 1
+        assert entries[0].term == "역마살"
+        assert entries[0].category == "신살"
+        assert entries[0].details["조건"] == "년지/일지 기준 인신사해"
+        assert "이동" in entries[0].render()
+
+    def test_lookup_resolves_hanja_and_aliases(self):
+        """한자 표기와 설명 속 별칭으로도 조회, 분류명은 소속 용어 목록"""
+        # Given
+        lookup = TermLookup()
+
+        # When
+        sipsung = lookup.lookup("十神이 뭔가요")
+        gapmok = lookup.lookup("갑목 일간 성격")
+
+        # Then
+        assert sipsung[0].category == "분류"
+        assert "비견" in sipsung[0].description
+        assert gapmok[0].term == "甲"
+
+    def test_unknown_query_returns_nothing(self):
+        """용어가 없으면 빈 목록 (벡터 검색으로 넘김)"""
+        assert TermLookup().lookup("요즘 운이 안 좋은데 어떡하죠") == []
+
+    def test_lookup_is_fast(self):
+        """사전 구축 후 조회는 마이크로초 단위"""
+        # Given
+        lookup = TermLookup()
+        query = "도화살이랑 역마살이 같이 있으면 어떤가요? 편재도 있어요"
+
+        # When
+        start = time.perf_counter()
+        for _ in range(1000):
+            lookup.lookup(query)
+        elapsed = (time.perf_counter() - start) / 1000
+
+        # Then
+        assert elapsed < 0.001
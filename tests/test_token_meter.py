@@ -0,0 +1,106 @@
+"""
+토큰 사용량 집계 및 예산 테스트
+"""
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from chatbot.token_meter import TokenMeter
+from core.saju_interpreter import SajuInterpreter
+
+
+class TestTokenMeter:
+    """TokenMeter 테스트"""
+
+    def test_records_usage_metadata_per_session_and_node(self):
+        """usage_metadata를 세션/노드/요청 단위로 집계"""
+        # Given
+        meter = TokenMeter(session_budget=0)
+        response = AIMessage(
+            content="답변",
+            usage_metadata={"input_tokens": 100, "output_tokens": 20, "total_tokens": 120},
+        )
+
+        # When
+        with meter.scope("session-1", "user-1") as request_usage:
+            meter.record(response, node="call_llm")
+            meter.record(response, node="respond_to_user")
+
+        # Then
+        session_usage = meter.session_usage("session-1")
+        assert request_usage["total_tokens"] == 240
+        assert request_usage["llm_calls"] == 2
+        assert session_usage["input_tokens"] == 200
+        assert session_usage["by_node"]["call_llm"]["total_tokens"] == 120
+        assert meter.user_usage("user-1")["output_tokens"] == 40
+
+    def test_estimates_when_usage_metadata_missing(self):
+        """usage_metadata가 없으면 프롬프트와 응답으로 추정"""
+        # Given
+        meter = TokenMeter(session_budget=0)
+
+        # When
+        with meter.scope("session-2", "user-2"):
+            usage = meter.record(
+                AIMessage(content="사주 풀이 결과입니다."),
+                node="call_llm",
+                prompt=[HumanMessage(content="제 사주를 봐주세요")],
+            )
+
+        # Then
+        assert usage["input_tokens"] > 0
+        assert usage["output_tokens"] > 0
+
+    def test_over_budget_uses_current_scope(self):
+        """세션 예산 초과 여부 확인 (session_id 생략 시 현재 요청 기준)"""
+        # Given
+        meter = TokenMeter(session_budget=100)
+        response = AIMessage(
+            content="답변",
+            usage_metadata={"input_tokens": 90, "output_tokens": 20, "total_tokens": 110},
+        )
+
+        # When & Then
+        with meter.scope("session-3", "user-3"):
+            assert meter.over_budget() is False
+            meter.record(response, node="call_llm")
+            assert meter.over_budget() is True
+        assert meter.over_budget() is False  # 범위 밖에서는 세션을 알 수 없음
+        assert meter.over_budget("session-3") is True
+
+    def test_records_without_scope_only_update_metrics(self):
+        """요청 범위 밖의 호출은 세션에 귀속되지 않음"""
+        # Given
+        meter = TokenMeter(session_budget=0)
+
+        # When
+        meter.record(AIMessage(content="답변"), node="call_llm", prompt="질문")
+
+        # Then
+        assert meter.summary()["tracked_sessions"] == 0
+
+
+class TestInterpreterBudgetFallback:
+    """예산 초과 시 템플릿 해석 테스트"""
+
+    def test_template_only_skips_llm(self):
+        """template_only이면 LLM을 호출하지 않음"""
+        # Given
+        class FailingLLM:
+            def invoke(self, prompt):
+                raise AssertionError("LLM should not be called")
+
+        interpreter = SajuInterpreter()
+        interpreter.set_llm(FailingLLM())
+        analyzed = {
+            "ohang_counts": {"木": 2, "火": 1},
+            "sipsung_results": {"년주_천간": "편인"},
+            "sinsal_results": ["도화살"],
+            "day_gan": "丙",
+        }
+
+        # When
+        interpretation = interpreter.interpret_saju(analyzed, template_only=True)
+
+        # Then
+        assert "오행의 분포" in interpretation
+        assert "도화살" in interpretation